@@ -1,5 +1,5 @@
 from django.contrib import admin
-from core.models import Product, ImportAnalytics, Logs
+from core.models import Product, ImportAnalytics, ImportChunkStats, ImportIssueSummary, ChunkedUpload, Logs
 # Register your models here.
 
 @admin.register(Product)
@@ -12,10 +12,31 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(ImportAnalytics)
 class ImportAnalyticsAdmin(admin.ModelAdmin):
-    list_display = ('file_name', 'status', 'total_records', 'success_count', 'warning_count', 'failure_count', 'time_taken', 'created_at')
+    list_display = ('file_name', 'status', 'total_records', 'success_count', 'warning_count', 'failure_count', 'unchanged_count', 'time_taken', 'created_at')
     search_fields = ('file_name',)
     list_filter = ('status', 'created_at')
 
+
+
+@admin.register(ImportChunkStats)
+class ImportChunkStatsAdmin(admin.ModelAdmin):
+    list_display = ('import_analytics', 'chunk_index', 'first_row', 'row_count', 'read_time', 'clean_time', 'validate_time', 'upsert_time', 'log_time', 'transaction_time', 'rows_per_second', 'peak_rss', 'next_chunk_size')
+    list_filter = ('import_analytics',)
+
+
+@admin.register(ImportIssueSummary)
+class ImportIssueSummaryAdmin(admin.ModelAdmin):
+    list_display = ('import_analytics', 'chunk_index', 'level', 'code', 'field', 'row_count', 'rows')
+    search_fields = ('code', 'field')
+    list_filter = ('level', 'code')
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ('upload_id', 'file_name', 'status', 'offset', 'total_size', 'import_analytics', 'created_at')
+    search_fields = ('file_name', 'upload_id')
+    list_filter = ('status', 'created_at')
+
     
 
 @admin.register(Logs)
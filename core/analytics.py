@@ -0,0 +1,102 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from core.models import ImportAnalytics
+from core.utils import DatabaseLogger
+
+IMPORT_SUMMARY_CACHE_KEY = 'import-analytics-summary'
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def compute_import_summary():
+    """
+    Aggregate the ImportAnalytics records: imports per status, row totals, the
+    overall success and failure rates, the throughput of the finished imports and
+    a daily series over the last IMPORT_SUMMARY_DAYS days.
+    """
+    status_counts = {status: 0 for status, _ in ImportAnalytics.STATUS_CHOICES}
+    for row in ImportAnalytics.objects.values('status').annotate(count=Count('id')).order_by():
+        status_counts[row['status']] = row['count']
+
+    totals = ImportAnalytics.objects.aggregate(
+        total_records=Sum('total_records', default=0),
+        success_count=Sum('success_count', default=0),
+        warning_count=Sum('warning_count', default=0),
+        failure_count=Sum('failure_count', default=0),
+        unchanged_count=Sum('unchanged_count', default=0),
+    )
+    # Rows per second across the finished imports, weighted by their size
+    throughput = ImportAnalytics.objects.exclude(status='processing').filter(time_taken__gt=0).aggregate(
+        rows=Sum('total_records', default=0),
+        seconds=Sum('time_taken', default=0),
+    )
+
+    since = timezone.now() - timedelta(days=settings.IMPORT_SUMMARY_DAYS)
+    daily = (
+        ImportAnalytics.objects.filter(start_time__gte=since)
+        .annotate(day=TruncDate('start_time'))
+        .values('day')
+        .annotate(
+            imports=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            failed=Count('id', filter=Q(status='failed')),
+            total_records=Sum('total_records', default=0),
+            success_count=Sum('success_count', default=0),
+            failure_count=Sum('failure_count', default=0),
+        )
+        .order_by('day')
+    )
+
+    return {
+        'total_imports': sum(status_counts.values()),
+        'by_status': status_counts,
+        **totals,
+        'success_rate': _rate(totals['success_count'], totals['total_records']),
+        'failure_rate': _rate(totals['failure_count'], totals['total_records']),
+        'average_rows_per_second': round(throughput['rows'] / throughput['seconds'], 2) if throughput['seconds'] else None,
+        'daily': [
+            {
+                **row,
+                'day': row['day'].isoformat(),
+                'success_rate': _rate(row['success_count'], row['total_records']),
+                'failure_rate': _rate(row['failure_count'], row['total_records']),
+            }
+            for row in daily
+        ],
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_import_summary():
+    """
+    Return the cached import summary, computing and caching it only when the
+    cache is empty (first request or after an eviction)
+    """
+    summary = cache.get(IMPORT_SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = compute_import_summary()
+        cache.set(IMPORT_SUMMARY_CACHE_KEY, summary, timeout=None)
+    return summary
+
+
+def refresh_import_summary():
+    """
+    Recompute the cached summary, called whenever an import is created or reaches
+    its final status so readers of the summary never run the aggregation themselves.
+    A cache outage is logged and doesn't fail the import.
+    """
+    try:
+        cache.set(IMPORT_SUMMARY_CACHE_KEY, compute_import_summary(), timeout=None)
+    except Exception as e:
+        DatabaseLogger.log(
+            level="WARNING",
+            message=f"Could not refresh the cached import summary: {str(e)}",
+            task_name="import-summary",
+            error=e
+        )
@@ -0,0 +1,175 @@
+import os
+import time
+import tracemalloc
+from django.conf import settings
+from django.db import transaction
+from core.cleaning import clean_chunk
+from core.processing import process_excel_data
+from core.readers import open_chunk_reader
+from core.utils import DatabaseLogger
+from core.validation import validate_cleaned_chunk
+from core.writers import get_product_writer
+
+
+# Stages timed by run_stage_benchmark, in pipeline order
+STAGES = ('read', 'clean', 'validate', 'upsert', 'log')
+
+BENCHMARK_TASK_NAME = 'import_benchmark'
+
+
+def ensure_fixture(fixtures_dir, rows, file_format='csv'):
+    """
+    Return the path of a product feed with `rows` rows, generating it on first use.
+
+    Fixtures come from generate_large_excel, which seeds Faker and random, so the
+    same row count always produces the same file.
+    """
+    # Imported here, Faker is only needed when a fixture has to be generated
+    from generate_large_excel import generate_csv, generate_excel
+
+    extension = 'csv' if file_format == 'csv' else 'xlsx'
+    os.makedirs(fixtures_dir, exist_ok=True)
+    file_path = os.path.join(fixtures_dir, f'product_data_{rows}.{extension}')
+    if not os.path.exists(file_path):
+        if file_format == 'csv':
+            generate_csv(num_rows=rows, output_file=file_path)
+        else:
+            generate_excel(num_rows=rows, output_file=file_path)
+    return file_path
+
+
+class StageResult:
+    """
+    Accumulated measurements of one stage.
+
+    seconds is the total time spent in the stage and peak_memory the largest
+    amount of memory (bytes, as seen by tracemalloc) allocated by a single call.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_memory = 0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'rows': self.rows,
+            'seconds': round(self.seconds, 4),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'peak_memory_mb': round(self.peak_memory / (1024 * 1024), 2),
+        }
+
+
+class _StageTimer:
+    """Measure one call of a stage into its StageResult"""
+
+    def __init__(self, result, trace_memory):
+        self.result = result
+        self.trace_memory = trace_memory
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.result.seconds += time.perf_counter() - self.start_time
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] - self.start_memory
+            self.result.peak_memory = max(self.result.peak_memory, peak)
+        return False
+
+
+def run_stage_benchmark(file_path, write_engine=None, chunksize=None, trace_memory=True):
+    """
+    Run the import stages chunk by chunk and measure each one separately.
+
+    The stages are the ones process_excel_data goes through: reading a chunk from
+    the file, column-wise cleaning, serializer validation, the Product upsert and
+    writing the collected log records. Memory tracing slows every stage down, pass
+    trace_memory=False for timings closer to production.
+
+    Returns:
+        list of StageResult, in the order of STAGES
+    """
+    chunksize = chunksize or settings.CHUNKSIZE
+    results = {name: StageResult(name) for name in STAGES}
+    product_writer = get_product_writer(write_engine, BENCHMARK_TASK_NAME)
+
+    if trace_memory:
+        tracemalloc.start()
+    DatabaseLogger.start_buffering()
+    data_reader = open_chunk_reader(file_path, chunksize)
+    try:
+        chunks = iter(data_reader)
+        chunk_index = 0
+        while True:
+            with _StageTimer(results['read'], trace_memory):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            row_count = len(chunk)
+            results['read'].rows += row_count
+
+            with _StageTimer(results['clean'], trace_memory):
+                cleaned_chunk = clean_chunk(chunk, settings.DEFAULT_CURRENCY)
+            results['clean'].rows += row_count
+
+            with _StageTimer(results['validate'], trace_memory):
+                validated_chunk = validate_cleaned_chunk(cleaned_chunk, chunk_index * chunksize)
+            results['validate'].rows += row_count - cleaned_chunk.failure_count
+
+            records = validated_chunk.valid_records
+            with _StageTimer(results['upsert'], trace_memory):
+                with transaction.atomic():
+                    product_writer.write(records)
+            results['upsert'].rows += len(records)
+
+            # Rows are counted as log records here, not as feed rows
+            with _StageTimer(results['log'], trace_memory):
+                for level, message in validated_chunk.log_entries:
+                    DatabaseLogger.log(level=level, message=message, task_name=BENCHMARK_TASK_NAME)
+                DatabaseLogger.flush()
+            results['log'].rows += len(validated_chunk.log_entries)
+
+            del chunk, cleaned_chunk, validated_chunk, records
+            chunk_index += 1
+    finally:
+        data_reader.close()
+        DatabaseLogger.stop_buffering()
+        if trace_memory:
+            tracemalloc.stop()
+
+    return [results[name] for name in STAGES]
+
+
+def run_end_to_end_benchmark(file_path, write_engine=None, pipeline_workers=None, trace_memory=True):
+    """
+    Run process_excel_data on a file and measure it as a whole.
+
+    Memory of pipeline worker processes is not included in peak_memory.
+
+    Returns:
+        (StageResult, dict) the measurement and the result of process_excel_data
+    """
+    result = StageResult('end_to_end')
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with _StageTimer(result, trace_memory):
+            import_result = process_excel_data(
+                file_path, write_engine=write_engine, pipeline_workers=pipeline_workers
+            )
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    result.rows = import_result.get('total_records', 0)
+    return result, import_result
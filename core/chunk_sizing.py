@@ -0,0 +1,54 @@
+class ChunkSizer:
+    """
+    Chooses the number of rows read for the next chunk of an import.
+
+    With adaptive=False the size stays fixed. Otherwise observe() is called after every
+    chunk and the size is moved towards the number of rows that takes target_time
+    seconds at the measured per-row rate, by at most a factor of 2 per chunk and within
+    [min_size, max_size]. A transaction running longer than max_transaction_time caps
+    the size at what would have fit, and an RSS above max_rss halves it.
+    """
+
+    def __init__(self, initial_size, min_size, max_size, target_time, max_transaction_time, max_rss,
+                 adaptive=True):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_time = target_time
+        self.max_transaction_time = max_transaction_time
+        self.max_rss = max_rss
+        self.adaptive = adaptive
+        self.size = initial_size if not adaptive else self._clamp(initial_size)
+
+    def _clamp(self, size):
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    def observe(self, row_count, chunk_time, transaction_time, rss):
+        """
+        Adjust the size from a finished chunk.
+
+        Params:
+            row_count (int): Rows in the chunk
+            chunk_time (float): Seconds spent on the chunk across all stages
+            transaction_time (float): Seconds the chunk's write transaction was open
+            rss (int): Peak resident set size in bytes seen during the chunk
+        Returns:
+            The size for the next chunk
+        """
+        if not self.adaptive or row_count <= 0:
+            return self.size
+
+        # Rows that would take target_time at this chunk's rate, the last chunk of a
+        # file is usually short so the rate is used rather than its size
+        if chunk_time > 0:
+            new_size = self.target_time * row_count / chunk_time
+        else:
+            new_size = self.size * 2
+        new_size = max(self.size / 2, min(self.size * 2, new_size))
+
+        if transaction_time > self.max_transaction_time:
+            new_size = min(new_size, self.max_transaction_time * row_count / transaction_time)
+        if rss > self.max_rss:
+            new_size = min(new_size, self.size / 2)
+
+        self.size = self._clamp(new_size)
+        return self.size
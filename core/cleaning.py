@@ -0,0 +1,346 @@
+import json
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from core.models import Product
+
+
+# Mandatory fields, checked on the raw values before any cleaning
+REQUIRED_FIELDS = [
+    'id', 'title', 'description', 'link', 'image_link',
+    'availability', 'price', 'condition', 'brand', 'gtin'
+]
+
+# Fields whose absence is reported as a warning once the row validates
+RECOMMENDED_FIELDS = [
+    'description', 'link', 'image_link', 'availability',
+    'condition', 'brand', 'gtin',
+    'sale_price', 'item_group_id', 'google_product_category',
+    'product_type', 'shipping', 'additional_image_links',
+    'size', 'color', 'material', 'pattern', 'gender', 'model'
+]
+
+DIMENSION_FIELDS = ['product_length', 'product_width', 'product_height', 'product_weight']
+
+# Feed column names that differ from the Product model fields
+COLUMN_RENAMES = {
+    'id': 'product_id',
+    'shipping(country:price)': 'shipping',
+    'Model': 'model',
+}
+
+TRUTHY_VALUES = ['true', 't', 'yes', 'y', '1']
+FALSY_VALUES = ['false', 'f', 'no', 'n', '0']
+
+# First characters a stripped string can start with and still be valid JSON
+JSON_START_CHARACTERS = tuple('[{"-0123456789tfnNI')
+
+
+class ChunkIssue:
+    """
+    One kind of problem found while cleaning a chunk, with every row it affects.
+
+    `positions` are row positions inside the chunk and `details` holds the text
+    substituted for {detail} in the message template for each of those rows.
+    """
+
+    def __init__(self, level, code, field, positions, details, template):
+        self.level = level
+        self.code = code
+        self.field = field
+        self.positions = positions
+        self.details = details
+        self.template = template
+
+    def __len__(self):
+        return len(self.positions)
+
+    def messages(self, row_offset):
+        """Render the per-row log messages, numbering rows from row_offset + 1"""
+        prefix, _, suffix = self.template.partition('{detail}')
+        row_numbers = pd.Series(self.positions + row_offset + 1).astype(str)
+        details = pd.Series(self.details, dtype=object).astype(str)
+        return ('Row ' + row_numbers + ': ' + prefix + details.to_numpy() + suffix).tolist()
+
+
+class CleanedChunk:
+    """
+    Output of clean_chunk.
+
+    Attributes:
+        data (DataFrame): Cleaned columns named after the Product fields. None marks
+            a value that was dropped during cleaning and must not reach the serializer.
+        failed (ndarray): Boolean mask of rows rejected during cleaning
+        issues (list): ChunkIssue objects in the order they should be logged
+        missing_recommended (Series): Comma separated missing recommended fields per row
+    """
+
+    def __init__(self, data, failed, issues, missing_recommended):
+        self.data = data
+        self.failed = failed
+        self.issues = issues
+        self.missing_recommended = missing_recommended
+
+    @property
+    def failure_count(self):
+        return int(self.failed.sum())
+
+    @property
+    def warning_count(self):
+        return sum(len(issue) for issue in self.issues if issue.level == "WARNING")
+
+    def records(self):
+        """
+        Yield (position, row dict) for each row that passed cleaning, without dropped
+        values. The dicts are built one at a time for the serializer, not for the chunk.
+        """
+        valid = self.data[~self.failed]
+        columns = list(valid.columns)
+        positions = np.flatnonzero(~self.failed)
+
+        for position, values in zip(positions, valid.itertuples(index=False, name=None)):
+            yield position, {
+                column: value for column, value in zip(columns, values) if value is not None
+            }
+
+
+def _join_flagged_columns(flags):
+    """For every row, join the names of the columns flagged True with ', '"""
+    joined = np.full(len(flags), '', dtype=object)
+    for column in flags.columns:
+        joined = joined + np.where(flags[column].to_numpy(), column + ', ', '')
+    return pd.Series(joined, index=flags.index).str[:-2]
+
+
+def _make_issue(level, code, field, mask, details, template):
+    positions = np.flatnonzero(mask)
+    if not len(positions):
+        return None
+    return ChunkIssue(level, code, field, positions, np.asarray(details, dtype=object)[positions], template)
+
+
+def _parse_amounts(values, default_currency):
+    """
+    Split '123.45 EUR' style strings into a float amount and a currency code.
+    Amounts that cannot be parsed come back as NaN.
+    """
+    parts = values.str.partition(' ')
+    has_currency = parts[1] != ''
+    amounts = pd.to_numeric(parts[0].str.replace(',', '.', regex=False), errors='coerce')
+    currencies = parts[2].where(has_currency, default_currency)
+    return amounts.astype(float), currencies
+
+
+def _typed_amounts(values, currencies, default_currency):
+    """
+    Amounts of a numeric column (Parquet/Feather feeds) need no parsing, their currency
+    comes from the matching currency column when the feed has one
+    """
+    if currencies is None:
+        currencies = pd.Series(default_currency, index=values.index)
+    else:
+        currencies = currencies.astype(object).where(currencies.notna() & (currencies != ''), default_currency)
+    return values.astype(float), currencies
+
+
+def _encode_image_links(values):
+    """
+    Convert comma separated links to a JSON list, leaving values that already
+    are valid JSON untouched
+    """
+    encoded = values.copy()
+
+    # Plain URL lists can be encoded with string operations alone; anything that
+    # needs JSON escaping or might already be JSON goes through the json module
+    needs_json = values.str.startswith(JSON_START_CHARACTERS) | values.str.contains(r'[^\x20-\x7e]|["\\]', regex=True)
+    simple = values[~needs_json]
+    encoded[~needs_json] = '["' + simple.str.replace(r' *, *', '", "', regex=True) + '"]'
+
+    for index, value in values[needs_json].items():
+        try:
+            json.loads(value)
+        except (ValueError, TypeError):
+            encoded[index] = json.dumps([link.strip() for link in value.split(',')])
+    return encoded
+
+
+def clean_chunk(chunk, default_currency):
+    """
+    Clean a chunk of raw string values column by column.
+
+    Applies the same rules the import has always used (required fields, stripping,
+    column renames, price/sale_price parsing, is_bundle and max_handling_time
+    conversion, URL checks and unknown column removal) on whole columns at once.
+
+    Params:
+        chunk (DataFrame): Raw chunk as produced by the readers, all values strings
+        default_currency (str): Currency used when a price has no currency code
+    Returns:
+        CleanedChunk
+    """
+    chunk = chunk.reset_index(drop=True)
+    row_count = len(chunk)
+    issues = []
+
+    # Missing mandatory fields are checked on the raw values, before stripping
+    missing_required = pd.DataFrame(
+        {
+            field: (chunk[field].isna() | (chunk[field] == '')) if field in chunk.columns else np.ones(row_count, dtype=bool)
+            for field in REQUIRED_FIELDS
+        },
+        index=chunk.index,
+    )
+    failed = missing_required.any(axis=1).to_numpy()
+    issues.append(_make_issue(
+        "ERROR", 'missing_required_fields', None, failed,
+        _join_flagged_columns(missing_required), "Missing required fields: {detail}"
+    ))
+
+    # Numeric price columns of Parquet/Feather feeds are the only non-text columns
+    data = pd.DataFrame(
+        {
+            column: chunk[column].str.strip() if chunk[column].dtype == object else chunk[column]
+            for column in chunk.columns
+        },
+        index=chunk.index,
+    )
+
+    for source, target in COLUMN_RENAMES.items():
+        if source in data.columns:
+            if target in data.columns:
+                data = data.drop(columns=target)
+            data = data.rename(columns={source: target})
+
+    # Handle JSONField for additional_image_links
+    if 'additional_image_links' in data.columns:
+        links = data['additional_image_links']
+        present = links != ''
+        data.loc[present, 'additional_image_links'] = _encode_image_links(links[present])
+
+    # Price is critical, rows with an unparsable price are rejected
+    price_text = data['price'] if 'price' in data.columns else pd.Series('', index=data.index)
+    if is_numeric_dtype(price_text):
+        prices, currencies = _typed_amounts(price_text, data.get('currency'), default_currency)
+    else:
+        prices, currencies = _parse_amounts(price_text, default_currency)
+    invalid_price = prices.isna().to_numpy() & ~failed
+    issues.append(_make_issue(
+        "ERROR", 'invalid_price', 'price', invalid_price,
+        price_text, "Invalid critical price format: {detail}"
+    ))
+    failed = failed | invalid_price
+    data['price'] = prices.astype(object)
+    data['currency'] = currencies.astype(object)
+
+    # sale_price is not critical, unparsable values are dropped with a warning
+    if 'sale_price' in data.columns:
+        sale_price_text = data['sale_price']
+        if is_numeric_dtype(sale_price_text):
+            present = sale_price_text.notna().to_numpy()
+            sale_prices, sale_currencies = _typed_amounts(
+                sale_price_text, data.get('sale_price_currency'), default_currency
+            )
+        else:
+            present = (sale_price_text != '').to_numpy()
+            sale_prices, sale_currencies = _parse_amounts(sale_price_text, default_currency)
+        parsed = present & sale_prices.notna().to_numpy()
+        invalid_sale_price = present & ~parsed
+
+        issues.append(_make_issue(
+            "WARNING", 'invalid_sale_price', 'sale_price', invalid_sale_price & ~failed,
+            sale_price_text, "Invalid sale_price format: {detail}. It will be omitted."
+        ))
+        if 'sale_price_currency' not in data.columns:
+            data['sale_price_currency'] = None
+        data['sale_price'] = sale_price_text.astype(object).mask(parsed, sale_prices.astype(object))
+        data['sale_price_currency'] = data['sale_price_currency'].astype(object).mask(parsed, sale_currencies)
+        data.loc[invalid_sale_price, ['sale_price', 'sale_price_currency']] = None
+        if is_numeric_dtype(sale_price_text):
+            # A null sale price means there is none, like an empty cell
+            data.loc[~present, 'sale_price'] = None
+
+    # Handling Boolean Field for is_bundle, unrecognised values are left for the serializer
+    if 'is_bundle' in data.columns:
+        lowered = data['is_bundle'].str.lower()
+        data['is_bundle'] = (
+            data['is_bundle'].astype(object)
+            .mask(lowered.isin(TRUTHY_VALUES), True)
+            .mask(lowered.isin(FALSY_VALUES), False)
+        )
+
+    processed_optional = pd.DataFrame(index=data.index)
+
+    # Handle max_handling_time (should be an integer), invalid values are dropped
+    if 'max_handling_time' in data.columns:
+        handling_time = data['max_handling_time']
+        present = (handling_time != '').to_numpy()
+        is_integer = handling_time.str.fullmatch(r'[+-]?[0-9]+').to_numpy() & present
+        invalid_handling_time = present & ~is_integer
+
+        issues.append(_make_issue(
+            "INFO", 'invalid_max_handling_time', 'max_handling_time', invalid_handling_time & ~failed,
+            handling_time, "Invalid max_handling_time format: {detail}. Field will be omitted."
+        ))
+        converted = handling_time.astype(object)
+        converted[is_integer] = pd.to_numeric(handling_time[is_integer]).astype('int64').astype(object)
+        converted[invalid_handling_time] = None
+        data['max_handling_time'] = converted
+        processed_optional['max_handling_time'] = is_integer
+
+    # Validate lifestyle_image_link (should be a URL), invalid values are dropped
+    if 'lifestyle_image_link' in data.columns:
+        lifestyle_link = data['lifestyle_image_link']
+        present = (lifestyle_link != '').to_numpy()
+        is_url = lifestyle_link.str.match(r'https?://.+').to_numpy() & present
+        invalid_link = present & ~is_url
+
+        issues.append(_make_issue(
+            "INFO", 'invalid_lifestyle_image_link', 'lifestyle_image_link', invalid_link & ~failed,
+            lifestyle_link, "Invalid lifestyle_image_link format: {detail}. Field will be omitted."
+        ))
+        data['lifestyle_image_link'] = lifestyle_link.astype(object).mask(invalid_link, None)
+        processed_optional['lifestyle_image_link'] = is_url
+
+    # Dimension fields are stored as strings, they only need to be present
+    for dimension_field in DIMENSION_FIELDS:
+        if dimension_field in data.columns:
+            processed_optional[dimension_field] = (data[dimension_field] != '').to_numpy()
+
+    if len(processed_optional.columns):
+        processed_optional_names = _join_flagged_columns(processed_optional)
+        issues.append(_make_issue(
+            "INFO", 'optional_fields_processed', None,
+            (processed_optional_names != '').to_numpy() & ~failed,
+            processed_optional_names, "Successfully processed optional fields: {detail}"
+        ))
+
+    # Check for recommended fields
+    missing_recommended = pd.DataFrame(
+        {
+            field: (
+                (data[field].isna() | (data[field] == '') | (data[field] == 0)).to_numpy()
+                if field in data.columns else np.ones(row_count, dtype=bool)
+            )
+            for field in RECOMMENDED_FIELDS
+        },
+        index=data.index,
+    )
+
+    # Check for unknown fields not in the model
+    model_fields = [f.name for f in Product._meta.get_fields() if hasattr(f, 'name')]
+    model_fields.extend(['product_id'])  # 'id' mapped to 'product_id'
+    unknown_fields = [column for column in data.columns if column not in model_fields]
+    if unknown_fields:
+        issues.append(_make_issue(
+            "WARNING", 'unknown_fields', None, ~failed,
+            np.full(row_count, ', '.join(unknown_fields), dtype=object),
+            "Unknown fields will be ignored: {detail}"
+        ))
+        data = data.drop(columns=unknown_fields)
+
+    return CleanedChunk(
+        data=data,
+        failed=failed,
+        issues=[issue for issue in issues if issue is not None],
+        missing_recommended=_join_flagged_columns(missing_recommended),
+    )
@@ -0,0 +1,291 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from core.chunk_sizing import ChunkSizer
+from core.issues import MAX_SAMPLES
+from core.pipeline import get_chunk_validator, read_next_chunk
+from core.readers import (
+    ARROW_EXTENSIONS, ArrowChunkReader, estimate_row_count, open_chunk_reader, read_csv_records_at,
+)
+from core.validation import validate_chunk
+
+# Example row numbers kept per issue in the report
+MAX_EXAMPLE_ROWS = 5
+
+# Report ordering of the issue levels
+LEVEL_ORDER = {'ERROR': 0, 'WARNING': 1, 'INFO': 2}
+# CSV samples are read by seeking once the file has this many times more rows than the
+# sample, smaller files are read whole for an exact sample
+SEEK_SAMPLE_FACTOR = 4
+# Rounds of random offsets drawn to fill a CSV sample, offsets can land in the same record
+SEEK_SAMPLE_ROUNDS = 4
+
+
+class DryRunReport:
+    """
+    Totals and issues of a dry run, aggregated per level, code and field.
+    Each issue keeps its row count, the first few row numbers and a few sample values.
+    """
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_validated = 0
+        self.failure_count = 0
+        self.warning_count = 0
+        self.issues = {}
+        # Set when the sample was read by seeking: rows_read and the example row numbers are estimates
+        self.rows_estimated = False
+
+    def add(self, validated_chunk, row_numbers=None):
+        """
+        Add a chunk validated with summarize_errors. row_numbers maps the chunk's row
+        numbers (1-based) to file row numbers when the chunk is a sample of the file.
+        """
+        self.rows_validated += validated_chunk.row_count
+        self.failure_count += validated_chunk.failure_count
+        self.warning_count += validated_chunk.warning_count
+
+        for summary in validated_chunk.issue_summaries:
+            rows = summary.rows
+            if row_numbers is not None:
+                rows = row_numbers[np.asarray(rows, dtype=np.int64) - 1].tolist()
+            issue = self.issues.setdefault((summary.level, summary.code, summary.field), {
+                'count': 0, 'example_rows': [], 'samples': [],
+            })
+            issue['count'] += len(rows)
+            issue['example_rows'].extend(rows[:MAX_EXAMPLE_ROWS - len(issue['example_rows'])])
+            for sample in summary.samples:
+                if len(issue['samples']) < MAX_SAMPLES and sample not in issue['samples']:
+                    issue['samples'].append(sample)
+
+    def as_dict(self):
+        error_rate = self.failure_count / self.rows_validated if self.rows_validated else 0.0
+        # Sampled runs extrapolate their counts to the rows read
+        scale = self.rows_read / self.rows_validated if self.rows_validated else 0.0
+        issues = [
+            {
+                'level': level,
+                'code': code,
+                'field': field,
+                'count': issue['count'],
+                'estimated_count': round(issue['count'] * scale),
+                'example_rows': issue['example_rows'],
+                'samples': issue['samples'],
+            }
+            for (level, code, field), issue in self.issues.items()
+        ]
+        issues.sort(key=lambda issue: (LEVEL_ORDER.get(issue['level'], len(LEVEL_ORDER)), -issue['count']))
+        return {
+            'rows_read': self.rows_read,
+            'rows_estimated': self.rows_estimated,
+            'rows_validated': self.rows_validated,
+            'valid_rows': self.rows_validated - self.failure_count,
+            'failed_rows': self.failure_count,
+            'warning_count': self.warning_count,
+            'error_rate': round(error_rate, 4),
+            'estimated_failed_rows': round(error_rate * self.rows_read),
+            'issues': issues,
+        }
+
+
+def _validate_all(data_reader, report, pipeline_workers):
+    """Validate every row, on the import pipeline's worker processes when configured"""
+    chunk_sizer = ChunkSizer(
+        settings.CHUNKSIZE,
+        min_size=settings.IMPORT_CHUNKSIZE_MIN,
+        max_size=settings.IMPORT_CHUNKSIZE_MAX,
+        target_time=settings.IMPORT_CHUNK_TARGET_TIME,
+        max_transaction_time=settings.IMPORT_CHUNK_MAX_TRANSACTION_TIME,
+        max_rss=settings.IMPORT_CHUNK_MAX_RSS,
+        adaptive=False,
+    )
+    chunk_validator = get_chunk_validator(
+        data_reader, chunk_sizer, settings.DEFAULT_CURRENCY,
+        workers=pipeline_workers,
+        queue_size=settings.IMPORT_PIPELINE_QUEUE_SIZE,
+        summarize_errors=True,
+    )
+    try:
+        for validated_chunk in chunk_validator:
+            report.rows_read += validated_chunk.row_count
+            report.add(validated_chunk)
+    finally:
+        chunk_validator.close()
+
+
+def _validate_every(data_reader, report, sample_every):
+    """Validate rows 1, 1 + k, 1 + 2k, ... of the file"""
+    row_offset = 0
+    while (chunk := read_next_chunk(data_reader, settings.CHUNKSIZE)) is not None:
+        positions = np.flatnonzero((np.arange(row_offset, row_offset + len(chunk)) % sample_every) == 0)
+        if len(positions):
+            sample = chunk.iloc[positions]
+            report.add(
+                validate_chunk(sample, 0, settings.DEFAULT_CURRENCY, summarize_errors=True),
+                row_numbers=positions + row_offset + 1,
+            )
+        row_offset += len(chunk)
+        report.rows_read = row_offset
+
+
+def _validate_random(data_reader, report, sample_size, seed):
+    """
+    Validate sample_size rows drawn uniformly at random without replacement.
+
+    Every row gets a random key and the rows with the smallest keys are kept while
+    reading (a bottom-k sample), so the row count doesn't need to be known up front
+    and at most sample_size raw rows are held.
+    """
+    rng = np.random.default_rng(seed)
+    kept = None
+    row_offset = 0
+    while (chunk := read_next_chunk(data_reader, settings.CHUNKSIZE)) is not None:
+        candidates = chunk.reset_index(drop=True).assign(
+            _row=np.arange(row_offset + 1, row_offset + len(chunk) + 1),
+            _key=rng.random(len(chunk)),
+        )
+        if kept is not None and len(kept) >= sample_size:
+            candidates = candidates[candidates['_key'] < kept['_key'].max()]
+        kept = candidates if kept is None else pd.concat([kept, candidates], ignore_index=True)
+        kept = kept.nsmallest(sample_size, '_key')
+        row_offset += len(chunk)
+    report.rows_read = row_offset
+
+    if kept is None or not len(kept):
+        return
+    kept = kept.sort_values('_row')
+    row_numbers = kept['_row'].to_numpy()
+    sample = kept.drop(columns=['_row', '_key']).reset_index(drop=True)
+    report.add(validate_chunk(sample, 0, settings.DEFAULT_CURRENCY, summarize_errors=True), row_numbers=row_numbers)
+
+
+def _read_and_validate(file_path, report, mode, sample_size, sample_every, seed, pipeline_workers):
+    """Read the whole file, validating every row or only the sampled ones"""
+    with open_chunk_reader(file_path, settings.CHUNKSIZE) as data_reader:
+        if mode == 'random':
+            _validate_random(data_reader, report, sample_size, seed)
+        elif mode == 'every':
+            _validate_every(data_reader, report, sample_every)
+        else:
+            workers = settings.IMPORT_PIPELINE_WORKERS if pipeline_workers is None else pipeline_workers
+            _validate_all(data_reader, report, workers)
+
+
+def _validate_sample(sample, row_numbers, report):
+    if len(sample):
+        report.add(
+            validate_chunk(sample.reset_index(drop=True), 0, settings.DEFAULT_CURRENCY, summarize_errors=True),
+            row_numbers=np.asarray(row_numbers, dtype=np.int64),
+        )
+
+
+def _sample_arrow(file_path, report, sample_size, sample_every, seed):
+    """
+    Sample a Parquet or Feather file by row number, the row counts of its row groups
+    (record batches) are known up front and only the groups holding sampled rows are read
+    """
+    with ArrowChunkReader(file_path, settings.CHUNKSIZE) as data_reader:
+        total_rows = sum(data_reader.group_row_counts())
+        if sample_size:
+            rng = np.random.default_rng(seed)
+            rows = np.sort(rng.choice(total_rows, size=min(sample_size, total_rows), replace=False))
+        else:
+            rows = np.arange(0, total_rows, sample_every)
+        report.rows_read = total_rows
+        _validate_sample(data_reader.read_rows(rows), rows + 1, report)
+
+
+def _sample_csv(file_path, report, sample_size, sample_every, seed, estimated_rows):
+    """
+    Sample a CSV file by seeking to byte offsets, only the sampled records are read.
+
+    Random samples draw uniform offsets, every-k samples spread their offsets evenly over
+    the file. The record following an offset is sampled, so records after long ones are
+    slightly more likely to be drawn. Row numbers and the row count are estimated from
+    the average record length.
+    """
+    file_size = os.path.getsize(file_path)
+    sample, record_offsets, first_row_offset = read_csv_records_at(file_path, [])
+    if first_row_offset is None:
+        return
+    record_offsets = np.asarray(record_offsets, dtype=np.int64)
+
+    if sample_size:
+        rng = np.random.default_rng(seed)
+        for _ in range(SEEK_SAMPLE_ROUNDS):
+            missing = sample_size - len(record_offsets)
+            if missing <= 0:
+                break
+            records, offsets, _ = read_csv_records_at(
+                file_path, rng.integers(first_row_offset, file_size, size=missing),
+            )
+            new = ~np.isin(offsets, record_offsets)
+            sample = pd.concat([sample, records[new]], ignore_index=True)
+            record_offsets = np.concatenate([record_offsets, np.asarray(offsets, dtype=np.int64)[new]])
+        kept = np.sort(rng.choice(len(sample), size=min(sample_size, len(sample)), replace=False))
+        order = kept[np.argsort(record_offsets[kept], kind='stable')]
+        sample, record_offsets = sample.iloc[order], record_offsets[order]
+    else:
+        sample_count = -(-estimated_rows // sample_every)
+        offsets = first_row_offset + np.arange(sample_count) * (file_size - first_row_offset) // sample_count
+        sample, record_offsets, _ = read_csv_records_at(file_path, offsets)
+        record_offsets = np.asarray(record_offsets, dtype=np.int64)
+
+    report.rows_read = estimated_rows
+    report.rows_estimated = True
+    bytes_per_row = (file_size - first_row_offset) / estimated_rows
+    _validate_sample(sample, (record_offsets - first_row_offset) // bytes_per_row + 1, report)
+
+
+def dry_run_import(file_path, sample_size=None, sample_every=None, seed=None, pipeline_workers=None):
+    """
+    Clean and validate a feed like process_excel_data without writing products or logs.
+
+    Without sampling every row is validated. sample_size validates that many random
+    rows and sample_every every k-th row. Parquet and Feather files only read the row
+    groups holding the sampled rows. Large CSV files (SEEK_SAMPLE_FACTOR times more rows
+    than the sample) seek to the sampled records, their row count and row numbers are
+    then estimates (rows_estimated in the report). Other files are read whole and only
+    the sampled rows are cleaned and validated.
+
+    Params:
+        file_path (str): Path of the feed, any format open_chunk_reader supports
+        sample_size (int): Number of random rows to validate
+        sample_every (int): Validate every k-th row
+        seed (int): Seed of the random sample, for repeatable runs
+        pipeline_workers (int): Worker processes for a full run, defaults to IMPORT_PIPELINE_WORKERS
+    Returns:
+        dict with the row totals, the error rate (extrapolated to the whole file when
+        sampled) and the issues per level, code and field with example rows
+    """
+    start_time = time.time()
+    report = DryRunReport()
+    if sample_size:
+        mode = 'random'
+    elif sample_every:
+        mode = 'every'
+    else:
+        mode = 'full'
+
+    extension = os.path.splitext(file_path)[1].lower()
+    estimated_rows = estimate_row_count(file_path) if mode != 'full' and extension == '.csv' else None
+    sampled_rows = sample_size or (-(-estimated_rows // sample_every) if estimated_rows else 0)
+
+    if mode != 'full' and extension in ARROW_EXTENSIONS:
+        _sample_arrow(file_path, report, sample_size, sample_every, seed)
+    elif estimated_rows and estimated_rows > SEEK_SAMPLE_FACTOR * sampled_rows:
+        _sample_csv(file_path, report, sample_size, sample_every, seed, estimated_rows)
+    else:
+        _read_and_validate(file_path, report, mode, sample_size, sample_every, seed, pipeline_workers)
+
+    return {
+        'dry_run': True,
+        'file_name': os.path.basename(file_path),
+        'mode': mode,
+        'sample_size': sample_size,
+        'sample_every': sample_every,
+        **report.as_dict(),
+        'time_taken': time.time() - start_time,
+    }
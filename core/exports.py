@@ -0,0 +1,186 @@
+import csv
+import json
+import os
+import tempfile
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.db.models import DecimalField, Q
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from core.cleaning import COLUMN_RENAMES, REQUIRED_FIELDS
+from core.models import Product
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+# Bytes per read while streaming the finished workbook
+XLSX_STREAM_BLOCK_SIZE = 64 * 1024
+
+# Feed columns in the order they are exported, with the Product fields each is built
+# from. The names and formats are the ones the import reads, so an export re-imports as is
+EXPORT_COLUMNS = [
+    ('id', ('product_id',)),
+    ('title', ('title',)),
+    ('description', ('description',)),
+    ('link', ('link',)),
+    ('image_link', ('image_link',)),
+    ('availability', ('availability',)),
+    ('price', ('price', 'currency')),
+    ('condition', ('condition',)),
+    ('brand', ('brand',)),
+    ('gtin', ('gtin',)),
+    ('additional_image_links', ('additional_image_links',)),
+    ('shipping', ('shipping',)),
+    ('sale_price', ('sale_price', 'sale_price_currency')),
+    ('item_group_id', ('item_group_id',)),
+    ('google_product_category', ('google_product_category',)),
+    ('product_type', ('product_type',)),
+    ('size', ('size',)),
+    ('color', ('color',)),
+    ('material', ('material',)),
+    ('pattern', ('pattern',)),
+    ('gender', ('gender',)),
+    ('model', ('model',)),
+    ('product_length', ('product_length',)),
+    ('product_width', ('product_width',)),
+    ('product_height', ('product_height',)),
+    ('product_weight', ('product_weight',)),
+    ('lifestyle_image_link', ('lifestyle_image_link',)),
+    ('max_handling_time', ('max_handling_time',)),
+    ('is_bundle', ('is_bundle',)),
+]
+EXPORT_HEADER = [column for column, _ in EXPORT_COLUMNS]
+EXPORT_FIELDS = [field for _, fields in EXPORT_COLUMNS for field in fields]
+
+
+# Product fields behind the feed's mandatory columns
+REQUIRED_PRODUCT_FIELDS = [COLUMN_RENAMES.get(column, column) for column in REQUIRED_FIELDS]
+
+
+def exclude_incomplete(queryset):
+    """
+    Leave out products with a blank mandatory field. The import stores those when it
+    salvages a row by dropping an invalid value (e.g. an unknown availability), but
+    rejects a row with the field empty, so exporting them would break the round trip.
+    """
+    incomplete = Q()
+    for field_name in REQUIRED_PRODUCT_FIELDS:
+        field = Product._meta.get_field(field_name)
+        if field.null:
+            incomplete |= Q(**{f'{field_name}__isnull': True})
+        if not isinstance(field, DecimalField):
+            incomplete |= Q(**{field_name: ''})
+    return queryset.exclude(incomplete)
+
+
+def _format_amount(amount, currency):
+    """'12.50 EUR', the format the import parses prices from"""
+    if amount is None:
+        return ''
+    return f"{amount} {currency}" if currency else str(amount)
+
+
+def _format_value(value):
+    # NULL and blank share the empty cell, the import's content hash treats them alike
+    # so re-importing leaves either one in place
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+def export_rows(queryset):
+    """
+    Yield the feed rows of the products in `queryset` as lists of strings.
+
+    Rows are read as tuples through a server-side cursor in EXPORT_CHUNK_SIZE
+    batches, so memory stays flat whatever the number of products.
+    """
+    for values in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = []
+        position = 0
+        for _, fields in EXPORT_COLUMNS:
+            if len(fields) == 2:
+                row.append(_format_amount(values[position], values[position + 1]))
+            else:
+                row.append(_format_value(values[position]))
+            position += len(fields)
+        yield row
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes, so each row can be yielded"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Yield the CSV export line by line, starting with the header"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def _text_cell(sheet, value):
+    """Cell keeping a value that starts with '=' as text, openpyxl would store it as a formula"""
+    cell = WriteOnlyCell(sheet, value)
+    cell.data_type = 's'
+    return cell
+
+
+def stream_xlsx(queryset):
+    """
+    Yield the XLSX export in blocks.
+
+    Rows are appended to a write-only workbook, which spools them to a temporary
+    file instead of keeping cells in memory. The xlsx zip container is only complete
+    once the workbook is saved, so the bytes start after the last row is written.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Products')
+    sheet.append(EXPORT_HEADER)
+    for row in export_rows(queryset):
+        sheet.append([_text_cell(sheet, value) if value.startswith('=') else value for value in row])
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as export_file:
+            while block := export_file.read(XLSX_STREAM_BLOCK_SIZE):
+                yield block
+    finally:
+        os.remove(path)
+
+
+async def _batches_in_thread(iterator, batch_size):
+    """
+    Async generator of lists of up to batch_size items of a blocking iterator.
+
+    Each batch is pulled with a thread-sensitive sync_to_async call, so under the ASGI
+    app every step runs in the request's sync thread, on the connection holding the
+    server-side cursor, and the event loop is never blocked by a query or a write.
+    The iterator is closed when the client goes away.
+    """
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)), thread_sensitive=True)
+    try:
+        while batch := await next_batch():
+            yield batch
+    finally:
+        await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+async def astream_csv(queryset):
+    """stream_csv for the ASGI app, sending EXPORT_CHUNK_SIZE lines per block"""
+    async for lines in _batches_in_thread(stream_csv(queryset), EXPORT_CHUNK_SIZE):
+        yield ''.join(lines)
+
+
+async def astream_xlsx(queryset):
+    """stream_xlsx for the ASGI app, the workbook is written in the sync thread"""
+    async for blocks in _batches_in_thread(stream_xlsx(queryset), 1):
+        yield blocks[0]
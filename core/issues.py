@@ -0,0 +1,85 @@
+import numpy as np
+
+
+# Distinct example details kept per summary
+MAX_SAMPLES = 5
+
+
+def encode_row_ranges(rows):
+    """
+    Encode sorted row numbers compactly, consecutive rows become a range:
+    [3, 4, 5, 9, 11, 12] -> "3-5,9,11-12"
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if not len(rows):
+        return ""
+    # A run ends wherever the next row isn't the current one plus one
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+    return ','.join(
+        str(start) if start == end else f"{start}-{end}"
+        for start, end in zip(starts.tolist(), ends.tolist())
+    )
+
+
+def decode_row_ranges(text):
+    """Inverse of encode_row_ranges, returns the list of row numbers"""
+    rows = []
+    for part in filter(None, text.split(',')):
+        start, _, end = part.partition('-')
+        rows.extend(range(int(start), int(end or start) + 1))
+    return rows
+
+
+class IssueSummary:
+    """
+    All rows of a chunk sharing one kind of non-error diagnostic on one field.
+
+    `rows` are absolute row numbers in ascending order and `samples` holds a few
+    distinct details (offending values or validation messages) as examples.
+    """
+
+    def __init__(self, level, code, field, rows, samples=None):
+        self.level = level
+        self.code = code
+        self.field = field
+        self.rows = rows
+        self.samples = samples or []
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _distinct_samples(details):
+    samples = []
+    for detail in details:
+        detail = str(detail)
+        if detail not in samples:
+            samples.append(detail)
+            if len(samples) == MAX_SAMPLES:
+                break
+    return samples
+
+
+def summarize_issue(issue, row_offset):
+    """
+    Turn a ChunkIssue into IssueSummary objects, numbering rows from row_offset + 1.
+
+    An issue bound to one field becomes one summary with its details as samples.
+    Issues whose detail lists several fields (e.g. missing recommended fields) get
+    one summary per listed field, so every row stays attributed to each of its fields.
+    """
+    rows = np.asarray(issue.positions, dtype=np.int64) + row_offset + 1
+    if issue.field is not None:
+        return [IssueSummary(issue.level, issue.code, issue.field, rows.tolist(), _distinct_samples(issue.details))]
+
+    rows_by_field = {}
+    for row, detail in zip(rows.tolist(), issue.details):
+        for field in str(detail).split(', '):
+            if field:
+                rows_by_field.setdefault(field, []).append(row)
+    return [
+        IssueSummary(issue.level, issue.code, field, field_rows)
+        for field, field_rows in rows_by_field.items()
+    ]
@@ -0,0 +1,94 @@
+import json
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.benchmarks import ensure_fixture, run_end_to_end_benchmark, run_stage_benchmark
+from core.models import ImportAnalytics, Logs, Product
+from core.writers import WRITE_ENGINES
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the import on deterministic product feeds. Reports rows/second and "
+        "peak memory per stage (read, clean, validate, upsert, log) and, with --end-to-end, "
+        "for a full process_excel_data run. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help='Fixture sizes to benchmark')
+        parser.add_argument('--format', choices=['csv', 'excel'], default='csv',
+                            help='Fixture file format')
+        parser.add_argument('--fixtures-dir', default=os.path.join(settings.BASE_DIR, 'benchmark_fixtures'),
+                            help='Where generated fixtures are kept between runs')
+        parser.add_argument('--write-engine', choices=WRITE_ENGINES, default=None,
+                            help='Product write engine, defaults to IMPORT_WRITE_ENGINE')
+        parser.add_argument('--end-to-end', action='store_true',
+                            help='Also time complete process_excel_data runs')
+        parser.add_argument('--pipeline-workers', type=int, default=None,
+                            help='Validator processes for the end-to-end run, defaults to IMPORT_PIPELINE_WORKERS')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip memory tracing, which slows every stage down')
+        parser.add_argument('--keep-db', action='store_true',
+                            help='Reuse the test database between benchmark runs')
+        parser.add_argument('--output', default=None,
+                            help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        trace_memory = not options['no_memory']
+        fixtures = [
+            (rows, ensure_fixture(options['fixtures_dir'], rows, options['format']))
+            for rows in options['rows']
+        ]
+
+        # Same isolation as the test runner, the configured database is never written to
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=options['verbosity'], keepdb=options['keep_db'])
+        report = []
+        try:
+            self.stdout.write(f"Database: {connection.vendor}, chunk size {settings.CHUNKSIZE}")
+            for rows, file_path in fixtures:
+                self._reset_tables()
+                stages = run_stage_benchmark(
+                    file_path, write_engine=options['write_engine'], trace_memory=trace_memory
+                )
+                entry = {'rows': rows, 'file': file_path, 'stages': [stage.as_dict() for stage in stages]}
+                self._print_results(f"{rows} rows, per stage", stages)
+
+                if options['end_to_end']:
+                    self._reset_tables()
+                    end_to_end, import_result = run_end_to_end_benchmark(
+                        file_path,
+                        write_engine=options['write_engine'],
+                        pipeline_workers=options['pipeline_workers'],
+                        trace_memory=trace_memory,
+                    )
+                    if 'error' in import_result:
+                        raise CommandError(f"Import of {file_path} failed: {import_result['error']}")
+                    entry['end_to_end'] = end_to_end.as_dict()
+                    self._print_results(f"{rows} rows, end to end", [end_to_end])
+                report.append(entry)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=options['verbosity'], keepdb=options['keep_db'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _reset_tables(self):
+        """Every run starts from an empty database, otherwise re-imported rows would be skipped as unchanged"""
+        Product.objects.all().delete()
+        Logs.objects.all().delete()
+        ImportAnalytics.objects.all().delete()
+
+    def _print_results(self, title, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(f"  {'stage':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+        for result in results:
+            row = result.as_dict()
+            self.stdout.write(
+                f"  {row['stage']:<12}{row['rows']:>10}{row['seconds']:>10.2f}"
+                f"{row['rows_per_second']:>12.0f}{row['peak_memory_mb']:>10.1f}"
+            )
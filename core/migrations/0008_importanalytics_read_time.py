@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_importanalytics_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importanalytics',
+            name='read_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_importanalytics_read_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importanalytics',
+            name='unchanged_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-17 16:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_product_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportChunkStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_index', models.IntegerField()),
+                ('first_row', models.IntegerField()),
+                ('row_count', models.IntegerField()),
+                ('read_time', models.FloatField()),
+                ('clean_time', models.FloatField()),
+                ('validate_time', models.FloatField()),
+                ('upsert_time', models.FloatField()),
+                ('log_time', models.FloatField()),
+                ('rows_per_second', models.FloatField()),
+                ('peak_rss', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('import_analytics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunk_stats', to='core.importanalytics')),
+            ],
+            options={
+                'verbose_name': 'Import Chunk Stats',
+                'verbose_name_plural': 'Import Chunk Stats',
+                'ordering': ['import_analytics', 'first_row'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_importchunkstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importanalytics',
+            name='file_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='importanalytics',
+            name='task_id',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='importanalytics',
+            name='chunks_committed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importanalytics',
+            name='rows_committed',
+            field=models.IntegerField(default=0),
+        ),
+    ]
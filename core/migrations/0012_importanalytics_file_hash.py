@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_importanalytics_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importanalytics',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importchunkstats',
+            name='transaction_time',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importchunkstats',
+            name='next_chunk_size',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-17 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_importchunkstats_chunk_sizing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportIssueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_index', models.IntegerField()),
+                ('level', models.CharField(choices=[('DEBUG', 'DEBUG'), ('INFO', 'INFO'), ('WARNING', 'WARNING'), ('ERROR', 'ERROR'), ('CRITICAL', 'CRITICAL')], max_length=10)),
+                ('code', models.CharField(max_length=100)),
+                ('field', models.CharField(blank=True, default='', max_length=100)),
+                ('row_count', models.IntegerField()),
+                ('rows', models.TextField()),
+                ('samples', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('import_analytics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_summaries', to='core.importanalytics')),
+            ],
+            options={
+                'verbose_name': 'Import Issue Summary',
+                'verbose_name_plural': 'Import Issue Summaries',
+                'ordering': ['import_analytics', 'chunk_index', 'id'],
+            },
+        ),
+    ]
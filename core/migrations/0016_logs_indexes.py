@@ -0,0 +1,78 @@
+# Generated by Django 5.2 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+# Django's icontains compiles to UPPER(column::text) LIKE UPPER(...) on PostgreSQL,
+# so the trigram indexes are built on that expression
+TRIGRAM_INDEXES = {
+    'logs_task_name_trgm_idx': 'task_name',
+    'logs_message_trgm_idx': 'message',
+}
+
+
+# Django's own indexes of the (created_at, id) and (level, created_at, id) keysets
+BTREE_INDEXES = [
+    models.Index(fields=['-created_at', '-id'], name='logs_created_id_idx'),
+    models.Index(fields=['level', '-created_at', '-id'], name='logs_level_created_idx'),
+]
+
+
+def create_btree_indexes(apps, schema_editor):
+    """Built CONCURRENTLY on PostgreSQL, so logging goes on while the large table is indexed"""
+    Logs = apps.get_model('core', 'Logs')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in BTREE_INDEXES:
+        if concurrently:
+            schema_editor.add_index(Logs, index, concurrently=True)
+        else:
+            schema_editor.add_index(Logs, index)
+
+
+def drop_btree_indexes(apps, schema_editor):
+    Logs = apps.get_model('core', 'Logs')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in BTREE_INDEXES:
+        if concurrently:
+            schema_editor.remove_index(Logs, index, concurrently=True)
+        else:
+            schema_editor.remove_index(Logs, index)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+            f"ON core_logs USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, every index here is built that way on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_importissuesummary'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='logs', index=index) for index in BTREE_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_btree_indexes, drop_btree_indexes),
+            ],
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
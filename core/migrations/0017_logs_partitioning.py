@@ -0,0 +1,209 @@
+# Generated by Django 5.2 on 2026-10-17 18:02
+
+from datetime import datetime, time, timedelta, timezone
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Same expressions as migration 0016, repeated on the partitioned table
+TRIGRAM_INDEXES = {
+    'logs_task_name_trgm_idx': 'task_name',
+    'logs_message_trgm_idx': 'message',
+}
+LEGACY_TABLE = 'core_logs_legacy'
+# The existing rows become one partition ending at the start of the day this many days
+# ahead, the bound is fixed by the CHECK constraint and must not be reached by new log
+# rows before the partition is attached
+LEGACY_DAYS_AHEAD = 2
+# Named after the bound, e.g. core_logs_before_20261019, so a rerun finds it
+BOUND_CHECK_PREFIX = 'core_logs_before_'
+# Unique index matching the partitioned table's primary key, built without blocking writes
+PARTITION_KEY_INDEX = 'core_logs_id_created_at_uniq'
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).isoformat()
+
+
+def _create_indexes(schema_editor, Logs):
+    for index in Logs._meta.indexes:
+        schema_editor.add_index(Logs, index)
+    for index_name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} "
+            f"ON core_logs USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def _bound_check(schema_editor, table):
+    """Name and upper bound (a date) of the table's CHECK constraint on created_at, None when missing"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND conname LIKE %s",
+            [table, f"{BOUND_CHECK_PREFIX}%"],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return row[0], datetime.strptime(row[0][len(BOUND_CHECK_PREFIX):], '%Y%m%d').date()
+
+
+def add_bound_check(apps, schema_editor):
+    """
+    Add CHECK (created_at < bound) to core_logs as NOT VALID.
+
+    Only the catalog changes, existing rows aren't scanned: the ACCESS EXCLUSIVE lock
+    is held for milliseconds once the running queries on core_logs are done. New rows
+    are checked from then on.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    if _bound_check(schema_editor, 'core_logs') is not None:
+        return
+    bound = datetime.now(timezone.utc).date() + timedelta(days=LEGACY_DAYS_AHEAD)
+    schema_editor.execute(
+        f"ALTER TABLE core_logs ADD CONSTRAINT {BOUND_CHECK_PREFIX}{bound:%Y%m%d} "
+        f"CHECK (created_at < '{_day_start(bound)}') NOT VALID"
+    )
+
+
+def drop_bound_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    check = _bound_check(schema_editor, 'core_logs')
+    if check is not None:
+        schema_editor.execute(f"ALTER TABLE core_logs DROP CONSTRAINT {check[0]}")
+
+
+def validate_bound_check(apps, schema_editor):
+    """
+    Validate the CHECK constraint and build the unique (id, created_at) index, each in
+    its own transaction since the migration isn't atomic.
+
+    Both scan the whole table under a SHARE UPDATE EXCLUSIVE lock, which lets reads and
+    writes of logs go on. An index left invalid by an interrupted build is rebuilt.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    check = _bound_check(schema_editor, 'core_logs')
+    schema_editor.execute(f"ALTER TABLE core_logs VALIDATE CONSTRAINT {check[0]}")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [PARTITION_KEY_INDEX]
+        )
+        row = cursor.fetchone()
+    if row is not None and not row[0]:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY {PARTITION_KEY_INDEX}")
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {PARTITION_KEY_INDEX} ON core_logs (id, created_at)"
+    )
+
+
+def drop_partition_key_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {PARTITION_KEY_INDEX}")
+
+
+def partition_logs(apps, schema_editor):
+    """
+    Turn core_logs into a table range-partitioned by created_at.
+
+    The existing table is kept as is and attached as one partition holding every row
+    up to the bound of its validated CHECK constraint, a default partition catches rows
+    of days that have no partition yet and daily partitions are created from the bound
+    on. The primary key becomes (id, created_at) since a partitioned table's unique
+    constraints must include the partition key, ids still come from a single sequence.
+
+    The validated CHECK constraint proves the rows fit the partition and the index
+    built by validate_bound_check becomes the partition's primary key, so ATTACH
+    neither scans the table nor builds an index. Every statement here only changes the
+    catalog: core_logs is locked ACCESS EXCLUSIVE from the rename to the end of this
+    step's transaction, milliseconds once the running queries on it are done.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Logs = apps.get_model('core', 'Logs')
+    execute = schema_editor.execute
+    check_name, bound = _bound_check(schema_editor, 'core_logs')
+
+    execute(f"ALTER TABLE core_logs RENAME TO {LEGACY_TABLE}")
+    execute(f"ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT core_logs_pkey")
+    execute(
+        f"ALTER TABLE {LEGACY_TABLE} ADD CONSTRAINT {LEGACY_TABLE}_pkey "
+        f"PRIMARY KEY USING INDEX {PARTITION_KEY_INDEX}"
+    )
+    index_names = [index.name for index in Logs._meta.indexes] + list(TRIGRAM_INDEXES)
+    for index_name in index_names:
+        execute(f"ALTER INDEX IF EXISTS {index_name} RENAME TO {index_name}_legacy")
+
+    # Ids continue from the legacy table's sequence position
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {LEGACY_TABLE}")
+        next_id = cursor.fetchone()[0]
+    execute(f"ALTER TABLE {LEGACY_TABLE} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+    execute(f"ALTER TABLE {LEGACY_TABLE} ALTER COLUMN id DROP DEFAULT")
+    execute("DROP SEQUENCE IF EXISTS core_logs_id_seq")
+
+    execute(f"CREATE TABLE core_logs (LIKE {LEGACY_TABLE}) PARTITION BY RANGE (created_at)")
+    execute(f"CREATE SEQUENCE core_logs_id_seq START WITH {next_id} OWNED BY core_logs.id")
+    execute("ALTER TABLE core_logs ALTER COLUMN id SET DEFAULT nextval('core_logs_id_seq')")
+    execute("ALTER TABLE core_logs ADD CONSTRAINT core_logs_pkey PRIMARY KEY (id, created_at)")
+    _create_indexes(schema_editor, Logs)
+
+    # The legacy table's indexes match the parent's and are attached to them
+    execute(
+        f"ALTER TABLE core_logs ATTACH PARTITION {LEGACY_TABLE} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{_day_start(bound)}')"
+    )
+    # The partition constraint now guarantees the bound
+    execute(f"ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT {check_name}")
+    execute("CREATE TABLE core_logs_default PARTITION OF core_logs DEFAULT")
+    for offset in range(settings.LOGS_PARTITIONS_AHEAD):
+        day = bound + timedelta(days=offset)
+        execute(
+            f"CREATE TABLE core_logs_p{day:%Y%m%d} PARTITION OF core_logs "
+            f"FOR VALUES FROM ('{_day_start(day)}') TO ('{_day_start(day + timedelta(days=1))}')"
+        )
+
+
+def unpartition_logs(apps, schema_editor):
+    """Copy the partitioned rows back into a plain core_logs table"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Logs = apps.get_model('core', 'Logs')
+    execute = schema_editor.execute
+
+    execute("CREATE TABLE core_logs_unpartitioned (LIKE core_logs INCLUDING DEFAULTS)")
+    execute("INSERT INTO core_logs_unpartitioned SELECT * FROM core_logs")
+    execute("ALTER SEQUENCE core_logs_id_seq OWNED BY core_logs_unpartitioned.id")
+    execute("DROP TABLE core_logs")
+    execute("ALTER TABLE core_logs_unpartitioned RENAME TO core_logs")
+    execute("ALTER TABLE core_logs ADD CONSTRAINT core_logs_pkey PRIMARY KEY (id)")
+    _create_indexes(schema_editor, Logs)
+
+
+class Migration(migrations.Migration):
+    """
+    Partitioning in three steps so core_logs is never locked for a table scan: add the
+    CHECK constraint NOT VALID (brief ACCESS EXCLUSIVE lock), validate it and build the
+    primary key's index outside any transaction (SHARE UPDATE EXCLUSIVE, logging goes
+    on, takes as long as a scan of the table), then swap in the partitioned table and
+    attach the old one (brief ACCESS EXCLUSIVE lock, no scan). The migration must get
+    through the validation before the CHECK bound, LEGACY_DAYS_AHEAD days ahead, or
+    rows logged past it are rejected.
+    """
+    # VALIDATE and CREATE INDEX CONCURRENTLY run outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_logs_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_bound_check, drop_bound_check, atomic=True),
+        migrations.RunPython(validate_bound_check, drop_partition_key_index),
+        migrations.RunPython(partition_logs, unpartition_logs, atomic=True),
+    ]
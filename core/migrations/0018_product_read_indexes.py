@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+READ_INDEXES = [
+    models.Index(fields=['-updated_at', '-id'], name='product_updated_id_idx'),
+    models.Index(fields=['brand', '-updated_at', '-id'], name='product_brand_updated_idx'),
+    models.Index(fields=['availability', '-updated_at', '-id'], name='product_avail_updated_idx'),
+    models.Index(fields=['item_group_id', '-updated_at', '-id'], name='product_group_updated_idx'),
+    models.Index(fields=['condition', '-updated_at', '-id'], name='product_cond_updated_idx'),
+    models.Index(fields=['price'], name='product_price_idx'),
+]
+
+
+def create_read_indexes(apps, schema_editor):
+    """Built CONCURRENTLY on PostgreSQL, so imports keep writing products meanwhile"""
+    Product = apps.get_model('core', 'Product')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in READ_INDEXES:
+        if concurrently:
+            schema_editor.add_index(Product, index, concurrently=True)
+        else:
+            schema_editor.add_index(Product, index)
+
+
+def drop_read_indexes(apps, schema_editor):
+    Product = apps.get_model('core', 'Product')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in READ_INDEXES:
+        if concurrently:
+            schema_editor.remove_index(Product, index, concurrently=True)
+        else:
+            schema_editor.remove_index(Product, index)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0017_logs_partitioning'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='product', index=index) for index in READ_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_read_indexes, drop_read_indexes),
+            ],
+        ),
+    ]
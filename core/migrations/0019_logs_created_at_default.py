@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 19:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_product_read_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logs',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-17 19:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fail_duplicate_active_imports(apps, schema_editor):
+    """Keep the latest processing import of each file, the constraint allows only one"""
+    ImportAnalytics = apps.get_model('core', 'ImportAnalytics')
+    active = ImportAnalytics.objects.filter(status='processing').exclude(file_hash='')
+    latest_ids = {}
+    for import_id, file_hash in active.order_by('created_at', 'id').values_list('id', 'file_hash'):
+        latest_ids[file_hash] = import_id
+    active.exclude(id__in=latest_ids.values()).update(status='failed', end_time=django.utils.timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_logs_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importanalytics',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fail_duplicate_active_imports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='importanalytics',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('status', 'processing'), models.Q(('file_hash', ''), _negated=True)),
+                fields=('file_hash',),
+                name='importanalytics_active_file_hash',
+            ),
+        ),
+    ]
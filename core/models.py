@@ -1,4 +1,9 @@
+import hashlib
+import json
+import uuid
+from decimal import Decimal
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -16,7 +21,8 @@ class Logs(models.Model):
     message = models.TextField()
     task_name = models.CharField(max_length=255)
     traceback = models.TextField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the message is logged, DatabaseLogger's buffered records are inserted later
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f"{self.level} - {self.message} - {self.task_name}"
@@ -24,6 +30,18 @@ class Logs(models.Model):
     class Meta:
         verbose_name = 'Log'
         verbose_name_plural = 'Logs'
+        # Keyset pagination walks (created_at, id), level filters narrow it first. The trigram
+        # indexes for the substring filters are PostgreSQL only and created in migration 0016.
+        # On PostgreSQL the table is range-partitioned by day on created_at (migration 0017),
+        # partitions are created and expired by maintain_log_partitions_task
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='logs_created_id_idx'),
+            models.Index(fields=['level', '-created_at', '-id'], name='logs_level_created_idx'),
+        ]
+
+
+# Product fields that aren't feed content, left out of the content hash
+NON_CONTENT_FIELDS = ('id', 'content_hash', 'created_at', 'updated_at')
 
 
 class Product(models.Model):
@@ -81,6 +99,9 @@ class Product(models.Model):
     lifestyle_image_link = models.URLField(null=True, blank=True)
     max_handling_time = models.IntegerField(null=True, blank=True)
     is_bundle = models.BooleanField(default=False)
+    # SHA-256 of the product's content fields (see compute_content_hash),
+    # used to skip rows that haven't changed on re-import
+    content_hash = models.CharField(max_length=64, blank=True, default="")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -88,9 +109,55 @@ class Product(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def content_fields(cls):
+        """The fields a feed row sets, the ones content_hash covers"""
+        return [field for field in cls._meta.concrete_fields if field.name not in NON_CONTENT_FIELDS]
+
+    @classmethod
+    def compute_content_hash(cls, values):
+        """
+        SHA-256 of a product's content given as a dict holding every content field.
+        A blank string hashes like NULL, the export writes both as an empty cell,
+        and decimals are compared at the precision they are stored with.
+        """
+        normalized = {}
+        for field in cls.content_fields():
+            value = values.get(field.name)
+            if value == '':
+                value = None
+            elif value is not None and isinstance(field, models.DecimalField):
+                value = str(Decimal(str(value)).quantize(Decimal(1).scaleb(-field.decimal_places)))
+            normalized[field.name] = value
+        payload = json.dumps(normalized, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        # Keep the hash in step with edits made outside the importer, so the next import
+        # rewrites a product only when its row differs from what is stored
+        update_fields = kwargs.get('update_fields')
+        content_field_names = [field.name for field in self.content_fields()]
+        if update_fields is None or set(update_fields) & set(content_field_names):
+            self.content_hash = self.compute_content_hash(
+                {name: getattr(self, name) for name in content_field_names}
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'content_hash'}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
+        # The product API pages on (updated_at, id), each equality filter gets an index
+        # ending in the same keys so a filtered page is a single index range scan
+        indexes = [
+            models.Index(fields=['-updated_at', '-id'], name='product_updated_id_idx'),
+            models.Index(fields=['brand', '-updated_at', '-id'], name='product_brand_updated_idx'),
+            models.Index(fields=['availability', '-updated_at', '-id'], name='product_avail_updated_idx'),
+            models.Index(fields=['item_group_id', '-updated_at', '-id'], name='product_group_updated_idx'),
+            models.Index(fields=['condition', '-updated_at', '-id'], name='product_cond_updated_idx'),
+            models.Index(fields=['price'], name='product_price_idx'),
+        ]
 
 
 class ImportAnalytics(models.Model):
@@ -107,11 +174,25 @@ class ImportAnalytics(models.Model):
     success_count = models.IntegerField(default=0)
     warning_count = models.IntegerField(default=0)
     failure_count = models.IntegerField(default=0)
+    # Rows identical to the stored product, counted in success_count but not written
+    unchanged_count = models.IntegerField(default=0)
     time_taken = models.FloatField(null=True, blank=True)
+    # Seconds spent reading and parsing the source file, part of time_taken
+    read_time = models.FloatField(null=True, blank=True)
     status = models.CharField(
         max_length=100, choices=STATUS_CHOICES, default='processing')
+    # Checkpoint of an interrupted import: where the file lives, the Celery task that
+    # owns it and how many chunks/data rows are committed together with the counters above
+    file_path = models.CharField(max_length=500, blank=True, default="")
+    task_id = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    chunks_committed = models.IntegerField(default=0)
+    rows_committed = models.IntegerField(default=0)
+    # SHA-256 of the uploaded file, identical re-uploads reuse this import
+    file_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Moves with every committed chunk, a processing import that stopped moving is stale
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Import {self.id} - {self.file_name}"
@@ -119,3 +200,114 @@ class ImportAnalytics(models.Model):
     class Meta:
         verbose_name = 'Import Analytics'
         verbose_name_plural = 'Import Analytics'
+        constraints = [
+            # At most one running import per file, concurrent uploads of the same file
+            # can't both pass the duplicate check and start an import each
+            models.UniqueConstraint(
+                fields=['file_hash'],
+                condition=models.Q(status='processing') & ~models.Q(file_hash=''),
+                name='importanalytics_active_file_hash',
+            ),
+        ]
+
+
+class ImportChunkStats(models.Model):
+    """Timings and memory use of one chunk of an import, recorded by process_excel_data"""
+    import_analytics = models.ForeignKey(
+        ImportAnalytics, on_delete=models.CASCADE, related_name='chunk_stats')
+    chunk_index = models.IntegerField()
+    # First data row of the chunk (1-based, file-global also for sharded imports)
+    first_row = models.IntegerField()
+    row_count = models.IntegerField()
+    # Seconds spent in each stage of the chunk
+    read_time = models.FloatField()
+    clean_time = models.FloatField()
+    validate_time = models.FloatField()
+    upsert_time = models.FloatField()
+    log_time = models.FloatField()
+    rows_per_second = models.FloatField()
+    # Largest resident set size (bytes) of the import process and its pipeline workers seen during the chunk
+    peak_rss = models.BigIntegerField()
+    # Seconds the chunk's write transaction was open
+    transaction_time = models.FloatField(default=0)
+    # Rows the chunk sizer chose for the following chunks after this one
+    next_chunk_size = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Import {self.import_analytics_id} - chunk {self.chunk_index + 1}"
+
+    class Meta:
+        verbose_name = 'Import Chunk Stats'
+        verbose_name_plural = 'Import Chunk Stats'
+        ordering = ['import_analytics', 'first_row']
+
+
+class ImportIssueSummary(models.Model):
+    """
+    One kind of warning or notice on one field for all affected rows of a chunk,
+    stored instead of a Logs row per affected row
+    """
+    LEVEL_CHOICES = Logs.LEVEL_CHOICES
+
+    import_analytics = models.ForeignKey(
+        ImportAnalytics, on_delete=models.CASCADE, related_name='issue_summaries')
+    chunk_index = models.IntegerField()
+    level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
+    code = models.CharField(max_length=100)
+    field = models.CharField(max_length=100, blank=True, default="")
+    row_count = models.IntegerField()
+    # Affected row numbers as ranges, e.g. "3-5,9,11-12"
+    rows = models.TextField()
+    # A few distinct offending values or validation messages
+    samples = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Import {self.import_analytics_id} - {self.code} {self.field} ({self.row_count} rows)"
+
+    class Meta:
+        verbose_name = 'Import Issue Summary'
+        verbose_name_plural = 'Import Issue Summaries'
+        ordering = ['import_analytics', 'chunk_index', 'id']
+
+
+class ChunkedUpload(models.Model):
+    """
+    A file uploaded in byte ranges through the chunked upload API.
+
+    Parts are appended in place to a partial file next to the upload directory and
+    completing the upload renames it, so the bytes are written to disk only once.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('completed', 'Completed'),
+        # The assembled file didn't match the declared sha256
+        ('failed', 'Failed'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    file_name = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    # Bytes received so far, the next part has to start here
+    offset = models.BigIntegerField(default=0)
+    # SHA-256 of the whole file as declared by the client, used to detect re-sent files and
+    # checked against the assembled file (set from it when nothing was declared)
+    file_hash = models.CharField(max_length=64, blank=True, default="")
+    # [{'start', 'end', 'sha256'}] for every part received
+    parts = models.JSONField(default=list)
+    write_engine = models.CharField(max_length=10, blank=True, default="")
+    sharded = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='uploading')
+    import_analytics = models.ForeignKey(
+        ImportAnalytics, on_delete=models.SET_NULL, null=True, blank=True, related_name='chunked_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.upload_id} - {self.file_name}"
+
+    class Meta:
+        verbose_name = 'Chunked Upload'
+        verbose_name_plural = 'Chunked Uploads'
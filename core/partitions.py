@@ -0,0 +1,142 @@
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from core.models import Logs
+
+LOGS_TABLE = Logs._meta.db_table
+# Daily partitions are named after the day they hold, e.g. core_logs_p20261017
+DAILY_PARTITION_FORMAT = f"{LOGS_TABLE}_p%Y%m%d"
+# Catches rows of days without a partition, so logging never fails on a missing one
+DEFAULT_PARTITION = f"{LOGS_TABLE}_default"
+
+# Upper bound of a range partition as printed by pg_get_expr, e.g.
+# FOR VALUES FROM ('2026-10-17 00:00:00+00') TO ('2026-10-18 00:00:00+00')
+_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+
+def _day_start(day):
+    """Midnight UTC starting `day`, partition boundaries are always in UTC"""
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def logs_partitioned():
+    """True when the Logs table is a PostgreSQL partitioned table (migration 0017)"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [LOGS_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_log_partitions(first_day, days):
+    """
+    Create the daily Logs partitions for `days` days starting at `first_day`,
+    partitions that already exist are left alone.
+
+    Returns:
+        List of the partition names that were created
+    """
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            name = day.strftime(DAILY_PARTITION_FORMAT)
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is not None:
+                continue
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f"CREATE TABLE {connection.ops.quote_name(name)} "
+                        f"PARTITION OF {connection.ops.quote_name(LOGS_TABLE)} "
+                        f"FOR VALUES FROM ('{_day_start(day).isoformat()}') "
+                        f"TO ('{_day_start(day + timedelta(days=1)).isoformat()}')"
+                    )
+            except DatabaseError:
+                # The default partition already holds rows of that day, they stay there
+                # and are removed by the retention of the default partition
+                continue
+            created.append(name)
+    return created
+
+
+def list_log_partitions():
+    """
+    Return (name, upper_bound) for every range partition of the Logs table,
+    upper_bound being the aware datetime the partition's rows are below.
+    The default partition has no bound and isn't listed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [LOGS_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND_RE.search(bound or '')
+        if match is None:
+            continue
+        # PostgreSQL prints the offset as +00, fromisoformat before Python 3.11 wants +00:00
+        upper_bound = re.sub(r'([+-]\d\d)$', r'\1:00', match.group(1))
+        partitions.append((name, datetime.fromisoformat(upper_bound)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def drop_expired_log_partitions(cutoff):
+    """
+    Drop the Logs partitions holding only rows created before `cutoff`.
+
+    Whole partitions are dropped instead of deleting rows, so retention leaves
+    no dead tuples behind for vacuum. A partition that still holds rows at or
+    after the cutoff is kept until all of its rows have expired.
+
+    Returns:
+        List of the partition names that were dropped
+    """
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, upper_bound in list_log_partitions():
+            if upper_bound > cutoff:
+                break
+            cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+            dropped.append(name)
+    return dropped
+
+
+def maintain_log_partitions(retention_days, days_ahead):
+    """
+    Create the partitions for today and the next `days_ahead` days and apply
+    the retention of `retention_days` days.
+
+    On databases without a partitioned Logs table the expired rows are deleted
+    instead, so retention behaves the same in development on SQLite. Expired rows
+    of the default partition are deleted as well.
+
+    Returns:
+        dict with the created and dropped partition names and the deleted row count
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(days=retention_days)
+
+    if not logs_partitioned():
+        deleted, _ = Logs.objects.filter(created_at__lt=cutoff).delete()
+        return {"created": [], "dropped": [], "deleted": deleted}
+
+    today = now.astimezone(dt_timezone.utc).date()
+    created = create_log_partitions(today, days_ahead + 1)
+    dropped = drop_expired_log_partitions(cutoff)
+    # Rows only end up in the default partition when partitions weren't created in time
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(DEFAULT_PARTITION)} WHERE created_at < %s", [cutoff]
+        )
+        deleted = cursor.rowcount
+    return {"created": created, "dropped": dropped, "deleted": deleted}
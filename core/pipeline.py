@@ -0,0 +1,159 @@
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.pipeline_worker import init_pipeline_worker, validate_chunk_in_worker
+from core.validation import validate_chunk
+
+# Marks the end of the chunk stream in the pipeline queue
+_END_OF_FILE = object()
+
+
+def read_next_chunk(data_reader, size):
+    """Read the next chunk of `size` rows from any of the chunk readers, None at the end of the file"""
+    try:
+        chunk = data_reader.get_chunk(size)
+    except StopIteration:
+        # pandas readers signal the end of the file this way
+        return None
+    if chunk is None or len(chunk) == 0:
+        return None
+    return chunk
+
+
+class SerialChunkValidator:
+    """
+    Validate the chunks of a reader one after another in the calling thread.
+
+    Iterating yields a ValidatedChunk per chunk, read_time accumulates the time
+    spent reading chunks from the file. Every chunk is read with the size the
+    chunk_sizer holds at that moment.
+    """
+
+    def __init__(self, data_reader, chunk_sizer, default_currency, row_start=0, summarize_errors=False):
+        self.data_reader = data_reader
+        self.chunk_sizer = chunk_sizer
+        self.default_currency = default_currency
+        self.row_start = row_start
+        self.summarize_errors = summarize_errors
+        self.read_time = 0.0
+
+    def __iter__(self):
+        row_offset = self.row_start
+        while True:
+            read_start_time = time.time()
+            chunk = read_next_chunk(self.data_reader, self.chunk_sizer.size)
+            # Reading is timed separately from processing, it covers parsing the chunk from disk
+            chunk_read_time = time.time() - read_start_time
+            self.read_time += chunk_read_time
+            if chunk is None:
+                return
+            validated_chunk = validate_chunk(chunk, row_offset, self.default_currency, self.summarize_errors)
+            validated_chunk.read_time = chunk_read_time
+            row_offset += len(chunk)
+            yield validated_chunk
+
+    def close(self):
+        pass
+
+
+class PipelinedChunkValidator:
+    """
+    Validate the chunks of a reader on a pool of worker processes.
+
+    A reader thread parses chunks and submits them to a ProcessPoolExecutor running
+    validate_chunk, the calling thread consumes the results in file order and does
+    the database writes. Reading, validation and writing of different chunks overlap.
+    At most queue_size chunks are waiting for the writer, once the queue is full the
+    reader blocks, which keeps memory bounded when the writer is the bottleneck.
+
+    Iterating yields a ValidatedChunk per chunk exactly like SerialChunkValidator.
+    Chunk sizes are taken from the chunk_sizer when a chunk is read, so changes
+    apply to chunks that aren't read yet. close() must be called to stop the
+    reader thread and the pool.
+    """
+
+    def __init__(self, data_reader, chunk_sizer, default_currency, workers, queue_size, row_start=0,
+                 summarize_errors=False):
+        self.data_reader = data_reader
+        self.chunk_sizer = chunk_sizer
+        self.default_currency = default_currency
+        self.row_start = row_start
+        self.summarize_errors = summarize_errors
+        self.read_time = 0.0
+        self.results = queue.Queue(maxsize=queue_size)
+        self.stopping = threading.Event()
+        # Spawned rather than forked workers, a forked child would share the parent's database connection.
+        # The initializer and the task live in core.pipeline_worker, which a fresh process can
+        # import before django.setup()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_pipeline_worker,
+        )
+        self.reader_thread = threading.Thread(target=self._read_chunks, name='import-pipeline-reader', daemon=True)
+
+    def _put(self, item):
+        # Waits for room in the queue while the pipeline is running (backpressure)
+        while not self.stopping.is_set():
+            try:
+                self.results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_chunks(self):
+        try:
+            row_offset = self.row_start
+            while not self.stopping.is_set():
+                read_start_time = time.time()
+                chunk = read_next_chunk(self.data_reader, self.chunk_sizer.size)
+                chunk_read_time = time.time() - read_start_time
+                self.read_time += chunk_read_time
+                if chunk is None:
+                    break
+                future = self.executor.submit(
+                    validate_chunk_in_worker, chunk, row_offset, self.default_currency, self.summarize_errors
+                )
+                row_offset += len(chunk)
+                if not self._put((future, chunk_read_time)):
+                    return
+            self._put(_END_OF_FILE)
+        except Exception as e:
+            # Handed to the consuming thread, which raises it
+            self._put(e)
+
+    def __iter__(self):
+        self.reader_thread.start()
+        while True:
+            item = self.results.get()
+            if item is _END_OF_FILE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            future, chunk_read_time = item
+            validated_chunk = future.result()
+            validated_chunk.read_time = chunk_read_time
+            yield validated_chunk
+
+    def close(self):
+        self.stopping.set()
+        if self.reader_thread.is_alive():
+            self.reader_thread.join()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_chunk_validator(data_reader, chunk_sizer, default_currency, workers, queue_size, row_start=0,
+                        summarize_errors=False):
+    """
+    Return the chunk validator for the given pool size, more than one worker
+    runs the pipelined validator, otherwise chunks are validated serially.
+    summarize_errors is passed on to validate_chunk.
+    """
+    if workers and workers > 1:
+        return PipelinedChunkValidator(
+            data_reader, chunk_sizer, default_currency, workers, queue_size, row_start, summarize_errors
+        )
+    return SerialChunkValidator(data_reader, chunk_sizer, default_currency, row_start, summarize_errors)
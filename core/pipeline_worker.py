@@ -0,0 +1,21 @@
+"""
+Entry points of the import pipeline's worker processes.
+
+The workers are spawned, so a fresh interpreter unpickles the initializer and the
+task function by importing this module before django.setup() has run. Importing
+anything that defines or loads models at that point raises AppRegistryNotReady,
+so this module only imports django and loads the validation code once the app
+registry is ready.
+"""
+import django
+
+
+def init_pipeline_worker():
+    """Pool initializer, sets up the Django app registry of the spawned process"""
+    django.setup()
+
+
+def validate_chunk_in_worker(chunk, row_offset, default_currency, summarize_errors=False):
+    """Run validate_chunk in a worker process, see core.validation.validate_chunk"""
+    from core.validation import validate_chunk
+    return validate_chunk(chunk, row_offset, default_currency, summarize_errors)
@@ -1,30 +1,81 @@
 import pandas as pd
 import time
 import os
-import json
-import gc
+import psutil
 from django.conf import settings
 from django.db import transaction
-from core.serializers import ProductSerializer
-from core.models import Product, ImportAnalytics
+from django.db.models import F
+from core.models import ImportAnalytics, ImportChunkStats, ImportIssueSummary
+from core.analytics import refresh_import_summary
+from core.issues import encode_row_ranges
 from core.utils import DatabaseLogger
+from core.readers import estimate_row_count, open_chunk_reader
+from core.progress import ImportProgress
+from core.pipeline import get_chunk_validator
+from core.chunk_sizing import ChunkSizer
+from core.writers import get_product_writer
 from django.utils import timezone
 
 
-def process_excel_data(file_path):
+# Names of the source formats in log messages, everything else is an Excel workbook
+FILE_TYPES = {'.csv': "CSV", '.parquet': "Parquet", '.feather': "Feather"}
+
+
+def get_import_status(total_records, success_count, failure_count):
+    """Final status of an import given its counters"""
+    if failure_count == 0:
+        return "completed"
+    elif total_records > 0 and success_count == 0:
+        return "failed"
+    return "completed"
+
+
+def get_process_tree_rss():
+    """Resident set size in bytes of the current process plus its children (pipeline workers)"""
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            continue
+    return rss
+
+
+def process_excel_data(file_path, write_engine=None, import_analytics_id=None,
+                       byte_offset=None, row_start=0, row_count=None, pipeline_workers=None,
+                       resume_import_id=None, task_id=None):
     """
     Process an Excel or CSV file by chunks, perform bulk insertions for better performance,
     and log the process including successes, warnings, and errors.
+
+    write_engine selects how products are upserted: 'orm' (bulk_create/bulk_update) or
+    'copy' (PostgreSQL COPY into a staging table). Defaults to settings.IMPORT_WRITE_ENGINE.
+
+    pipeline_workers (defaults to settings.IMPORT_PIPELINE_WORKERS) above 1 cleans and
+    validates chunks on that many worker processes while the next chunks are read and the
+    previous ones written, the results are the same as with the serial path.
+
+    Every chunk stores its stage timings and peak RSS as an ImportChunkStats record. With
+    IMPORT_ADAPTIVE_CHUNKS the size of the following chunks is adjusted from those
+    measurements (see ChunkSizer), starting at CHUNKSIZE.
+
+    When import_analytics_id is given the call processes one shard of a sharded CSV import:
+    row_count rows starting at byte_offset (row_start is the shard's first data row, used
+    for row numbers in the logs). Its counters are added to the shared ImportAnalytics
+    record after every chunk and the record is left for the chord callback to finalize.
+
+    Every chunk's writes are committed in one transaction with the import's counters and
+    checkpoint (chunks_committed, rows_committed). resume_import_id continues such an
+    interrupted import from its checkpoint, the reader seeks straight to the first row
+    that wasn't committed. It also starts imports whose record was created up front (at
+    upload), those have nothing committed yet. task_id is stored on new imports so a redelivered Celery task
+    can find the import it started.
     """
     file_name = os.path.basename(file_path)
     task_name = f"data_import_{file_name}"
-    is_csv = file_path.endswith('.csv')
-
-    import_analytics = ImportAnalytics.objects.create(
-        file_name=file_name,
-        start_time=timezone.now(),
-        status="processing",
-    )
+    is_shard = import_analytics_id is not None
+    is_resume = resume_import_id is not None
 
     #Initialize the Counts for the import process
     # These will be updated in the import_analytics object
@@ -32,40 +83,121 @@ def process_excel_data(file_path):
     success_count = 0
     warning_count = 0
     failure_count = 0
+    unchanged_count = 0
+    first_chunk_index = 0
+    # Time already spent on a resumed import before it was interrupted
+    previous_time_taken = 0.0
+    previous_read_time = 0.0
+
+    if is_shard:
+        import_analytics = ImportAnalytics.objects.get(pk=import_analytics_id)
+    elif is_resume:
+        import_analytics = ImportAnalytics.objects.get(pk=resume_import_id)
+        if import_analytics.status == "completed":
+            return {
+                'success': True,
+                'message': "Import already completed",
+                'analytics_id': import_analytics.id
+            }
+        # Continue from the last committed chunk, the counters were saved together with it
+        total_records = import_analytics.rows_committed
+        success_count = import_analytics.success_count
+        warning_count = import_analytics.warning_count
+        failure_count = import_analytics.failure_count
+        unchanged_count = import_analytics.unchanged_count
+        first_chunk_index = import_analytics.chunks_committed
+        row_start = import_analytics.rows_committed
+        previous_time_taken = import_analytics.time_taken or 0.0
+        previous_read_time = import_analytics.read_time or 0.0
+        import_analytics.status = "processing"
+        import_analytics.end_time = None
+        import_analytics.total_records = total_records
+        import_analytics.save(update_fields=['status', 'end_time', 'total_records', 'updated_at'])
+    else:
+        import_analytics = ImportAnalytics.objects.create(
+            file_name=file_name,
+            file_path=file_path,
+            task_id=task_id or "",
+            start_time=timezone.now(),
+            status="processing",
+        )
+        refresh_import_summary()
 
 
-    #Getting the Chunk Size Variable from the settings
+    #Getting the Chunk Size Variable from the settings, adaptive imports start there and move within the bounds
     chunksize = settings.CHUNKSIZE
-    start_time_proc = time.time()
+    chunk_sizer = ChunkSizer(
+        chunksize,
+        min_size=settings.IMPORT_CHUNKSIZE_MIN,
+        max_size=settings.IMPORT_CHUNKSIZE_MAX,
+        target_time=settings.IMPORT_CHUNK_TARGET_TIME,
+        max_transaction_time=settings.IMPORT_CHUNK_MAX_TRANSACTION_TIME,
+        max_rss=settings.IMPORT_CHUNK_MAX_RSS,
+        adaptive=settings.IMPORT_ADAPTIVE_CHUNKS,
+    )
+    start_time_proc = time.time() - previous_time_taken
+    data_reader = None
+    chunk_validator = None
+    progress = None
+
+    # Collect log records in memory and write them in bulk, at the latest at the end of each chunk
+    DatabaseLogger.start_buffering()
 
     try:
-        file_type = "CSV" if is_csv else "Excel"
+        file_type = FILE_TYPES.get(os.path.splitext(file_path)[1].lower(), "Excel")
+        shard_label = f" (rows {row_start + 1}-{row_start + row_count})" if is_shard else ""
         DatabaseLogger.log(
             level="INFO",
-            message=f"Starting {file_type} import for file: {file_name}",
+            message=f"Starting {file_type} import for file: {file_name}{shard_label}",
             task_name=task_name
         )
+        if is_resume and row_start:
+            DatabaseLogger.log(
+                level="INFO",
+                message=f"Resuming import {import_analytics.id} at row {row_start + 1} (chunk {first_chunk_index + 1})",
+                task_name=task_name
+            )
+
+        product_writer = get_product_writer(write_engine, task_name)
 
-        # Configure pandas reader with proper options
-        if is_csv:
-            data_reader = pd.read_csv(
-                file_path, 
-                chunksize=chunksize, 
-                dtype=str, 
-                keep_default_na=False,
-                low_memory=False
+        # Live progress of the import, shards publish the counters of the whole import
+        if is_shard:
+            progress = ImportProgress(
+                import_analytics.id, import_analytics.task_id,
+                estimated_rows=estimate_row_count(file_path),
+                started_at=import_analytics.start_time.timestamp(),
             )
         else:
-            data_reader = pd.read_excel(
-                file_path, 
-                dtype=str, 
-                keep_default_na=False
+            progress = ImportProgress(
+                import_analytics.id, import_analytics.task_id,
+                estimated_rows=estimate_row_count(file_path), rows_done=total_records,
             )
 
-        for chunk_index, chunk in enumerate(data_reader):
-            chunk_start_time = time.time()
-            chunk_data = chunk.to_dict('records')
-            chunk_size_actual = len(chunk_data)
+        # Stream the file chunk by chunk so memory stays flat for large sheets
+        data_reader = open_chunk_reader(file_path, chunksize, byte_offset=byte_offset, row_count=row_count,
+                                        start_row=row_start if is_resume else 0)
+        # Clean and validate serially or on a pool of worker processes, results arrive in file order
+        pipeline_workers = settings.IMPORT_PIPELINE_WORKERS if pipeline_workers is None else pipeline_workers
+        chunk_validator = get_chunk_validator(
+            data_reader, chunk_sizer, settings.DEFAULT_CURRENCY,
+            workers=pipeline_workers,
+            queue_size=settings.IMPORT_PIPELINE_QUEUE_SIZE,
+            row_start=row_start,
+        )
+        if pipeline_workers and pipeline_workers > 1:
+            DatabaseLogger.log(
+                level="INFO",
+                message=f"Validating chunks on {pipeline_workers} worker processes",
+                task_name=task_name
+            )
+
+        next_row = row_start
+        for chunk_index, validated_chunk in enumerate(chunk_validator, start=first_chunk_index):
+            write_start_time = time.time()
+            peak_rss = get_process_tree_rss()
+            chunk_size_actual = validated_chunk.row_count
+            chunk_first_row = next_row + 1
+            next_row += chunk_size_actual
             total_records += chunk_size_actual
             #Logging the Chunk Processing
             DatabaseLogger.log(
@@ -74,436 +206,210 @@ def process_excel_data(file_path):
                 task_name=task_name
             )
             # Current Import Analytics total records Updated to track the progress
-            import_analytics.total_records = total_records
-            import_analytics.save(update_fields=['total_records'])
+            if not is_shard:
+                import_analytics.total_records = total_records
+                import_analytics.save(update_fields=['total_records'])
 
-            # Initialize the counters for this chunk and valid records list 
-            valid_records_for_bulk = []
+            # Initialize the counters for this chunk from the cleaning and validation results
+            valid_records_for_bulk = validated_chunk.valid_records
             chunk_success = 0
-            chunk_warnings = 0
-            chunk_failures = 0
-
-            # Process each row in the chunk, row_index is Number and the row_data is the dictionary
-            for row_index, row_data in enumerate(chunk_data):
-                absolute_row = chunk_index * chunksize + row_index + 1
-
-                # Checking for the mandatory fields that needs to be present for the insertion to work
-                required_fields = [
-                    'id', 'title', 'description', 'link', 'image_link', 
-                    'availability', 'price', 'condition', 'brand', 'gtin'
-                ]
-                missing_fields = [field for field in required_fields if not row_data.get(field)]
-
-                if missing_fields:
-                    #Skipping the row if any of the required fields are missing
-                    chunk_failures += 1
-                    error_msg = f"Row {absolute_row}: Missing required fields: {', '.join(missing_fields)}"
-                    # Logging the error message for the missing fields
-                    DatabaseLogger.log(level="ERROR", message=error_msg, task_name=task_name)
-                    continue
-
-                #Clearning the data and removing any leading or trailing spaces
-                cleaned_data = {k: ('' if pd.isna(v) else str(v).strip()) for k, v in row_data.items()}
-
-                # Handle field mapping to match the Model Serializer 
-                if 'id' in cleaned_data:
-                    cleaned_data['product_id'] = cleaned_data.pop('id')
-                if 'shipping(country:price)' in cleaned_data:
-                    cleaned_data['shipping'] = cleaned_data.pop('shipping(country:price)')
-                if 'Model' in cleaned_data:
-                    cleaned_data['model'] = cleaned_data.pop('Model')
-
-                # Handle JSONField for additional_image_links
-                if 'additional_image_links' in cleaned_data and cleaned_data['additional_image_links']:
+            chunk_warnings = validated_chunk.warning_count
+            chunk_failures = validated_chunk.failure_count
+            chunk_unchanged = 0
+
+            log_start_time = time.time()
+            for level, message in validated_chunk.log_entries:
+                DatabaseLogger.log(level=level, message=message, task_name=task_name)
+            log_time = time.time() - log_start_time
+
+            # The chunk's writes, counters and checkpoint are committed together, a crash
+            # either keeps the whole chunk or none of it
+            transaction_start_time = time.time()
+            with transaction.atomic():
+                # Process bulk creation with upsert strategy for duplicates (per chunk)
+                upsert_start_time = time.time()
+                if valid_records_for_bulk:
                     try:
-                        # Try parsing as JSON first
-                        json.loads(cleaned_data['additional_image_links'])
-                    except (ValueError, TypeError):
-                        # If not valid JSON, try to convert from comma-separated list
-                        try:
-                            links = [link.strip() for link in cleaned_data['additional_image_links'].split(',')]
-                            cleaned_data['additional_image_links'] = json.dumps(links)
-                        except Exception:
-                            # If conversion fails, log warning and continue without this field
-                            chunk_warnings += 1
+                        with transaction.atomic():
+                            created_count, updated_count, chunk_unchanged, rejected_count = product_writer.write(valid_records_for_bulk)
+                            chunk_failures += rejected_count
+                            temp_success_count_for_chunk = len(valid_records_for_bulk) - rejected_count
+
+                            # Unchanged products count as successfully processed, they just need no write
+                            actual_processed_count = created_count + updated_count + chunk_unchanged
+                            chunk_success += actual_processed_count
+                        
+                            chunk_time = (validated_chunk.clean_time + validated_chunk.validate_time
+                                          + time.time() - write_start_time)
                             DatabaseLogger.log(
-                                level="WARNING",
-                                message=f"Row {absolute_row}: Could not parse additional_image_links: {cleaned_data['additional_image_links']}. Field will be omitted.",
+                                level="INFO",
+                                message=(f"Chunk {chunk_index+1}: Successfully processed {actual_processed_count} products "
+                                        f"({created_count} created, {updated_count} updated, {chunk_unchanged} unchanged) in {chunk_time:.2f}s"),
                                 task_name=task_name
                             )
-                            cleaned_data.pop('additional_image_links', None)
-
-                # Process price fields (critical)
-                price_valid = True
-                if 'price' in cleaned_data:
-                    price_str = str(cleaned_data['price'])
-                    if ' ' in price_str:
-                        parts = price_str.split(' ', 1)
-                        try:
-                            cleaned_data['price'] = float(parts[0].replace(',', '.'))
-                            cleaned_data['currency'] = parts[1] if len(parts) > 1 else settings.DEFAULT_CURRENCY
-                        except ValueError:
-                            price_valid = False
-                    else:
-                        try:
-                            cleaned_data['price'] = float(price_str.replace(',', '.'))
-                            cleaned_data['currency'] = settings.DEFAULT_CURRENCY
-                        except ValueError:
-                            price_valid = False
-
-                    if not price_valid:
-                        chunk_failures += 1
-                        DatabaseLogger.log(
-                            level="ERROR",
-                            message=f"Row {absolute_row}: Invalid critical price format: {price_str}",
-                            task_name=task_name
-                        )
-                        continue  # Skip row if critical price is invalid
-
-                # Process sale_price (non-critical)
-                if 'sale_price' in cleaned_data and cleaned_data['sale_price']:
-                    sale_price_str = str(cleaned_data['sale_price'])
-                    sale_price_parsed_successfully = False
-                    if ' ' in sale_price_str:
-                        parts = sale_price_str.split(' ', 1)
-                        try:
-                            cleaned_data['sale_price'] = float(parts[0].replace(',', '.'))
-                            cleaned_data['sale_price_currency'] = parts[1] if len(parts) > 1 else settings.DEFAULT_CURRENCY
-                            sale_price_parsed_successfully = True
-                        except ValueError:
-                            pass
-                    else:
-                        try:
-                            cleaned_data['sale_price'] = float(sale_price_str.replace(',', '.'))
-                            cleaned_data['sale_price_currency'] = settings.DEFAULT_CURRENCY
-                            sale_price_parsed_successfully = True
-                        except ValueError:
-                            pass
-
-                    if not sale_price_parsed_successfully:
-                        chunk_warnings += 1
-                        DatabaseLogger.log(
-                            level="WARNING",
-                            message=f"Row {absolute_row}: Invalid sale_price format: {sale_price_str}. It will be omitted.",
-                            task_name=task_name
-                        )
-                        cleaned_data.pop('sale_price', None)
-                        cleaned_data.pop('sale_price_currency', None)
-
-                # Handling Boolean Field for is_bundle
-                if 'is_bundle' in cleaned_data:
-                    value = cleaned_data['is_bundle'].lower()
-                    if value in ('true', 't', 'yes', 'y', '1'):
-                        cleaned_data['is_bundle'] = True
-                    elif value in ('false', 'f', 'no', 'n', '0'):
-                        cleaned_data['is_bundle'] = False
-
-                # optional_fields = [
-                #     'product_length', 'product_width', 'product_height', 
-                #     'product_weight', 'lifestyle_image_link', 'max_handling_time'
-                # ]
-                
-                # Track which optional fields were successfully processed
-                processed_optional_fields = []
-                    
-                # Handle max_handling_time (should be an integer)
-                if 'max_handling_time' in cleaned_data and cleaned_data['max_handling_time']:
-                    try:
-                        cleaned_data['max_handling_time'] = int(cleaned_data['max_handling_time'])
-                        processed_optional_fields.append('max_handling_time')
-                    except ValueError:
-                        # Drop the field but don't block insertion
-                        DatabaseLogger.log(
-                            level="INFO",  # Using INFO level as requested
-                            message=f"Row {absolute_row}: Invalid max_handling_time format: {cleaned_data['max_handling_time']}. Field will be omitted.",
-                            task_name=task_name
-                        )
-                        cleaned_data.pop('max_handling_time', None)
-                
-                # Validate lifestyle_image_link (should be a URL)
-                if 'lifestyle_image_link' in cleaned_data and cleaned_data['lifestyle_image_link']:
-                    import re
-                    url_pattern = re.compile(r'^https?://.+')
-                    if url_pattern.match(cleaned_data['lifestyle_image_link']):
-                        processed_optional_fields.append('lifestyle_image_link')
-                    else:
-                        DatabaseLogger.log(
-                            level="INFO",
-                            message=f"Row {absolute_row}: Invalid lifestyle_image_link format: {cleaned_data['lifestyle_image_link']}. Field will be omitted.",
-                            task_name=task_name
-                        )
-                        cleaned_data.pop('lifestyle_image_link', None)
-                
-                # Handle dimension fields - they're stored as strings so just validate they're not empty
-                for dimension_field in ['product_length', 'product_width', 'product_height', 'product_weight']:
-                    if dimension_field in cleaned_data and cleaned_data[dimension_field]:
-                        processed_optional_fields.append(dimension_field)
-                
-                # Log which optional fields were found and processed
-                if processed_optional_fields:
-                    DatabaseLogger.log(
-                        level="INFO",
-                        message=f"Row {absolute_row}: Successfully processed optional fields: {', '.join(processed_optional_fields)}",
-                        task_name=task_name
-                    )
-
-                # Check for recommended fields
-                recommended_fields_list = [
-                    'description', 'link', 'image_link', 'availability',
-                    'condition', 'brand', 'gtin',
-                    'sale_price', 'item_group_id', 'google_product_category',
-                    'product_type', 'shipping', 'additional_image_links',
-                    'size', 'color', 'material', 'pattern', 'gender', 'model'
-                ]
-                missing_recommended_details = [
-                    field for field in recommended_fields_list
-                    if not cleaned_data.get(field)
-                ]
-
-                # Check for unknown fields not in the model
-                model_fields = [f.name for f in Product._meta.get_fields() if hasattr(f, 'name')]
-                model_fields.extend(['product_id'])  # 'id' mapped to 'product_id'
-
-                unknown_fields = [field for field in cleaned_data.keys() if field not in model_fields]
-                if unknown_fields:
-                    chunk_warnings += 1
-                    DatabaseLogger.log(
-                        level="WARNING",
-                        message=f"Row {absolute_row}: Unknown fields will be ignored: {', '.join(unknown_fields)}",
-                        task_name=task_name
-                    )
-                    for field in unknown_fields:
-                        cleaned_data.pop(field, None)
-
-                # Create serializer context with currencies if present
-                serializer_context = {}
-                if 'currency' in cleaned_data:
-                    serializer_context['currency'] = cleaned_data['currency']
-                if 'sale_price_currency' in cleaned_data:
-                    serializer_context['sale_price_currency'] = cleaned_data['sale_price_currency']
-
-                # Validate with serializer
-                serializer = ProductSerializer(data=cleaned_data, context=serializer_context)
-                
-                if serializer.is_valid():
-                    valid_records_for_bulk.append({
-                        'data': serializer.validated_data,
-                        'row': absolute_row,
-                        'id': serializer.validated_data.get('product_id')
-                    })
-                    
-                    if missing_recommended_details:
-                        chunk_warnings += 1
-                        warning_msg = f"Row {absolute_row}: Missing recommended fields: {', '.join(missing_recommended_details)}"
-                        DatabaseLogger.log(level="WARNING", message=warning_msg, task_name=task_name)
-                else:
-                    # Handle validation errors
-                    is_row_salvageable = True
-                    problematic_fields_log_entries = []
-                    core_failure_fields_on_format_error = ['product_id', 'title', 'price']
-
-                    for field, messages in serializer.errors.items():
-                        problematic_fields_log_entries.append(f"{field}: {', '.join(messages)}")
-                        if field in core_failure_fields_on_format_error:
-                            is_row_salvageable = False
-
-                    if is_row_salvageable:
-                        # Try partial save with problematic fields removed
-                        data_for_partial_save = cleaned_data.copy()
-                        for field_with_error in serializer.errors.keys():
-                            data_for_partial_save.pop(field_with_error, None)
-
-                        serializer = ProductSerializer(data=data_for_partial_save, context=serializer_context)
-                        if serializer.is_valid():  # Revalidate after removing problematic fields
-                            valid_records_for_bulk.append({
-                                'data': serializer.validated_data,
-                                'row': absolute_row,
-                                'id': cleaned_data.get('product_id')
-                            })
-                            
-                            format_warning_msg = (
-                                f"Row {absolute_row}: Data quality issues ({'; '.join(problematic_fields_log_entries)}). "
-                                f"Attempting to save with problematic fields omitted."
-                            )
-                            DatabaseLogger.log(level="WARNING", message=format_warning_msg, task_name=task_name)
-                            chunk_warnings += 1
-                        else:
-                            # Even after removing problematic fields, it's still not valid
-                            chunk_failures += 1
-                            error_msg = f"Row {absolute_row}: Could not salvage row even after removing problematic fields"
-                            DatabaseLogger.log(level="ERROR", message=error_msg, task_name=task_name)
-                    else:
-                        # Not salvageable due to critical field format error
-                        chunk_failures += 1
-                        error_msg = f"Row {absolute_row}: Critical validation failed - {'; '.join(problematic_fields_log_entries)}"
-                        DatabaseLogger.log(level="ERROR", message=error_msg, task_name=task_name)
-
-            # Process bulk creation with upsert strategy for duplicates (per chunk)
-            if valid_records_for_bulk:
-                try:
-                    with transaction.atomic():
-                        products_to_create = []
-                        products_to_update = []
-                        product_ids = [r['id'] for r in valid_records_for_bulk if r['id']]
-                        
-                        # Find existing products to handle duplicates
-                        existing_products = {
-                            p.product_id: p for p in Product.objects.filter(product_id__in=product_ids)
-                        }
-                        
-                        temp_success_count_for_chunk = 0
-                        
-                        for record_info in valid_records_for_bulk:
-                            try:
-                                product_id = record_info['data'].get('product_id')
-                                
-                                # Ensure essential fields are present
-                                if not product_id or \
-                                   not record_info['data'].get('title') or \
-                                   record_info['data'].get('price') is None:
-                                    chunk_failures += 1
-                                    DatabaseLogger.log(
-                                        level="ERROR",
-                                        message=f"Row {record_info['row']}: Missing core fields after validation",
-                                        task_name=task_name
-                                    )
-                                    continue
-                                
-                                # Check if product already exists (update case)
-                                if product_id in existing_products:
-                                    existing_product = existing_products[product_id]
-                                    for key, value in record_info['data'].items():
-                                        setattr(existing_product, key, value)
-                                    products_to_update.append(existing_product)
-                                else:
-                                    # Create new product
-                                    products_to_create.append(Product(**record_info['data']))
-                                    
-                                temp_success_count_for_chunk += 1
-                            except Exception as model_instantiation_e:
-                                chunk_failures += 1
-                                DatabaseLogger.log(
-                                    level="ERROR",
-                                    message=f"Row {record_info['row']}: Error processing product: {str(model_instantiation_e)}",
-                                    task_name=task_name
-                                )
-                        
-                        # Perform bulk operations
-                        created_count = 0
-                        updated_count = 0
-                        
-                        if products_to_create:
-                            try:
-                                created_products = Product.objects.bulk_create(
-                                    products_to_create, 
-                                    ignore_conflicts=True  # Skip duplicates without failing transaction
-                                )
-                                created_count = len(created_products)
-                            except Exception as create_e:
-                                DatabaseLogger.log(
-                                    level="ERROR",
-                                    message=f"Error in bulk create: {str(create_e)}",
-                                    task_name=task_name
-                                )
-                                raise
                         
-                        if products_to_update:
-                            try:
-                                # Use bulk_update for better performance
-                                model_fields_to_update = set()
-                                for product in products_to_update:
-                                    for field in product.__dict__:
-                                        if not field.startswith('_') and field not in ['id', 'created_at', 'updated_at']:
-                                            model_fields_to_update.add(field)
-                                
-                                fields_to_update = list(model_fields_to_update)
-                                if fields_to_update and len(products_to_update) > 0:
-                                    Product.objects.bulk_update(products_to_update, fields_to_update)
-                                updated_count = len(products_to_update)
-                            except Exception as update_e:
+                            if temp_success_count_for_chunk != actual_processed_count:
                                 DatabaseLogger.log(
-                                    level="ERROR",
-                                    message=f"Error in bulk update: {str(update_e)}",
+                                    level="WARNING",
+                                    message=f"Chunk {chunk_index+1}: Discrepancy in expected ({temp_success_count_for_chunk}) vs actual ({actual_processed_count}) processed products",
                                     task_name=task_name
                                 )
-                                raise
-                        
-                        actual_processed_count = created_count + updated_count
-                        chunk_success += actual_processed_count
-                        
-                        chunk_time = time.time() - chunk_start_time
+                                chunk_failures += (temp_success_count_for_chunk - actual_processed_count)
+                
+                    except Exception as transaction_e:
+                        chunk_unchanged = 0
+                        chunk_failures += len(valid_records_for_bulk)
                         DatabaseLogger.log(
-                            level="INFO",
-                            message=(f"Chunk {chunk_index+1}: Successfully processed {actual_processed_count} products "
-                                    f"({created_count} created, {updated_count} updated) in {chunk_time:.2f}s"),
-                            task_name=task_name
+                            level="ERROR",
+                            message=f"Bulk operation failed for chunk {chunk_index+1}: {str(transaction_e)}",
+                            task_name=task_name,
+                            error=transaction_e
                         )
-                        
-                        if temp_success_count_for_chunk != actual_processed_count:
-                            DatabaseLogger.log(
-                                level="WARNING",
-                                message=f"Chunk {chunk_index+1}: Discrepancy in expected ({temp_success_count_for_chunk}) vs actual ({actual_processed_count}) processed products",
-                                task_name=task_name
-                            )
-                            chunk_failures += (temp_success_count_for_chunk - actual_processed_count)
-                
-                except Exception as transaction_e:
-                    chunk_failures += len(valid_records_for_bulk)
-                    DatabaseLogger.log(
-                        level="ERROR",
-                        message=f"Bulk operation failed for chunk {chunk_index+1}: {str(transaction_e)}",
-                        task_name=task_name,
-                        error=transaction_e
-                    )
+                upsert_time = time.time() - upsert_start_time
+                peak_rss = max(peak_rss, get_process_tree_rss())
+
+                # Warnings and notices are stored as one summary per issue and field, committed with the
+                # chunk so a resumed import doesn't record them twice
+                summary_start_time = time.time()
+                if validated_chunk.issue_summaries:
+                    ImportIssueSummary.objects.bulk_create([
+                        ImportIssueSummary(
+                            import_analytics_id=import_analytics.pk,
+                            chunk_index=chunk_index,
+                            level=summary.level,
+                            code=summary.code,
+                            field=summary.field or "",
+                            row_count=len(summary),
+                            rows=encode_row_ranges(summary.rows),
+                            samples=summary.samples,
+                        )
+                        for summary in validated_chunk.issue_summaries
+                    ])
+                log_time += time.time() - summary_start_time
             
-            # Update overall counters
-            success_count += chunk_success
-            warning_count += chunk_warnings
-            failure_count += chunk_failures
+                # Update overall counters
+                success_count += chunk_success
+                warning_count += chunk_warnings
+                failure_count += chunk_failures
+                unchanged_count += chunk_unchanged
             
-            # Update import analytics after each chunk
-            import_analytics.success_count = success_count
-            import_analytics.warning_count = warning_count
-            import_analytics.failure_count = failure_count
-            import_analytics.time_taken = time.time() - start_time_proc
-            import_analytics.save()
+                # Update import analytics after each chunk
+                if is_shard:
+                    # Other shards update the same record concurrently, so add this chunk's counts atomically
+                    ImportAnalytics.objects.filter(pk=import_analytics.pk).update(
+                        total_records=F('total_records') + chunk_size_actual,
+                        success_count=F('success_count') + chunk_success,
+                        warning_count=F('warning_count') + chunk_warnings,
+                        failure_count=F('failure_count') + chunk_failures,
+                        unchanged_count=F('unchanged_count') + chunk_unchanged,
+                        updated_at=timezone.now(),
+                    )
+                else:
+                    import_analytics.success_count = success_count
+                    import_analytics.warning_count = warning_count
+                    import_analytics.failure_count = failure_count
+                    import_analytics.unchanged_count = unchanged_count
+                    import_analytics.time_taken = time.time() - start_time_proc
+                    import_analytics.read_time = previous_read_time + chunk_validator.read_time
+                    import_analytics.chunks_committed = chunk_index + 1
+                    import_analytics.rows_committed = next_row
+                    # The status is left alone, it may have been marked failed as stale meanwhile
+                    import_analytics.save(update_fields=[
+                        'success_count', 'warning_count', 'failure_count', 'unchanged_count', 'time_taken',
+                        'read_time', 'chunks_committed', 'rows_committed', 'updated_at',
+                    ])
+            transaction_time = time.time() - transaction_start_time
+
+            flush_start_time = time.time()
+            DatabaseLogger.flush()
+            log_time += time.time() - flush_start_time
+
+            # Record where the chunk's time and memory went
+            stage_time = (validated_chunk.read_time + validated_chunk.clean_time + validated_chunk.validate_time
+                          + upsert_time + log_time)
+            peak_rss = max(peak_rss, get_process_tree_rss())
+
+            # Size the chunks still to be read from how this one went
+            previous_chunk_size = chunk_sizer.size
+            next_chunk_size = chunk_sizer.observe(chunk_size_actual, stage_time, transaction_time, peak_rss)
+            if next_chunk_size != previous_chunk_size:
+                DatabaseLogger.log(
+                    level="INFO",
+                    message=(f"Chunk {chunk_index+1}: chunk size changed from {previous_chunk_size} to {next_chunk_size} rows "
+                             f"({stage_time:.2f}s, transaction {transaction_time:.2f}s, RSS {peak_rss // (1024 * 1024)} MB)"),
+                    task_name=task_name
+                )
+
+            ImportChunkStats.objects.create(
+                import_analytics_id=import_analytics.pk,
+                chunk_index=chunk_index,
+                first_row=chunk_first_row,
+                row_count=chunk_size_actual,
+                read_time=validated_chunk.read_time,
+                clean_time=validated_chunk.clean_time,
+                validate_time=validated_chunk.validate_time,
+                upsert_time=upsert_time,
+                log_time=log_time,
+                rows_per_second=chunk_size_actual / stage_time if stage_time else 0.0,
+                peak_rss=peak_rss,
+                transaction_time=transaction_time,
+                next_chunk_size=next_chunk_size,
+            )
+            if is_shard:
+                publish_shared_progress(progress, import_analytics.pk)
+            else:
+                progress.publish("processing", chunk_index, total_records, success_count, warning_count, failure_count)
             
-            # Free memory between chunks
-            del chunk
-            if 'chunk_data' in locals():
-                del chunk_data
-            if 'valid_records_for_bulk' in locals():
-                del valid_records_for_bulk
-            gc.collect()  # Explicitly request garbage collection
+            # Drop the chunk before the next one is read, reference counting frees it right away
+            del validated_chunk, valid_records_for_bulk
 
         # Complete the import process
-        end_time_proc = time.time()
-        time_taken = end_time_proc - start_time_proc
+        time_taken = time.time() - start_time_proc
+        read_time = previous_read_time + chunk_validator.read_time
+
+        if is_shard:
+            DatabaseLogger.log(
+                level="INFO",
+                message=(f"{file_type} import shard{shard_label} finished for {file_name}. "
+                        f"Processed: {total_records}, Success: {success_count}, "
+                        f"Warnings: {warning_count}, Failures: {failure_count}, Unchanged: {unchanged_count}, "
+                        f"Time taken: {time_taken:.2f}s (reading: {read_time:.2f}s)"),
+                task_name=task_name
+            )
+            return {
+                'success': True,
+                'total_records': total_records,
+                'success_count': success_count,
+                'warning_count': warning_count,
+                'failure_count': failure_count,
+                'unchanged_count': unchanged_count,
+                'time_taken': time_taken,
+                'read_time': read_time,
+                'analytics_id': import_analytics.id
+            }
 
         # Update analytics record with final status
         import_analytics.total_records = total_records
         import_analytics.success_count = success_count
         import_analytics.warning_count = warning_count
         import_analytics.failure_count = failure_count
+        import_analytics.unchanged_count = unchanged_count
         import_analytics.end_time = timezone.now()
         import_analytics.time_taken = time_taken
-        
-        if failure_count == 0:
-            import_analytics.status = "completed"
-        elif total_records > 0 and success_count == 0:
-            import_analytics.status = "failed"
-        else:
-            import_analytics.status = "completed"
-            
+        import_analytics.read_time = read_time
+        import_analytics.status = get_import_status(total_records, success_count, failure_count)
         import_analytics.save()
+        refresh_import_summary()
+        progress.publish(import_analytics.status, import_analytics.chunks_committed - 1, total_records,
+                         success_count, warning_count, failure_count)
 
         # Log final status
         DatabaseLogger.log(
             level="INFO",
             message=(f"{file_type} import {import_analytics.status} for {file_name}. "
                     f"Processed: {total_records}, Success: {success_count}, "
-                    f"Warnings: {warning_count}, Failures: {failure_count}, "
-                    f"Time taken: {time_taken:.2f}s"),
+                    f"Warnings: {warning_count}, Failures: {failure_count}, Unchanged: {unchanged_count}, "
+                    f"Time taken: {time_taken:.2f}s (reading: {read_time:.2f}s)"),
             task_name=task_name
         )
 
@@ -514,7 +420,9 @@ def process_excel_data(file_path):
             'success_count': success_count,
             'warning_count': warning_count,
             'failure_count': failure_count,
+            'unchanged_count': unchanged_count,
             'time_taken': time_taken,
+            'read_time': read_time,
             'analytics_id': import_analytics.id
         }
 
@@ -524,9 +432,14 @@ def process_excel_data(file_path):
             message=f"File {file_name} is empty or has no data.", 
             task_name=task_name
         )
+        if is_shard:
+            return {'success': False, 'error': f"File {file_name} is empty."}
         import_analytics.status = "failed"
         import_analytics.end_time = timezone.now()
         import_analytics.save()
+        refresh_import_summary()
+        if progress is not None:
+            progress.publish("failed", -1, 0, 0, 0, 0)
         return {'success': False, 'error': f"File {file_name} is empty."}
     except Exception as e:
         DatabaseLogger.log(
@@ -535,13 +448,97 @@ def process_excel_data(file_path):
             task_name=task_name,
             error=e
         )
+        if is_shard:
+            # The chord callback marks the import as failed and counts the rows this shard didn't reach
+            return {'success': False, 'error': str(e)}
         import_analytics.end_time = timezone.now()
         import_analytics.time_taken = time.time() - start_time_proc if 'start_time_proc' in locals() else 0
         import_analytics.status = "failed"
         import_analytics.failure_count = total_records - success_count
         import_analytics.save()
+        refresh_import_summary()
+        if progress is not None:
+            progress.publish("failed", import_analytics.chunks_committed - 1, total_records,
+                             success_count, warning_count, import_analytics.failure_count)
 
         return {
             'success': False,
             'error': str(e)
         }
+    finally:
+        # Stop the pipeline before its reader is closed
+        if chunk_validator is not None:
+            chunk_validator.close()
+        # Release the underlying file handle (read-only workbooks keep it open)
+        if data_reader is not None:
+            data_reader.close()
+        DatabaseLogger.stop_buffering()
+
+
+def publish_shared_progress(progress, import_analytics_id, state="processing"):
+    """Publish the counters of a sharded import's shared record, all its shards add to them"""
+    counters = ImportAnalytics.objects.values(
+        'total_records', 'success_count', 'warning_count', 'failure_count'
+    ).get(pk=import_analytics_id)
+    chunks_done = ImportChunkStats.objects.filter(import_analytics_id=import_analytics_id).count()
+    return progress.publish(state, chunks_done - 1, counters['total_records'], counters['success_count'],
+                            counters['warning_count'], counters['failure_count'])
+
+
+def finalize_sharded_import(import_analytics_id, shard_results, expected_records):
+    """
+    Complete a sharded import once every shard has run.
+
+    Shards add their counters to the ImportAnalytics record as they go, this sets the
+    final status and timings. Rows of shards that crashed before reaching them count as
+    failures and any shard error marks the whole import as failed.
+    """
+    import_analytics = ImportAnalytics.objects.get(pk=import_analytics_id)
+    file_name = import_analytics.file_name
+    task_name = f"data_import_{file_name}"
+    errors = [result['error'] for result in shard_results if not result.get('success')]
+
+    import_analytics.failure_count += max(expected_records - import_analytics.total_records, 0)
+    import_analytics.total_records = max(expected_records, import_analytics.total_records)
+    import_analytics.read_time = sum(result.get('read_time', 0) for result in shard_results)
+    import_analytics.end_time = timezone.now()
+    import_analytics.time_taken = (import_analytics.end_time - import_analytics.start_time).total_seconds()
+    if errors:
+        import_analytics.status = "failed"
+    else:
+        import_analytics.status = get_import_status(
+            import_analytics.total_records, import_analytics.success_count, import_analytics.failure_count
+        )
+    import_analytics.save()
+    refresh_import_summary()
+    # Watchers of the import and of its task (the chord callback runs under its id) see it end
+    progress = ImportProgress(
+        import_analytics.id, import_analytics.task_id, started_at=import_analytics.start_time.timestamp()
+    )
+    publish_shared_progress(progress, import_analytics.id, state=import_analytics.status)
+
+    DatabaseLogger.log(
+        level="ERROR" if errors else "INFO",
+        message=(f"Sharded CSV import {import_analytics.status} for {file_name} across {len(shard_results)} shards. "
+                f"Processed: {import_analytics.total_records}, Success: {import_analytics.success_count}, "
+                f"Warnings: {import_analytics.warning_count}, Failures: {import_analytics.failure_count}, "
+                f"Unchanged: {import_analytics.unchanged_count}, "
+                f"Time taken: {import_analytics.time_taken:.2f}s"
+                + (f". Shard errors: {'; '.join(errors)}" if errors else "")),
+        task_name=task_name
+    )
+
+    return {
+        'success': not errors and import_analytics.success_count > 0,
+        'message': f"Import {import_analytics.status}",
+        'total_records': import_analytics.total_records,
+        'success_count': import_analytics.success_count,
+        'warning_count': import_analytics.warning_count,
+        'failure_count': import_analytics.failure_count,
+        'unchanged_count': import_analytics.unchanged_count,
+        'time_taken': import_analytics.time_taken,
+        'read_time': import_analytics.read_time,
+        'analytics_id': import_analytics.id,
+        'shard_count': len(shard_results),
+    }
+
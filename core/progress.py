@@ -0,0 +1,167 @@
+import json
+import time
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds between keep-alive comments on an idle progress stream
+STREAM_KEEPALIVE = 15
+# Import states after which no more progress is published
+FINAL_STATES = ('completed', 'failed')
+
+_redis_client = None
+
+
+def progress_channel(import_analytics_id):
+    """Redis pub/sub channel carrying the progress snapshots of an import"""
+    return f"import-progress:{import_analytics_id}"
+
+
+def task_progress_key(task_id):
+    """Cache key of the latest progress snapshot of a Celery import task"""
+    return f"import-task-progress:{task_id}"
+
+
+def cache_task_progress(task_id, snapshot):
+    """Store the latest snapshot of a task for task_status, best effort like publishing"""
+    if not task_id:
+        return
+    try:
+        cache.set(task_progress_key(task_id), snapshot, timeout=settings.IMPORT_PROGRESS_CACHE_TIMEOUT)
+    except Exception:
+        pass
+
+
+def get_task_progress(task_id):
+    """Latest cached snapshot of a task, None when there is none or the cache is unavailable"""
+    try:
+        return cache.get(task_progress_key(task_id))
+    except Exception:
+        return None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.IMPORT_PROGRESS_REDIS_URL)
+    return _redis_client
+
+
+class ImportProgress:
+    """
+    Builds and publishes the progress snapshots of one import.
+
+    A snapshot holds the import's state, the last committed chunk, the rows done so
+    far with their counters, the rows/s of this run and, when the file's row count
+    could be estimated, an ETA. Snapshots are published on the import's Redis channel
+    for the progress stream and cached under the task id for task_status, both are
+    best effort and never fail the import. The shards of a sharded import publish the
+    counters of the shared record, under the task id of the import.
+    """
+
+    def __init__(self, import_analytics_id, task_id="", estimated_rows=None, rows_done=0, started_at=None):
+        self.import_analytics_id = import_analytics_id
+        self.task_id = task_id
+        self.estimated_rows = estimated_rows
+        # The rate only covers this run, a resumed import starts with rows already done.
+        # Shards report the rows of the whole import, so they pass its start (a timestamp)
+        self.start_rows = rows_done
+        self.start_time = started_at if started_at is not None else time.time()
+
+    def snapshot(self, state, chunk_index, rows_done, success_count, warning_count, failure_count):
+        elapsed = time.time() - self.start_time
+        rows_per_second = (rows_done - self.start_rows) / elapsed if elapsed > 0 else 0.0
+        # Estimates can fall short of the real row count, the total is then unknown until the end
+        total_rows = self.estimated_rows if self.estimated_rows and self.estimated_rows >= rows_done else None
+        if state in FINAL_STATES:
+            total_rows = rows_done
+            eta_seconds = 0.0
+        elif total_rows is not None and rows_per_second > 0:
+            eta_seconds = round((total_rows - rows_done) / rows_per_second, 1)
+        else:
+            eta_seconds = None
+        return {
+            'analytics_id': self.import_analytics_id,
+            'task_id': self.task_id,
+            'state': state,
+            'chunk_index': chunk_index,
+            'rows_done': rows_done,
+            'total_rows': total_rows,
+            'success_count': success_count,
+            'warning_count': warning_count,
+            'failure_count': failure_count,
+            'rows_per_second': round(rows_per_second, 1),
+            'eta_seconds': eta_seconds,
+            'updated_at': time.time(),
+        }
+
+    def publish(self, state, chunk_index, rows_done, success_count, warning_count, failure_count):
+        """Publish and cache a snapshot, returns it"""
+        snapshot = self.snapshot(state, chunk_index, rows_done, success_count, warning_count, failure_count)
+        cache_task_progress(self.task_id, snapshot)
+        try:
+            _get_redis().publish(progress_channel(self.import_analytics_id), json.dumps(snapshot))
+        except redis.RedisError:
+            # Watchers fall back to the ImportAnalytics record, the import goes on
+            pass
+        return snapshot
+
+
+def record_snapshot(import_analytics):
+    """Progress snapshot built from a stored ImportAnalytics record, without an ETA"""
+    time_taken = import_analytics.time_taken or 0.0
+    is_final = import_analytics.status in FINAL_STATES
+    return {
+        'analytics_id': import_analytics.id,
+        'task_id': import_analytics.task_id,
+        'state': import_analytics.status,
+        'chunk_index': import_analytics.chunks_committed - 1,
+        'rows_done': import_analytics.total_records,
+        'total_rows': import_analytics.total_records if is_final else None,
+        'success_count': import_analytics.success_count,
+        'warning_count': import_analytics.warning_count,
+        'failure_count': import_analytics.failure_count,
+        'rows_per_second': round(import_analytics.total_records / time_taken, 1) if time_taken else 0.0,
+        'eta_seconds': 0.0 if is_final else None,
+        'updated_at': time.time(),
+    }
+
+
+def format_sse(data, event=None):
+    """Encode a Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return f"{message}data: {json.dumps(data)}\n\n"
+
+
+async def stream_import_progress(import_analytics_id, load_snapshot):
+    """
+    Async generator of the Server-Sent Events of an import's progress.
+
+    load_snapshot is an async callable returning a snapshot built from the stored
+    ImportAnalytics record. It is sent first, once the channel is subscribed so no
+    update can slip in between, then every snapshot published by the import follows
+    until it reaches a final state. Idle periods send a keep-alive comment and check
+    the record again, so a final state whose snapshot got lost still ends the stream.
+    """
+    client = redis.asyncio.Redis.from_url(settings.IMPORT_PROGRESS_REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(progress_channel(import_analytics_id))
+        snapshot = await load_snapshot()
+        yield format_sse(snapshot, event='progress')
+
+        while snapshot['state'] not in FINAL_STATES:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE)
+            if message is not None:
+                snapshot = json.loads(message['data'])
+                yield format_sse(snapshot, event='progress')
+                continue
+            yield ": keep-alive\n\n"
+            stored_snapshot = await load_snapshot()
+            if stored_snapshot['state'] in FINAL_STATES:
+                snapshot = stored_snapshot
+                yield format_sse(snapshot, event='progress')
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
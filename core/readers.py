@@ -0,0 +1,537 @@
+import csv
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+# Arrow columns passed to cleaning as numbers when they have a numeric type
+ARROW_AMOUNT_COLUMNS = ('price', 'sale_price')
+ARROW_EXTENSIONS = ('.parquet', '.feather')
+
+
+def _cell_to_str(value):
+    """
+    Convert an openpyxl cell value to the string pandas would produce with
+    dtype=str and keep_default_na=False
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores every number as a float, pandas reads whole numbers back as ints
+        return str(int(value))
+    return str(value)
+
+
+class ExcelChunkReader:
+    """
+    Stream an .xlsx sheet as DataFrame chunks of `chunksize` rows.
+
+    The workbook is opened in openpyxl's read-only mode, so rows are parsed lazily
+    from the sheet XML and only one chunk is held in memory at a time. Like the
+    pandas CSV reader it is iterable and usable as a context manager.
+    `start_row` data rows are skipped without building chunks for them.
+
+    Rows match pd.read_excel, which the import used before: blank rows between data
+    rows are kept as rows of empty cells, blank rows after the last data row are not.
+    """
+
+    def __init__(self, file_path, chunksize, sheet_name=None, start_row=0):
+        self.chunksize = chunksize
+        self.workbook = load_workbook(file_path, read_only=True, data_only=True)
+        sheet = self.workbook[sheet_name] if sheet_name else self.workbook.worksheets[0]
+        self.rows = sheet.iter_rows(values_only=True)
+        # Blank rows are only known to be data once a non-blank row follows them
+        self.pending_blank_rows = 0
+        self.pending_row = None
+
+        header = next(self.rows, None)
+        columns = [_cell_to_str(value) for value in header or ()]
+        # Read-only sheets often report trailing empty columns in their dimensions
+        while columns and not columns[-1]:
+            columns.pop()
+        if not columns:
+            self.close()
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+
+        self.columns = [
+            column or f"Unnamed: {position}" for position, column in enumerate(columns)
+        ]
+        self._skip_rows(start_row)
+
+    def _skip_rows(self, count):
+        """Consume `count` rows, blank rows before the last data row count like in get_chunk"""
+        for _ in range(count):
+            if next(self.rows, None) is None:
+                return
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self.get_chunk()
+        if chunk is None:
+            self.close()
+            raise StopIteration
+        return chunk
+
+    def get_chunk(self, size=None):
+        """Read the next `size` rows, returning None once the sheet is exhausted"""
+        size = size or self.chunksize
+        width = len(self.columns)
+        records = []
+
+        while len(records) < size:
+            if self.pending_row is None:
+                row = next(self.rows, None)
+                if row is None:
+                    # Blank rows at the end of the sheet are not data
+                    break
+                values = [_cell_to_str(value) for value in row[:width]]
+                if not any(values):
+                    self.pending_blank_rows += 1
+                    continue
+                if len(values) < width:
+                    values.extend([''] * (width - len(values)))
+                self.pending_row = values
+
+            if self.pending_blank_rows:
+                blank_rows = min(self.pending_blank_rows, size - len(records))
+                records.extend([''] * width for _ in range(blank_rows))
+                self.pending_blank_rows -= blank_rows
+                continue
+            records.append(self.pending_row)
+            self.pending_row = None
+
+        if not records:
+            return None
+        return pd.DataFrame(records, columns=self.columns, dtype=str)
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+class FrameChunkReader:
+    """
+    Serve an already loaded DataFrame in chunks.
+    Used for legacy .xls workbooks, which xlrd can only parse in one pass.
+    """
+
+    def __init__(self, frame, chunksize, start_row=0):
+        self.frame = frame
+        self.chunksize = chunksize
+        self.position = start_row
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self.get_chunk()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def get_chunk(self, size=None):
+        size = size or self.chunksize
+        if self.position >= len(self.frame):
+            return None
+        chunk = self.frame.iloc[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+    def close(self):
+        self.frame = self.frame.iloc[0:0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+class CsvRangeReader:
+    """
+    Read `row_count` CSV rows starting at a byte offset, in chunks.
+    The header is taken from the start of the file so every shard gets the same columns.
+    """
+
+    def __init__(self, file_path, chunksize, byte_offset, row_count):
+        columns = pd.read_csv(file_path, nrows=0).columns
+        self.handle = open(file_path, 'rb')
+        self.handle.seek(byte_offset)
+        self.reader = pd.read_csv(
+            self.handle,
+            header=None,
+            names=columns,
+            nrows=row_count,
+            chunksize=chunksize,
+            dtype=str,
+            keep_default_na=False,
+            low_memory=False
+        )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.reader)
+
+    def get_chunk(self, size=None):
+        return self.reader.get_chunk(size)
+
+    def close(self):
+        self.reader.close()
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+def _typed_value_to_str(value):
+    """Text the import would have read for a typed Parquet/Feather value"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return _cell_to_str(value)
+
+
+class ArrowChunkReader:
+    """
+    Stream a Parquet or Feather (Arrow IPC) file as DataFrame chunks.
+
+    Parquet files are read row group by row group and Feather files record batch by
+    record batch, batches are buffered and sliced to the requested chunk size.
+    Columns are converted straight from Arrow: text columns become strings with nulls
+    as '', numeric price and sale_price columns keep their numbers (NaN for nulls) so
+    cleaning doesn't parse them, and other typed columns are turned into the text the
+    import reads from a CSV feed. `start_row` data rows are skipped, whole Parquet
+    row groups without being read. read_rows() reads chosen rows, touching only the
+    row groups or record batches that hold them.
+    """
+
+    def __init__(self, file_path, chunksize, start_row=0):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.chunksize = chunksize
+        self.pending = None
+        self.source = None
+
+        self.parquet = os.path.splitext(file_path)[1].lower() == '.parquet'
+        if self.parquet:
+            self.source = pq.ParquetFile(file_path)
+            schema = self.source.schema_arrow
+            # Skip the row groups that lie entirely before start_row
+            row_groups = []
+            skip = start_row
+            for index in range(self.source.num_row_groups):
+                group_rows = self.source.metadata.row_group(index).num_rows
+                if not row_groups and skip >= group_rows:
+                    skip -= group_rows
+                    continue
+                row_groups.append(index)
+            self.batches = self.source.iter_batches(batch_size=chunksize, row_groups=row_groups) if row_groups else iter(())
+        else:
+            self.source = pa.ipc.open_file(pa.memory_map(file_path, 'r'))
+            schema = self.source.schema
+            self.batches = (self.source.get_batch(index) for index in range(self.source.num_record_batches))
+            skip = start_row
+
+        if not schema.names:
+            self.close()
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+        self.columns = list(schema.names)
+        self.schema = schema
+        while skip > 0 and self._fill(skip):
+            taken = min(skip, self.pending.num_rows)
+            self.pending = self.pending.slice(taken)
+            skip -= taken
+
+    def _fill(self, size):
+        """Buffer batches until `size` rows are pending, False when the file is exhausted"""
+        pending_rows = self.pending.num_rows if self.pending is not None else 0
+        batches = [self.pending] if pending_rows else []
+        while pending_rows < size:
+            batch = next(self.batches, None)
+            if batch is None:
+                break
+            batches.append(self.pa.Table.from_batches([batch]))
+            pending_rows += batch.num_rows
+        if batches:
+            self.pending = self.pa.concat_tables(batches)
+        return pending_rows > 0
+
+    def _to_frame(self, table):
+        pa = self.pa
+        frame = {}
+        for name, column in zip(table.column_names, table.columns):
+            column_type = column.type
+            if name in ARROW_AMOUNT_COLUMNS and (
+                pa.types.is_integer(column_type) or pa.types.is_floating(column_type) or pa.types.is_decimal(column_type)
+            ):
+                frame[name] = column.cast(pa.float64()).to_numpy()
+            elif pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+                frame[name] = column.fill_null('').to_pandas()
+            elif pa.types.is_integer(column_type):
+                frame[name] = column.cast(pa.string()).fill_null('').to_pandas()
+            else:
+                frame[name] = [_typed_value_to_str(value) for value in column.to_pylist()]
+        return pd.DataFrame(frame, columns=self.columns, index=pd.RangeIndex(table.num_rows))
+
+    def group_row_counts(self):
+        """Rows of each Parquet row group or Feather record batch, in file order"""
+        if self.parquet:
+            return [self.source.metadata.row_group(index).num_rows for index in range(self.source.num_row_groups)]
+        # Record batches of a memory mapped file are read without copying their data
+        return [self.source.get_batch(index).num_rows for index in range(self.source.num_record_batches)]
+
+    def read_rows(self, rows):
+        """
+        DataFrame of the given data rows (ascending, counting from 0), only the row
+        groups or record batches holding them are read
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        group_starts = np.cumsum([0] + self.group_row_counts())
+        group_of_row = np.searchsorted(group_starts, rows, side='right') - 1
+        tables = []
+        for group in np.unique(group_of_row).tolist():
+            if self.parquet:
+                table = self.source.read_row_group(group)
+            else:
+                table = self.pa.Table.from_batches([self.source.get_batch(group)])
+            tables.append(table.take(rows[group_of_row == group] - group_starts[group]))
+        if not tables:
+            return pd.DataFrame(columns=self.columns, dtype=str)
+        return self._to_frame(self.pa.concat_tables(tables))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self.get_chunk()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def get_chunk(self, size=None):
+        size = size or self.chunksize
+        if not self._fill(size):
+            return None
+        table = self.pending.slice(0, size)
+        self.pending = self.pending.slice(size)
+        return self._to_frame(table)
+
+    def close(self):
+        self.pending = None
+        self.batches = iter(())
+        if hasattr(self.source, 'close'):
+            self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+def _iter_csv_record_offsets(handle):
+    """
+    Yield the byte offset of every data record of a CSV file opened in binary mode.
+
+    Record boundaries are found by tracking quote parity line by line, so quoted
+    values spanning several lines count as one record. Blank lines are skipped the
+    same way pandas skips them, the header is not yielded.
+    """
+    offset = 0
+    in_quotes = False
+    header_seen = False
+
+    for line in handle:
+        starts_record = not in_quotes
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+
+        if starts_record and line.strip(b'\r\n'):
+            if header_seen:
+                yield offset
+            header_seen = True
+        offset += len(line)
+
+
+def find_csv_row_offset(file_path, row_index):
+    """Byte offset of data row `row_index` (counting from 0), None if the file has fewer rows"""
+    with open(file_path, 'rb') as handle:
+        for current_row, offset in enumerate(_iter_csv_record_offsets(handle)):
+            if current_row == row_index:
+                return offset
+    return None
+
+
+def _read_csv_record(handle):
+    """
+    Read the record starting at the handle's position, skipping blank lines like
+    _iter_csv_record_offsets. Returns (record offset, record bytes), bytes empty at the end.
+    """
+    offset = handle.tell()
+    lines = []
+    in_quotes = False
+    for line in handle:
+        if not lines and not line.strip(b'\r\n'):
+            offset += len(line)
+            continue
+        lines.append(line)
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            break
+    return offset, b''.join(lines)
+
+
+def read_csv_records_at(file_path, byte_offsets):
+    """
+    Read the first record starting at or after each byte offset of a CSV file, without
+    reading the rest of the file.
+
+    A record start is found by skipping to the next line, so an offset inside a quoted
+    value spanning several lines can land on one of its continuation lines: records
+    that don't have as many fields as the header are dropped for that reason. Offsets
+    leading to the same record yield it once, offsets past the last record nothing.
+
+    Returns:
+        (DataFrame of the records as strings, their byte offsets, offset of the first data row)
+    """
+    columns = pd.read_csv(file_path, nrows=0).columns
+    records = {}
+    with open(file_path, 'rb') as handle:
+        first_row_offset = next(_iter_csv_record_offsets(handle), None)
+        if first_row_offset is None:
+            return pd.DataFrame(columns=columns, dtype=str), [], None
+
+        for byte_offset in sorted(byte_offsets):
+            if byte_offset <= first_row_offset:
+                handle.seek(first_row_offset)
+            else:
+                # Finish the line the offset falls in, the next one starts a record
+                handle.seek(byte_offset - 1)
+                handle.readline()
+            record_offset, record = _read_csv_record(handle)
+            if not record or record_offset in records:
+                continue
+            values = next(csv.reader(io.StringIO(record.decode('utf-8', errors='replace'), newline='')), [])
+            if len(values) == len(columns):
+                records[record_offset] = values
+
+    offsets = sorted(records)
+    frame = pd.DataFrame([records[offset] for offset in offsets], columns=columns, dtype=str)
+    return frame, offsets, first_row_offset
+
+
+def plan_csv_shards(file_path, shard_rows):
+    """
+    Split a CSV file into shards of at most `shard_rows` data rows in one pass.
+    Quoted values spanning several lines stay in one shard.
+
+    Returns:
+        list of (byte_offset, row_start, row_count) tuples, row_start counting data rows from 0
+    """
+    shards = []
+
+    with open(file_path, 'rb') as handle:
+        for row_count, offset in enumerate(_iter_csv_record_offsets(handle)):
+            if not shards or shards[-1][2] == shard_rows:
+                shards.append([offset, row_count, 0])
+            shards[-1][2] += 1
+
+    return [tuple(shard) for shard in shards]
+
+
+def estimate_row_count(file_path, sample_size=1024 * 1024):
+    """
+    Cheap estimate of the number of data rows in a file, used for progress ETAs.
+
+    CSV files are extrapolated from the average length of the records starting
+    in the first `sample_size` bytes, .xlsx sheets report their dimensions and
+    Parquet files their row count. Returns None when no estimate is available
+    (legacy .xls, Feather, sheets without dimensions).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.csv':
+        file_size = os.path.getsize(file_path)
+        records = 0
+        with open(file_path, 'rb') as handle:
+            # Records, not lines: quoted values spanning several lines count once
+            for offset in _iter_csv_record_offsets(handle):
+                if offset >= sample_size:
+                    # The header and the records before this offset, extrapolated
+                    return max(round(file_size * (records + 1) / offset) - 1, 0)
+                records += 1
+        return records
+    if extension in ('.xlsx', '.xlsm'):
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            max_row = workbook.worksheets[0].max_row
+        finally:
+            workbook.close()
+        return max(max_row - 1, 0) if max_row else None
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(file_path).metadata.num_rows
+    return None
+
+
+def open_chunk_reader(file_path, chunksize, byte_offset=None, row_count=None, start_row=0):
+    """
+    Return a chunked reader for the given file based on its extension.
+
+    Params:
+        file_path (str): Path to a .csv, .xlsx/.xlsm, .xls, .parquet or .feather file
+        chunksize (int): Number of rows per chunk
+        byte_offset (int): CSV only, read a shard starting at this offset (see plan_csv_shards)
+        row_count (int): CSV only, number of rows in that shard
+        start_row (int): Skip this many data rows, used to resume an import (ignored for shards)
+    Returns:
+        An iterable of DataFrames (all values as strings, except numeric Parquet/Feather
+        price columns) that supports `with`
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.csv' and byte_offset is not None:
+        return CsvRangeReader(file_path, chunksize, byte_offset, row_count)
+    if extension == '.csv' and start_row:
+        # Seek straight to the row instead of parsing everything before it
+        start_offset = find_csv_row_offset(file_path, start_row)
+        if start_offset is None:
+            columns = pd.read_csv(file_path, nrows=0).columns
+            return FrameChunkReader(pd.DataFrame(columns=columns, dtype=str), chunksize)
+        return CsvRangeReader(file_path, chunksize, start_offset, None)
+    if extension == '.csv':
+        return pd.read_csv(
+            file_path,
+            chunksize=chunksize,
+            dtype=str,
+            keep_default_na=False,
+            low_memory=False
+        )
+    if extension in ('.xlsx', '.xlsm'):
+        return ExcelChunkReader(file_path, chunksize, start_row=start_row)
+    if extension in ARROW_EXTENSIONS:
+        return ArrowChunkReader(file_path, chunksize, start_row=start_row)
+
+    frame = pd.read_excel(file_path, dtype=str, keep_default_na=False)
+    if len(frame.columns) == 0:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    return FrameChunkReader(frame, chunksize, start_row=start_row)
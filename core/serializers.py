@@ -1,12 +1,16 @@
 from rest_framework import serializers
 import re
 from decimal import Decimal
-from core.models import Product, ImportAnalytics, Logs
+from core.models import Product, ImportAnalytics, ImportChunkStats, ImportIssueSummary, Logs
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
+        # Imports upsert on product_id, so an existing product_id is an update rather
+        # than a validation error (this also saves a uniqueness query per row)
+        extra_kwargs = {'product_id': {'validators': []}}
+        read_only_fields = ('content_hash',)
 
     def create(self, validated_data):
         # Apply the currencies extracted during validation
@@ -27,11 +31,31 @@ class ProductSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ProductReadSerializer(serializers.ModelSerializer):
+    """Products as served by the product API, without the importer's bookkeeping"""
+    class Meta:
+        model = Product
+        exclude = ('content_hash',)
+
+
 class ImportAnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = ImportAnalytics
         fields = '__all__'
 
+
+class ImportChunkStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportChunkStats
+        fields = '__all__'
+
+
+class ImportIssueSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportIssueSummary
+        fields = '__all__'
+
+
 class LogsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Logs
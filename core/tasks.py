@@ -1,27 +1,212 @@
-from celery import shared_task
-from core.processing import process_excel_data
+import os
+from celery import chord, shared_task
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.utils import timezone
+from core.analytics import refresh_import_summary
+from core.models import ImportAnalytics
+from core.partitions import maintain_log_partitions
+from core.dry_run import dry_run_import
+from core.processing import process_excel_data, finalize_sharded_import
+from core.readers import plan_csv_shards
 from core.utils import DatabaseLogger
 
-@shared_task(bind=True)
-def process_excel_file_task(self, file_path):
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def process_excel_file_task(self, file_path, write_engine=None, import_analytics_id=None):
     """
     Celery task to process Excel file in the background
+
+    import_analytics_id is the record created for the import at upload time, without it
+    the task creates its own. The message is acknowledged only once the task finishes,
+    so it is redelivered when the worker dies. The redelivered task finds the import it
+    started by its task id and resumes it from the last committed chunk.
+    """
+    task_id = self.request.id
+
+    # Buffer the task's logs, pending records are flushed when the task exits or raises
+    with DatabaseLogger.buffered():
+        DatabaseLogger.log(
+            level="INFO",
+            message=f"Starting background processing of file: {file_path}",
+            task_name=f"celery-task-{task_id}"
+        )
+
+        try:
+            if import_analytics_id is None:
+                interrupted_import = ImportAnalytics.objects.filter(task_id=task_id, status="processing").first()
+                import_analytics_id = interrupted_import.id if interrupted_import is not None else None
+            else:
+                ImportAnalytics.objects.filter(pk=import_analytics_id).update(task_id=task_id)
+
+            if import_analytics_id is not None:
+                # Starts the record created at upload, or continues an import after a redelivery
+                result = process_excel_data(
+                    file_path, write_engine=write_engine, resume_import_id=import_analytics_id
+                )
+            else:
+                result = process_excel_data(file_path, write_engine=write_engine, task_id=task_id)
+            return result
+        except Exception as e:
+            DatabaseLogger.log(
+                level="ERROR",
+                message=f"Background task failed for file: {file_path}",
+                task_name=f"celery-task-{task_id}",
+                error=e
+            )
+            raise
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def resume_import_task(self, import_analytics_id, write_engine=None):
+    """
+    Celery task continuing an interrupted import from its last committed chunk
+    """
+    task_id = self.request.id
+
+    with DatabaseLogger.buffered():
+        import_analytics = ImportAnalytics.objects.get(pk=import_analytics_id)
+        # Later redeliveries of this task resume the same import
+        ImportAnalytics.objects.filter(pk=import_analytics_id).update(task_id=task_id)
+        DatabaseLogger.log(
+            level="INFO",
+            message=f"Resuming import {import_analytics_id} of file: {import_analytics.file_path}",
+            task_name=f"celery-task-{task_id}"
+        )
+        return process_excel_data(
+            import_analytics.file_path, write_engine=write_engine, resume_import_id=import_analytics_id
+        )
+
+
+@shared_task(bind=True)
+def process_sharded_import_task(self, file_path, write_engine=None, shard_rows=None, import_analytics_id=None):
+    """
+    Celery task that fans a CSV import out across workers.
+
+    The file is split into shards of IMPORT_SHARD_ROWS rows, each processed by its own
+    process_import_shard_task, and a chord callback finalizes the shared ImportAnalytics
+    record. The task is replaced by the chord, so its result is the merged import result.
+    Files that aren't CSV or fit in one shard are processed serially.
+    import_analytics_id is the record created for the import at upload time, without it
+    the task creates its own.
+    """
+    task_id = self.request.id
+    shard_rows = shard_rows or settings.IMPORT_SHARD_ROWS
+
+    with DatabaseLogger.buffered():
+        shards = plan_csv_shards(file_path, shard_rows) if file_path.endswith('.csv') else []
+        if len(shards) <= 1:
+            DatabaseLogger.log(
+                level="INFO",
+                message=f"Sharding not applicable for file: {file_path}, processing serially",
+                task_name=f"celery-task-{task_id}"
+            )
+            return process_excel_data(
+                file_path, write_engine=write_engine, resume_import_id=import_analytics_id, task_id=task_id
+            )
+
+        if import_analytics_id is not None:
+            import_analytics = ImportAnalytics.objects.get(pk=import_analytics_id)
+            import_analytics.task_id = task_id
+            import_analytics.read_time = 0
+            import_analytics.save(update_fields=['task_id', 'read_time'])
+        else:
+            import_analytics = ImportAnalytics.objects.create(
+                file_name=os.path.basename(file_path),
+                task_id=task_id,
+                start_time=timezone.now(),
+                status="processing",
+                read_time=0,
+            )
+            refresh_import_summary()
+        expected_records = sum(row_count for _, _, row_count in shards)
+        DatabaseLogger.log(
+            level="INFO",
+            message=f"Dispatching {len(shards)} shards ({expected_records} rows) for file: {file_path}",
+            task_name=f"celery-task-{task_id}"
+        )
+
+    header = [
+        process_import_shard_task.s(file_path, import_analytics.id, byte_offset, row_start, row_count, write_engine)
+        for byte_offset, row_start, row_count in shards
+    ]
+    return self.replace(chord(header, finalize_sharded_import_task.s(import_analytics.id, expected_records)))
+
+
+@shared_task
+def process_import_shard_task(file_path, import_analytics_id, byte_offset, row_start, row_count, write_engine=None):
+    """Celery task processing one row range of a sharded import"""
+    with DatabaseLogger.buffered():
+        return process_excel_data(
+            file_path,
+            write_engine=write_engine,
+            import_analytics_id=import_analytics_id,
+            byte_offset=byte_offset,
+            row_start=row_start,
+            row_count=row_count,
+        )
+
+
+@shared_task
+def finalize_sharded_import_task(shard_results, import_analytics_id, expected_records):
+    """Chord callback merging the shard results into the final import result"""
+    with DatabaseLogger.buffered():
+        return finalize_sharded_import(import_analytics_id, shard_results, expected_records)
+
+
+@shared_task(bind=True)
+def dry_run_import_task(self, file_path, sample_size=None, sample_every=None, seed=None):
+    """
+    Celery task validating a file without importing it, the result is the dry run
+    report. Only its outcome is logged, not the row issues. The uploaded file is
+    deleted once validated, whatever the outcome.
     """
     task_id = self.request.id
-    DatabaseLogger.log(
-        level="INFO",
-        message=f"Starting background processing of file: {file_path}",
-        task_name=f"celery-task-{task_id}"
-    )
-    
     try:
-        result = process_excel_data(file_path)
-        return result
+        report = dry_run_import(file_path, sample_size=sample_size, sample_every=sample_every, seed=seed)
     except Exception as e:
         DatabaseLogger.log(
             level="ERROR",
-            message=f"Background task failed for file: {file_path}",
+            message=f"Dry run failed for file: {file_path}",
             task_name=f"celery-task-{task_id}",
             error=e
         )
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    DatabaseLogger.log(
+        level="INFO",
+        message=(f"Dry run ({report['mode']}) of {report['file_name']}: {report['rows_validated']} of "
+                 f"{report['rows_read']} rows validated, {report['failed_rows']} failed "
+                 f"(error rate {report['error_rate']:.2%}) in {report['time_taken']:.2f}s"),
+        task_name=f"celery-task-{task_id}"
+    )
+    return report
+
+
+@shared_task
+def maintain_log_partitions_task(retention_days=None, days_ahead=None):
+    """
+    Periodic task creating the upcoming daily Logs partitions and dropping the ones
+    older than LOGS_RETENTION_DAYS, scheduled by Celery beat
+    """
+    result = maintain_log_partitions(
+        retention_days if retention_days is not None else settings.LOGS_RETENTION_DAYS,
+        days_ahead if days_ahead is not None else settings.LOGS_PARTITIONS_AHEAD,
+    )
+    DatabaseLogger.log(
+        level="INFO",
+        message=(
+            f"Log maintenance: created {len(result['created'])} partitions, dropped "
+            f"{len(result['dropped'])} partitions ({', '.join(result['dropped']) or 'none'}), "
+            f"deleted {result['deleted']} rows"
+        ),
+        task_name="maintain-log-partitions"
+    )
+    return result
+
+
+@worker_process_shutdown.connect
+def flush_buffered_logs(**kwargs):
+    """Write out any log records still buffered when a worker process is shut down"""
+    DatabaseLogger.flush()
@@ -1,3 +1,1328 @@
-from django.test import TestCase
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipIf, skipUnless
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.analytics import get_import_summary
+from core.chunk_sizing import ChunkSizer
+from core.cleaning import ChunkIssue, clean_chunk
+from core.dry_run import dry_run_import
+from core.issues import MAX_SAMPLES, decode_row_ranges, encode_row_ranges, summarize_issue
+from core.models import ChunkedUpload, ImportAnalytics, ImportChunkStats, ImportIssueSummary, Logs, Product
+from core.partitions import DEFAULT_PARTITION, create_log_partitions, list_log_partitions, maintain_log_partitions
+from core.pipeline import PipelinedChunkValidator, SerialChunkValidator
+from core.processing import finalize_sharded_import, process_excel_data
+from core.progress import get_task_progress, progress_channel, stream_import_progress
+from core.readers import ArrowChunkReader, ExcelChunkReader, _iter_csv_record_offsets, find_csv_row_offset, open_chunk_reader, plan_csv_shards
+from core.tasks import dry_run_import_task
+from core.utils import DatabaseLogger
+from core.validation import validate_chunk
+from core.views import LogsCursorPagination, ProductCursorPagination
+from core.writers import CopyProductWriter, OrmProductWriter, get_product_writer
 
-# Create your tests here.
+FEED_HEADER = [
+    'id', 'title', 'description', 'link', 'image_link', 'availability', 'price', 'condition', 'brand', 'gtin',
+    'sale_price', 'item_group_id', 'google_product_category', 'product_type', 'shipping(country:price)',
+    'additional_image_links', 'size', 'color', 'material', 'pattern', 'gender', 'Model',
+    'product_length', 'product_width', 'product_height', 'product_weight', 'lifestyle_image_link',
+    'max_handling_time', 'is_bundle',
+]
+
+
+def feed_row(position, **values):
+    """A complete, valid feed row as a dict keyed by FEED_HEADER, overridden by `values`"""
+    row = {
+        'id': f'SKU-{position}',
+        'title': f'Product {position}',
+        'description': f'Description of product {position}',
+        'link': f'https://example.com/products/{position}',
+        'image_link': f'https://example.com/images/{position}.jpg',
+        'availability': 'in_stock',
+        'price': f'{position}.50 EUR',
+        'condition': 'new',
+        'brand': 'Acme',
+        'gtin': f'{4000000000000 + position}',
+        'sale_price': '',
+        'item_group_id': f'GROUP-{position % 3}',
+        'google_product_category': 'Apparel',
+        'product_type': 'Shirts',
+        'shipping(country:price)': 'DE:4.95 EUR',
+        'additional_image_links': '',
+        'size': 'M',
+        'color': 'blue',
+        'material': 'cotton',
+        'pattern': 'plain',
+        'gender': 'unisex',
+        'Model': f'M-{position}',
+        'product_length': '',
+        'product_width': '',
+        'product_height': '',
+        'product_weight': '',
+        'lifestyle_image_link': '',
+        'max_handling_time': '',
+        'is_bundle': '',
+    }
+    row.update(values)
+    return row
+
+
+class FeedFileMixin:
+    """Writes feed files into a temporary directory removed after each test"""
+
+    def setUp(self):
+        super().setUp()
+        self.feed_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.feed_dir, ignore_errors=True)
+
+    def write_csv(self, rows, name='feed.csv', header=FEED_HEADER):
+        path = os.path.join(self.feed_dir, name)
+        with open(path, 'w', newline='', encoding='utf-8') as feed_file:
+            writer = csv.DictWriter(feed_file, fieldnames=header)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+
+def clean_row_reference(row_data, absolute_row, default_currency):
+    """
+    The row-by-row cleaning clean_chunk replaced, kept as the reference it must match.
+    Returns (failed, cleaned_data, log entries as (level, message)).
+    """
+    logs = []
+    required_fields = [
+        'id', 'title', 'description', 'link', 'image_link',
+        'availability', 'price', 'condition', 'brand', 'gtin'
+    ]
+    missing_fields = [field for field in required_fields if not row_data.get(field)]
+    if missing_fields:
+        logs.append(("ERROR", f"Row {absolute_row}: Missing required fields: {', '.join(missing_fields)}"))
+        return True, None, logs
+
+    cleaned_data = {k: ('' if pd.isna(v) else str(v).strip()) for k, v in row_data.items()}
+    for source, target in (('id', 'product_id'), ('shipping(country:price)', 'shipping'), ('Model', 'model')):
+        if source in cleaned_data:
+            cleaned_data[target] = cleaned_data.pop(source)
+
+    if cleaned_data.get('additional_image_links'):
+        try:
+            json.loads(cleaned_data['additional_image_links'])
+        except (ValueError, TypeError):
+            links = [link.strip() for link in cleaned_data['additional_image_links'].split(',')]
+            cleaned_data['additional_image_links'] = json.dumps(links)
+
+    def parse_amount(text):
+        amount, _, currency = text.partition(' ') if ' ' in text else (text, '', '')
+        return float(amount.replace(',', '.')), currency or default_currency
+
+    price_str = str(cleaned_data['price'])
+    try:
+        cleaned_data['price'], cleaned_data['currency'] = parse_amount(price_str)
+    except ValueError:
+        logs.append(("ERROR", f"Row {absolute_row}: Invalid critical price format: {price_str}"))
+        return True, None, logs
+
+    if cleaned_data.get('sale_price'):
+        sale_price_str = str(cleaned_data['sale_price'])
+        try:
+            cleaned_data['sale_price'], cleaned_data['sale_price_currency'] = parse_amount(sale_price_str)
+        except ValueError:
+            logs.append(("WARNING", f"Row {absolute_row}: Invalid sale_price format: {sale_price_str}. It will be omitted."))
+            cleaned_data.pop('sale_price', None)
+            cleaned_data.pop('sale_price_currency', None)
+
+    if 'is_bundle' in cleaned_data:
+        value = cleaned_data['is_bundle'].lower()
+        if value in ('true', 't', 'yes', 'y', '1'):
+            cleaned_data['is_bundle'] = True
+        elif value in ('false', 'f', 'no', 'n', '0'):
+            cleaned_data['is_bundle'] = False
+
+    processed_optional_fields = []
+    if cleaned_data.get('max_handling_time'):
+        try:
+            cleaned_data['max_handling_time'] = int(cleaned_data['max_handling_time'])
+            processed_optional_fields.append('max_handling_time')
+        except ValueError:
+            logs.append(("INFO", f"Row {absolute_row}: Invalid max_handling_time format: "
+                                 f"{cleaned_data['max_handling_time']}. Field will be omitted."))
+            cleaned_data.pop('max_handling_time', None)
+    if cleaned_data.get('lifestyle_image_link'):
+        if re.match(r'^https?://.+', cleaned_data['lifestyle_image_link']):
+            processed_optional_fields.append('lifestyle_image_link')
+        else:
+            logs.append(("INFO", f"Row {absolute_row}: Invalid lifestyle_image_link format: "
+                                 f"{cleaned_data['lifestyle_image_link']}. Field will be omitted."))
+            cleaned_data.pop('lifestyle_image_link', None)
+    for dimension_field in ['product_length', 'product_width', 'product_height', 'product_weight']:
+        if cleaned_data.get(dimension_field):
+            processed_optional_fields.append(dimension_field)
+    if processed_optional_fields:
+        logs.append(("INFO", f"Row {absolute_row}: Successfully processed optional fields: "
+                             f"{', '.join(processed_optional_fields)}"))
+
+    model_fields = [f.name for f in Product._meta.get_fields() if hasattr(f, 'name')] + ['product_id']
+    unknown_fields = [field for field in cleaned_data if field not in model_fields]
+    if unknown_fields:
+        logs.append(("WARNING", f"Row {absolute_row}: Unknown fields will be ignored: {', '.join(unknown_fields)}"))
+        for field in unknown_fields:
+            cleaned_data.pop(field, None)
+    return False, cleaned_data, logs
+
+
+def queued_task(args, kwargs, task_id):
+    """Stands in for apply_async, the task is sent under the id chosen by the caller"""
+    return mock.Mock(id=task_id)
+
+
+def fixed_chunk_sizer(size):
+    return ChunkSizer(size, min_size=size, max_size=size, target_time=1, max_transaction_time=1,
+                      max_rss=0, adaptive=False)
+
+
+class DatabaseLoggerTests(TestCase):
+    def test_buffered_records_keep_the_time_they_were_logged(self):
+        with DatabaseLogger.buffered():
+            for position in range(3):
+                DatabaseLogger.log(level="INFO", message=f"message {position}", task_name="buffered")
+                time.sleep(0.001)
+            logged_before = timezone.now()
+            self.assertFalse(Logs.objects.exists())
+
+        timestamps = list(Logs.objects.order_by('id').values_list('created_at', flat=True))
+        self.assertEqual(len(timestamps), 3)
+        self.assertEqual(timestamps, sorted(set(timestamps)))
+        self.assertLess(timestamps[-1], logged_before)
+
+    def test_unbuffered_records_are_written_right_away(self):
+        DatabaseLogger.log(level="ERROR", message="failed", task_name="unbuffered", error=ValueError("bad value"))
+        log = Logs.objects.get()
+        self.assertEqual(log.level, "ERROR")
+        self.assertIn("ValueError: bad value", log.traceback)
+
+
+class PipelinedChunkValidatorTests(FeedFileMixin, SimpleTestCase):
+    def validate_file(self, path, validator_class, **kwargs):
+        results = []
+        with open_chunk_reader(path, 4) as data_reader:
+            validator = validator_class(data_reader, fixed_chunk_sizer(4), 'EUR', **kwargs)
+            try:
+                for validated_chunk in validator:
+                    results.append((
+                        validated_chunk.row_count,
+                        [(record.row, dict(record.data)) for record in validated_chunk.valid_records],
+                        validated_chunk.failure_count,
+                        validated_chunk.warning_count,
+                        validated_chunk.log_entries,
+                    ))
+            finally:
+                validator.close()
+        return results
+
+    def test_worker_processes_validate_like_the_serial_validator(self):
+        rows = [feed_row(position) for position in range(1, 11)]
+        rows[2]['title'] = ''
+        rows[5]['price'] = 'free'
+        rows[7]['color'] = ''
+        path = self.write_csv(rows)
+
+        pipelined = self.validate_file(path, PipelinedChunkValidator, workers=2, queue_size=2)
+        serial = self.validate_file(path, SerialChunkValidator)
+
+        self.assertEqual(pipelined, serial)
+        self.assertEqual([row_count for row_count, *_ in pipelined], [4, 4, 2])
+        self.assertEqual(sum(failure_count for _, _, failure_count, _, _ in pipelined), 2)
+
+
+class CleanChunkTests(SimpleTestCase):
+    def assert_matches_row_by_row(self, rows, header=FEED_HEADER + ['promo_code']):
+        chunk = pd.DataFrame([{column: row.get(column, '') for column in header} for row in rows], dtype=object)
+        cleaned = clean_chunk(chunk, 'EUR')
+
+        expected_records = {}
+        expected_logs = []
+        for position, row in enumerate(chunk.to_dict('records')):
+            failed, cleaned_data, logs = clean_row_reference(row, position + 1, 'EUR')
+            expected_logs.extend(logs)
+            if not failed:
+                expected_records[position] = cleaned_data
+
+        self.assertEqual(list(np.flatnonzero(cleaned.failed)),
+                         [position for position in range(len(rows)) if position not in expected_records])
+        self.assertEqual(dict(cleaned.records()), expected_records)
+        self.assertCountEqual(
+            [(issue.level, message) for issue in cleaned.issues for message in issue.messages(0)],
+            expected_logs,
+        )
+
+    def test_matches_the_row_by_row_cleaning(self):
+        self.assert_matches_row_by_row([
+            feed_row(1),
+            feed_row(2, title='', gtin=''),
+            feed_row(3, price='free'),
+            feed_row(4, price='12,50', sale_price='9,99 USD'),
+            feed_row(5, sale_price='cheap', is_bundle='Yes', max_handling_time='+4'),
+            feed_row(6, sale_price='0 EUR', is_bundle='maybe', max_handling_time='three'),
+            feed_row(7, lifestyle_image_link='ftp://example.com/a.jpg', product_weight='2 kg'),
+            feed_row(8, additional_image_links='https://example.com/a.jpg ,https://example.com/b.jpg'),
+            feed_row(9, additional_image_links='["https://example.com/a.jpg"]', promo_code='SPRING'),
+            feed_row(10, title='  Padded title  ', price=' 3.5 EUR ', additional_image_links='a "quoted", b'),
+            feed_row(11, availability=' ', max_handling_time='3.0', is_bundle='F'),
+        ])
+
+    def test_matches_the_row_by_row_cleaning_without_optional_columns(self):
+        header = FEED_HEADER[:10]
+        self.assert_matches_row_by_row([feed_row(1), feed_row(2, price='7 usd'), feed_row(3, brand='')], header)
+
+    def test_a_feed_without_a_price_column_rejects_every_row(self):
+        chunk = pd.DataFrame([feed_row(1)], dtype=object).drop(columns=['price'])
+        cleaned = clean_chunk(chunk, 'EUR')
+        self.assertEqual(cleaned.failure_count, 1)
+        self.assertEqual(cleaned.issues[0].messages(0), ['Row 1: Missing required fields: price'])
+
+
+class IssueSummaryTests(SimpleTestCase):
+    def test_row_ranges_round_trip(self):
+        for rows, text in [
+            ([3, 4, 5, 9, 11, 12], '3-5,9,11-12'),
+            ([7], '7'),
+            ([1, 3, 5], '1,3,5'),
+            ([], ''),
+        ]:
+            self.assertEqual(encode_row_ranges(rows), text)
+            self.assertEqual(decode_row_ranges(text), rows)
+        self.assertEqual(encode_row_ranges(np.arange(100, 200)), '100-199')
+
+    def test_a_field_issue_keeps_distinct_samples(self):
+        details = np.array(['cheap', 'cheap', 'n/a', 'tbd', 'x', 'y', 'z'], dtype=object)
+        issue = ChunkIssue("WARNING", 'invalid_sale_price', 'sale_price', np.array([0, 1, 2, 4, 5, 6, 9]),
+                           details, "Invalid sale_price format: {detail}")
+
+        [summary] = summarize_issue(issue, row_offset=100)
+
+        self.assertEqual((summary.level, summary.code, summary.field), ("WARNING", 'invalid_sale_price', 'sale_price'))
+        self.assertEqual(summary.rows, [101, 102, 103, 105, 106, 107, 110])
+        self.assertEqual(summary.samples, ['cheap', 'n/a', 'tbd', 'x', 'y'][:MAX_SAMPLES])
+
+    def test_an_issue_listing_fields_gets_a_summary_per_field(self):
+        issue = ChunkIssue("INFO", 'optional_fields_processed', None, np.array([0, 3, 4]),
+                           np.array(['max_handling_time', 'max_handling_time, product_weight', 'product_weight'],
+                                    dtype=object),
+                           "Successfully processed optional fields: {detail}")
+
+        summaries = {summary.field: summary.rows for summary in summarize_issue(issue, row_offset=0)}
+
+        self.assertEqual(summaries, {'max_handling_time': [1, 4], 'product_weight': [4, 5]})
+
+
+class ChunkSizerTests(SimpleTestCase):
+    def sizer(self, **kwargs):
+        options = dict(min_size=100, max_size=10000, target_time=2.0, max_transaction_time=5.0,
+                       max_rss=1024 * 1024 * 1024)
+        options.update(kwargs)
+        return ChunkSizer(1000, **options)
+
+    def test_a_fixed_sizer_never_moves(self):
+        sizer = self.sizer(adaptive=False)
+        self.assertEqual(sizer.observe(1000, 60.0, 60.0, 2 ** 40), 1000)
+
+    def test_moves_towards_the_target_time_by_at_most_a_factor_of_two(self):
+        sizer = self.sizer()
+        # 1000 rows in 1.6s, 1250 rows take 2s
+        self.assertEqual(sizer.observe(1000, 1.6, 0.5, 0), 1250)
+        # Fast chunks grow it, but only twofold per chunk
+        self.assertEqual(sizer.observe(1250, 0.1, 0.1, 0), 2500)
+        # Slow chunks shrink it, at most by half
+        self.assertEqual(sizer.observe(2500, 100.0, 0.1, 0), 1250)
+
+    def test_stays_within_its_bounds(self):
+        sizer = self.sizer(max_size=1500)
+        self.assertEqual(sizer.observe(1000, 0.0, 0.0, 0), 1500)
+        sizer = self.sizer(min_size=800)
+        self.assertEqual(sizer.observe(1000, 100.0, 0.0, 0), 800)
+
+    def test_long_transactions_and_high_rss_cap_the_size(self):
+        # The transaction would have fit 5s at 1000 rows per 10s
+        self.assertEqual(self.sizer().observe(1000, 1.0, 10.0, 0), 500)
+        self.assertEqual(self.sizer().observe(1000, 1.0, 0.1, 2 * 1024 ** 3), 500)
+
+    def test_an_empty_chunk_changes_nothing(self):
+        self.assertEqual(self.sizer().observe(0, 1.0, 1.0, 0), 1000)
+
+
+class ExcelChunkReaderTests(FeedFileMixin, SimpleTestCase):
+    def write_sheet(self, rows):
+        workbook = Workbook()
+        sheet = workbook.active
+        for row in rows:
+            sheet.append(row)
+        # Formatted but empty cells below the data still show up as rows of the sheet
+        sheet.cell(row=len(rows) + 3, column=1).font = Font(bold=True)
+        path = os.path.join(self.feed_dir, 'feed.xlsx')
+        workbook.save(path)
+        return path
+
+    def test_rows_match_read_excel_with_blank_rows(self):
+        path = self.write_sheet([
+            ['id', 'title', 'price'],
+            ['SKU-1', 'Product 1', 10],
+            [None, None, None],
+            ['SKU-2', None, 12.5],
+            [None, None, None],
+            [None, None, None],
+            [None, 'Product 3', None],
+            [None, None, None],
+        ])
+        expected = pd.read_excel(path, dtype=str, keep_default_na=False)
+        self.assertEqual(len(expected), 6)
+
+        for chunksize in (1, 2, 4, 10):
+            with ExcelChunkReader(path, chunksize) as reader:
+                chunks = list(reader)
+            self.assertTrue(all(len(chunk) <= chunksize for chunk in chunks))
+            pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+        for start_row in (2, 3, 5):
+            with ExcelChunkReader(path, 2, start_row=start_row) as reader:
+                resumed = pd.concat(list(reader), ignore_index=True)
+            pd.testing.assert_frame_equal(resumed, expected.iloc[start_row:].reset_index(drop=True))
+
+class ArrowChunkReaderTests(FeedFileMixin, SimpleTestCase):
+    def feed_table(self, count, **columns):
+        """Feed rows as a text Arrow table, `columns` replaced by typed arrays"""
+        table = pa.Table.from_pandas(
+            pd.DataFrame([feed_row(position) for position in range(1, count + 1)], columns=FEED_HEADER),
+            preserve_index=False,
+        )
+        for name, values in columns.items():
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, values)
+            else:
+                table = table.append_column(name, values)
+        return table
+
+    def write_parquet(self, table, row_group_size):
+        path = os.path.join(self.feed_dir, 'feed.parquet')
+        pq.write_table(table, path, row_group_size=row_group_size)
+        return path
+
+    def write_feather(self, table, batch_size):
+        path = os.path.join(self.feed_dir, 'feed.feather')
+        with pa.ipc.new_file(path, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=batch_size):
+                writer.write_batch(batch)
+        return path
+
+    def read_ids(self, path, chunksize, start_row=0):
+        with ArrowChunkReader(path, chunksize, start_row=start_row) as reader:
+            return [list(chunk['id']) for chunk in reader]
+
+    def test_chunks_are_sliced_across_row_groups_and_record_batches(self):
+        table = self.feed_table(10)
+        expected = [['SKU-1', 'SKU-2', 'SKU-3'], ['SKU-4', 'SKU-5', 'SKU-6'], ['SKU-7', 'SKU-8', 'SKU-9'], ['SKU-10']]
+        self.assertEqual(self.read_ids(self.write_parquet(table, 4), 3), expected)
+        self.assertEqual(self.read_ids(self.write_feather(table, 4), 3), expected)
+
+    def test_start_row_skips_whole_row_groups_without_reading_them(self):
+        path = self.write_parquet(self.feed_table(10), 4)
+        with mock.patch('pyarrow.parquet.ParquetFile.iter_batches', autospec=True,
+                        side_effect=pq.ParquetFile.iter_batches) as iter_batches:
+            ids = self.read_ids(path, 3, start_row=5)
+
+        self.assertEqual(iter_batches.call_args.kwargs['row_groups'], [1, 2])
+        self.assertEqual(ids, [['SKU-6', 'SKU-7', 'SKU-8'], ['SKU-9', 'SKU-10']])
+        self.assertEqual(self.read_ids(self.write_feather(self.feed_table(10), 4), 3, start_row=5), ids)
+        self.assertEqual(self.read_ids(path, 3, start_row=10), [])
+
+    def test_numeric_prices_keep_their_numbers_and_take_the_currency_column(self):
+        table = self.feed_table(
+            3,
+            price=pa.array([12.5, None, 7], type=pa.float64()),
+            currency=pa.array(['USD', 'GBP', None]),
+            sale_price=pa.array([None, 3, 5], type=pa.int64()),
+        )
+        with ArrowChunkReader(self.write_parquet(table, 2), 10) as reader:
+            chunk = reader.get_chunk()
+
+        self.assertEqual(chunk['price'].dtype, np.float64)
+        self.assertTrue(np.isnan(chunk['price'][1]))
+        self.assertEqual(list(chunk['currency']), ['USD', 'GBP', ''])
+
+        cleaned = clean_chunk(chunk, 'EUR')
+        self.assertEqual(list(np.flatnonzero(cleaned.failed)), [1])
+        # A null price is a missing one, like an empty cell
+        self.assertEqual([issue.code for issue in cleaned.issues if issue.level == 'ERROR'], ['missing_required_fields'])
+        records = dict(cleaned.records())
+        self.assertEqual((records[0]['price'], records[0]['currency']), (12.5, 'USD'))
+        self.assertIsNone(records[0].get('sale_price'))
+        self.assertEqual((records[2]['price'], records[2]['currency']), (7.0, 'EUR'))
+        self.assertEqual((records[2]['sale_price'], records[2]['sale_price_currency']), (5.0, 'EUR'))
+
+    def test_nulls_read_as_empty_cells_and_typed_values_as_feed_text(self):
+        table = self.feed_table(
+            2,
+            gtin=pa.array([4000000000001, None], type=pa.int64()),
+            brand=pa.array([None, 'Acme']),
+            is_bundle=pa.array([True, None]),
+            max_handling_time=pa.array([3.0, 2.5]),
+            additional_image_links=pa.array([['https://example.com/a.jpg', 'https://example.com/b.jpg'], None]),
+        )
+        with ArrowChunkReader(self.write_feather(table, 1), 10) as reader:
+            chunk = reader.get_chunk()
+
+        self.assertEqual(list(chunk['gtin']), ['4000000000001', ''])
+        self.assertEqual(list(chunk['brand']), ['', 'Acme'])
+        self.assertEqual(list(chunk['is_bundle']), ['true', ''])
+        self.assertEqual(list(chunk['max_handling_time']), ['3', '2.5'])
+        self.assertEqual(json.loads(chunk['additional_image_links'][0]),
+                         ['https://example.com/a.jpg', 'https://example.com/b.jpg'])
+        self.assertEqual(chunk['additional_image_links'][1], '')
+
+class CsvShardingTests(FeedFileMixin, SimpleTestCase):
+    CONTENT = (
+        b'id,title,description\r\n'
+        b'SKU-1,One,plain\r\n'
+        b'\r\n'
+        b'SKU-2,Two,"spans\r\ntwo lines"\r\n'
+        b'SKU-3,Three,"has ""quotes"", and a comma"\r\n'
+        b'SKU-4,Four,"three\nlines\nhere"\n'
+        b'SKU-5,Five,last'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.feed_dir, 'feed.csv')
+        with open(self.path, 'wb') as feed_file:
+            feed_file.write(self.CONTENT)
+
+    def record_starts(self):
+        return [self.CONTENT[offset:].split(b',', 1)[0] for offset in _iter_csv_record_offsets(io.BytesIO(self.CONTENT))]
+
+    def test_record_offsets_skip_blank_lines_and_quoted_newlines(self):
+        self.assertEqual(self.record_starts(), [b'SKU-1', b'SKU-2', b'SKU-3', b'SKU-4', b'SKU-5'])
+
+    def test_find_row_offset(self):
+        self.assertEqual(self.CONTENT[find_csv_row_offset(self.path, 3):].split(b',', 1)[0], b'SKU-4')
+        self.assertIsNone(find_csv_row_offset(self.path, 5))
+
+    def test_shards_cover_every_row_once(self):
+        shards = plan_csv_shards(self.path, 2)
+        self.assertEqual([(row_start, row_count) for _, row_start, row_count in shards], [(0, 2), (2, 2), (4, 1)])
+
+        product_ids = []
+        for byte_offset, row_start, row_count in shards:
+            with open_chunk_reader(self.path, 10, byte_offset=byte_offset, row_count=row_count) as data_reader:
+                for chunk in data_reader:
+                    product_ids.extend(chunk['id'])
+        self.assertEqual(product_ids, ['SKU-1', 'SKU-2', 'SKU-3', 'SKU-4', 'SKU-5'])
+
+
+class ProductPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # One import stamps all of its rows with the same time, more of them than
+        # the OFFSET DRF's cursor pagination allows
+        cls.tied_count = ProductCursorPagination.offset_cutoff + 150
+        Product.objects.bulk_create(
+            Product(product_id=f'SKU-{position}', title=f'Product {position}', price=1)
+            for position in range(cls.tied_count + 5)
+        )
+        tied_at = timezone.now()
+        ids = list(Product.objects.order_by('id').values_list('id', flat=True))
+        Product.objects.filter(id__in=ids[:cls.tied_count]).update(updated_at=tied_at)
+        Product.objects.filter(id__in=ids[cls.tied_count:]).update(updated_at=tied_at - timezone.timedelta(days=1))
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            # A cursor stuck inside the tied rows would loop forever
+            self.assertLess(len(pages), 20)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([product['id'] for product in response.json()['results']])
+            url = response.json()[link]
+        return pages
+
+    def test_pages_through_more_tied_rows_than_the_offset_cutoff(self):
+        pages = self.walk(reverse('products-list') + '?page_size=100&fields=title', 'next')
+        expected = list(Product.objects.order_by('-updated_at', '-id').values_list('id', flat=True))
+
+        self.assertEqual([product_id for page in pages for product_id in page], expected)
+        self.assertEqual(len(pages), 12)
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        url = reverse('products-list') + '?page_size=100&fields=title'
+        forward = self.walk(url, 'next')
+        last_page = self.client.get(url)
+        for _ in range(len(forward) - 1):
+            last_page = self.client.get(last_page.json()['next'])
+        self.assertIsNone(last_page.json()['next'])
+
+        backward = self.walk(last_page.json()['previous'], 'previous')
+        self.assertEqual(list(reversed(backward)), forward[:-1])
+
+    def test_a_page_after_a_cursor_is_bounded_on_updated_at(self):
+        first_page = self.client.get(reverse('products-list') + '?page_size=100&fields=title')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first_page.json()['next'])
+        [page_query] = [query['sql'] for query in queries.captured_queries if 'FROM "core_product"' in query['sql']]
+        where = page_query.split(' WHERE ', 1)[1]
+
+        # The range bound is a conjunct of its own, next to the OR chain, so an index on
+        # (-updated_at, -id) is range-scanned from the position
+        self.assertRegex(where, r'^\("core_product"\."updated_at" <= .+? AND \(')
+        self.assertIn('"core_product"."updated_at" < ', where)
+
+    def test_rejects_a_cursor_without_the_full_position(self):
+        cursor = base64.b64encode(b'p=2026-01-01').decode('ascii')
+        response = self.client.get(reverse('products-list') + f'?cursor={cursor}')
+        self.assertEqual(response.status_code, 404)
+
+
+class LogsPaginationTests(TestCase):
+    def test_pages_through_more_tied_logs_than_the_offset_cutoff(self):
+        logged_at = timezone.now()
+        # Half of them are warnings, still more than the cutoff
+        tied_count = 2 * (LogsCursorPagination.offset_cutoff + 150)
+        Logs.objects.bulk_create(
+            Logs(level='WARNING' if position % 2 else 'INFO', message=f'message {position}',
+                 task_name='tied', created_at=logged_at)
+            for position in range(tied_count)
+        )
+
+        url = reverse('logs-list') + '?page_size=100&level=WARNING'
+        seen = []
+        while url:
+            self.assertLess(len(seen), tied_count)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(log['id'] for log in response.json()['results'])
+            url = response.json()['next']
+
+        expected = Logs.objects.filter(level='WARNING').order_by('-created_at', '-id')
+        self.assertEqual(seen, list(expected.values_list('id', flat=True)))
+
+    def test_a_filtered_page_after_a_cursor_is_bounded_on_created_at(self):
+        Logs.objects.bulk_create(
+            Logs(level='WARNING', message=f'message {position}', task_name='bounded') for position in range(15)
+        )
+        first_page = self.client.get(reverse('logs-list') + '?page_size=10&level=WARNING')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first_page.json()['next'])
+        [page_query] = [query['sql'] for query in queries.captured_queries if 'FROM "core_logs"' in query['sql']]
+        where = page_query.split(' WHERE ', 1)[1]
+
+        # Level equality and the created_at bound make a range of the (level, -created_at, -id) index
+        self.assertRegex(where, r'^\("core_logs"\."level" = \S+ AND "core_logs"\."created_at" <= .+? AND \(')
+
+
+class LogRetentionTests(TestCase):
+    now = datetime(2031, 3, 10, 12, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        super().setUp()
+        frozen_now = mock.patch('core.partitions.timezone.now', return_value=self.now)
+        frozen_now.start()
+        self.addCleanup(frozen_now.stop)
+
+    def log_at(self, created_at):
+        return Logs.objects.create(level='INFO', message=f'logged at {created_at}', task_name='retention',
+                                   created_at=created_at)
+
+    @skipIf(connection.vendor == 'postgresql', 'Logs are partitioned on PostgreSQL')
+    def test_expired_logs_are_deleted_without_partitions(self):
+        expired = self.log_at(self.now - timedelta(days=7, seconds=1))
+        at_cutoff = self.log_at(self.now - timedelta(days=7))
+        recent = self.log_at(self.now - timedelta(hours=1))
+
+        result = maintain_log_partitions(7, 2)
+
+        self.assertEqual(result, {'created': [], 'dropped': [], 'deleted': 1})
+        self.assertFalse(Logs.objects.filter(pk=expired.pk).exists())
+        self.assertEqual(set(Logs.objects.values_list('pk', flat=True)), {at_cutoff.pk, recent.pk})
+
+    @skipUnless(connection.vendor == 'postgresql', 'Logs are only partitioned on PostgreSQL')
+    def test_expired_partitions_are_dropped_and_upcoming_ones_created(self):
+        old_partitions = create_log_partitions(date(2031, 3, 1), 3)
+        self.log_at(datetime(2031, 3, 2, 8, tzinfo=dt_timezone.utc))
+        # Days without a partition land in the default partition
+        self.log_at(datetime(2031, 3, 5, 8, tzinfo=dt_timezone.utc))
+        kept_default = self.log_at(datetime(2031, 3, 8, 8, tzinfo=dt_timezone.utc))
+
+        result = maintain_log_partitions(3, 2)
+
+        self.assertEqual(result['created'], ['core_logs_p20310310', 'core_logs_p20310311', 'core_logs_p20310312'])
+        # Partitions created for the real dates by the migration are older still and dropped as well
+        self.assertEqual(result['dropped'][-3:], old_partitions)
+        self.assertEqual(result['deleted'], 1)
+        partitions = [name for name, _ in list_log_partitions()]
+        self.assertEqual(partitions, result['created'])
+        self.assertEqual(list(Logs.objects.values_list('pk', flat=True)), [kept_default.pk])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM "{DEFAULT_PARTITION}"')
+            self.assertEqual(cursor.fetchall(), [(kept_default.pk,)])
+
+        # A second run finds nothing to do
+        self.assertEqual(maintain_log_partitions(3, 2), {'created': [], 'dropped': [], 'deleted': 0})
+
+class ProductExportRoundTripTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [feed_row(position) for position in range(1, 6)]
+        rows[0].update({
+            'sale_price': '9.99 USD', 'additional_image_links': 'https://example.com/a.jpg, https://example.com/b.jpg',
+            'is_bundle': 'yes', 'max_handling_time': '3', 'product_length': '10 cm',
+            'lifestyle_image_link': 'https://example.com/lifestyle.jpg',
+        })
+        # Blank cells are stored as blank strings, an empty is_bundle keeps the default
+        rows[1].update({'color': '', 'size': '', 'gender': '', 'is_bundle': 'no', 'price': '5 usd'})
+        rows[2].update({'title': '=SUM(A1:A2)', 'description': 'Line one\nline "two", three'})
+        process_excel_data(self.write_csv(rows))
+
+        # Columns missing from a feed leave the nullable fields NULL
+        required_columns = FEED_HEADER[:10]
+        process_excel_data(self.write_csv(
+            [{column: value for column, value in feed_row(6).items() if column in required_columns}],
+            name='required_only.csv', header=required_columns,
+        ))
+        # An unknown availability is dropped on import, leaving a mandatory field blank
+        process_excel_data(self.write_csv([feed_row(7, availability='in stock')], name='salvaged.csv'))
+
+    def export(self, file_format, **params):
+        # Through the ASGI handler, which the export streams under
+        async def download():
+            response = await self.async_client.get(reverse('products-export'), {'file_format': file_format, **params})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            return b''.join([block async for block in response.streaming_content])
+
+        path = os.path.join(self.feed_dir, f'export.{file_format}')
+        with open(path, 'wb') as export_file:
+            export_file.write(async_to_sync(download)())
+        return path
+
+    def assert_round_trip(self, file_format):
+        stored = {product['product_id']: product for product in Product.objects.values()}
+        self.assertIsNone(stored['SKU-6']['color'])
+        self.assertEqual(stored['SKU-2']['color'], '')
+        self.assertEqual(stored['SKU-7']['availability'], '')
+
+        result = process_excel_data(self.export(file_format))
+
+        self.assertEqual(result['total_records'], 6)
+        self.assertEqual(result['failure_count'], 0)
+        self.assertEqual(result['unchanged_count'], 6)
+        self.assertEqual({product['product_id']: product for product in Product.objects.values()}, stored)
+
+    def test_csv_export_re_imports_unchanged(self):
+        self.assert_round_trip('csv')
+
+    def test_xlsx_export_re_imports_unchanged(self):
+        self.assert_round_trip('xlsx')
+
+    def test_incomplete_products_are_only_exported_on_request(self):
+        with open(self.export('csv')) as export_file:
+            self.assertNotIn('SKU-7', export_file.read())
+        with open(self.export('csv', include_incomplete='true')) as export_file:
+            self.assertIn('SKU-7', export_file.read())
+
+
+class ProductContentHashTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.feed_path = self.write_csv([feed_row(1), feed_row(2)])
+        process_excel_data(self.feed_path)
+
+    def test_saving_an_unchanged_product_keeps_it_unchanged_for_the_import(self):
+        product = Product.objects.get(product_id='SKU-1')
+        imported_hash = product.content_hash
+        product.save()
+
+        self.assertEqual(product.content_hash, imported_hash)
+        self.assertEqual(process_excel_data(self.feed_path)['unchanged_count'], 2)
+
+    def test_an_edited_product_is_rewritten_by_the_next_import(self):
+        product = Product.objects.get(product_id='SKU-1')
+        product.title = 'Edited by hand'
+        product.save(update_fields=['title'])
+
+        self.assertEqual(process_excel_data(self.feed_path)['unchanged_count'], 1)
+        self.assertEqual(Product.objects.get(product_id='SKU-1').title, 'Product 1')
+
+    def test_saving_bookkeeping_fields_leaves_the_hash_alone(self):
+        product = Product.objects.get(product_id='SKU-2')
+        imported_hash = product.content_hash
+        Product.objects.filter(pk=product.pk).update(content_hash='stale')
+        product.save(update_fields=['updated_at'])
+
+        self.assertEqual(Product.objects.get(pk=product.pk).content_hash, 'stale')
+        self.assertNotEqual(imported_hash, 'stale')
+
+    def test_products_created_outside_the_importer_get_a_hash(self):
+        product = Product.objects.create(product_id='SKU-9', title='Manual', price=3)
+        stored = Product.objects.values().get(pk=product.pk)
+        self.assertEqual(stored['content_hash'], Product.compute_content_hash(stored))
+
+
+class CopyProductWriterTests(TestCase):
+    def validated_records(self, rows):
+        frame = pd.DataFrame(rows, columns=FEED_HEADER, dtype=str)
+        return validate_chunk(frame, 0, settings.DEFAULT_CURRENCY, summarize_errors=True).valid_records
+
+    def write(self, rows):
+        with transaction.atomic():
+            return CopyProductWriter('copy-writer-test').write(self.validated_records(rows))
+
+    def test_the_copy_engine_falls_back_to_the_orm_off_postgresql(self):
+        writer = get_product_writer('copy', 'copy-writer-test')
+        expected = CopyProductWriter if connection.vendor == 'postgresql' else OrmProductWriter
+        self.assertIsInstance(writer, expected)
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+    def test_created_updated_and_unchanged_rows_are_counted(self):
+        self.assertEqual(self.write([feed_row(position) for position in (1, 2, 3)]), (3, 0, 0, 0))
+        updated_at = dict(Product.objects.values_list('product_id', 'updated_at'))
+
+        counts = self.write([
+            feed_row(1),
+            feed_row(2, title='Renamed product 2'),
+            feed_row(4),
+        ])
+
+        self.assertEqual(counts, (1, 1, 1, 0))
+        self.assertEqual(Product.objects.count(), 4)
+        self.assertEqual(Product.objects.get(product_id='SKU-2').title, 'Renamed product 2')
+        self.assertEqual(Product.objects.get(product_id='SKU-1').updated_at, updated_at['SKU-1'])
+        self.assertGreater(Product.objects.get(product_id='SKU-2').updated_at, updated_at['SKU-2'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+    def test_the_last_duplicate_in_a_chunk_wins(self):
+        self.write([feed_row(1)])
+
+        counts = self.write([
+            feed_row(2, title='First copy'),
+            feed_row(1, title='Changed once'),
+            feed_row(2, title='Second copy'),
+            feed_row(1, title='Changed twice'),
+        ])
+
+        # One insert and one update, each earlier duplicate counts as an update
+        self.assertEqual(counts, (1, 3, 0, 0))
+        self.assertEqual(Product.objects.get(product_id='SKU-1').title, 'Changed twice')
+        self.assertEqual(Product.objects.get(product_id='SKU-2').title, 'Second copy')
+        stored = Product.objects.get(product_id='SKU-2')
+        self.assertEqual(stored.content_hash, Product.compute_content_hash(
+            {field.name: getattr(stored, field.name) for field in Product.content_fields()}
+        ))
+
+class WorkerLost(BaseException):
+    """Stands in for the worker process dying, nothing in the import catches it"""
+
+
+@override_settings(CHUNKSIZE=4, IMPORT_ADAPTIVE_CHUNKS=False)
+class CheckpointResumeTests(FeedFileMixin, TestCase):
+    def test_an_interrupted_import_resumes_after_its_last_committed_chunk(self):
+        rows = [feed_row(position) for position in range(1, 11)]
+        rows[1]['price'] = 'free'
+        rows[2]['sale_price'] = 'cheap'
+        rows[6]['sale_price'] = 'cheap'
+        path = self.write_csv(rows)
+
+        # The worker dies as the second chunk starts, after the first one was committed
+        with mock.patch('core.processing.get_process_tree_rss', side_effect=[0, 0, 0, WorkerLost()]):
+            with self.assertRaises(WorkerLost):
+                process_excel_data(path, pipeline_workers=0)
+
+        import_analytics = ImportAnalytics.objects.get()
+        self.assertEqual(import_analytics.status, 'processing')
+        self.assertEqual((import_analytics.chunks_committed, import_analytics.rows_committed), (1, 4))
+        self.assertEqual(Product.objects.count(), 3)
+
+        result = process_excel_data(path, pipeline_workers=0, resume_import_id=import_analytics.id)
+
+        import_analytics.refresh_from_db()
+        self.assertEqual(import_analytics.status, 'completed')
+        self.assertEqual(Product.objects.count(), 9)
+        # Counted like an import that was never interrupted
+        uninterrupted = process_excel_data(path, pipeline_workers=0)
+        counters = ('total_records', 'success_count', 'warning_count', 'failure_count')
+        self.assertEqual([result[counter] for counter in counters], [uninterrupted[counter] for counter in counters])
+        self.assertEqual([getattr(import_analytics, counter) for counter in counters], [10, 9, 11, 1])
+        chunk_stats = ImportChunkStats.objects.filter(import_analytics=import_analytics).order_by('chunk_index')
+        self.assertEqual(list(chunk_stats.values_list('chunk_index', 'first_row', 'row_count')),
+                         [(0, 1, 4), (1, 5, 4), (2, 9, 2)])
+        issue_summaries = ImportIssueSummary.objects.filter(import_analytics=import_analytics, code='invalid_sale_price')
+        self.assertEqual(list(issue_summaries.order_by('chunk_index').values_list('rows', flat=True)), ['3', '7'])
+
+    def test_a_completed_import_is_not_resumed(self):
+        path = self.write_csv([feed_row(1)])
+        process_excel_data(path, pipeline_workers=0)
+        import_analytics = ImportAnalytics.objects.get()
+
+        result = process_excel_data(path, pipeline_workers=0, resume_import_id=import_analytics.id)
+
+        self.assertEqual(result['message'], 'Import already completed')
+        self.assertEqual(ImportChunkStats.objects.count(), 1)
+
+
+class ActiveImportPerFileTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = override_settings(MEDIA_ROOT=self.feed_dir)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.feed_bytes = b'id,title\nSKU-1,Product 1\n'
+        self.file_hash = hashlib.sha256(self.feed_bytes).hexdigest()
+        delay = mock.patch('core.views.process_excel_file_task.apply_async', side_effect=queued_task)
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+
+    def create_import(self, status='processing', **fields):
+        return ImportAnalytics.objects.create(
+            file_name='feed.csv', file_hash=self.file_hash, start_time=timezone.now(), status=status, **fields
+        )
+
+    def upload(self):
+        return self.client.post(reverse('upload-list'), {'file': SimpleUploadedFile('feed.csv', self.feed_bytes)})
+
+    def test_only_one_import_per_file_can_be_processing(self):
+        self.create_import()
+        self.create_import(status='completed')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_import()
+
+    def test_an_upload_racing_a_running_import_is_a_duplicate(self):
+        running_import = self.create_import(task_id='task-running')
+        # Both requests passed the duplicate check before either created its import
+        with mock.patch('core.views._find_duplicate_import', return_value=None):
+            response = self.upload()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'duplicate')
+        self.assertEqual(response.json()['analytics_id'], running_import.id)
+        self.delay.assert_not_called()
+
+    def test_a_completed_import_makes_the_same_file_a_duplicate(self):
+        completed_import = self.create_import(status='completed', task_id='task-done')
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'duplicate')
+        self.assertEqual(response.json()['analytics_id'], completed_import.id)
+        self.assertEqual(response.json()['task_id'], 'task-done')
+        self.assertEqual(os.listdir(os.path.join(self.feed_dir, 'excel_uploads')), [])
+        self.delay.assert_not_called()
+
+    def test_a_failed_import_does_not_block_the_file(self):
+        self.create_import(status='failed')
+        self.assertEqual(self.upload().status_code, 202)
+        self.delay.assert_called_once()
+
+    def test_a_recent_processing_import_blocks_the_file(self):
+        running_import = self.create_import()
+        response = self.upload()
+
+        self.assertEqual(response.json()['analytics_id'], running_import.id)
+        self.delay.assert_not_called()
+
+    def test_the_summary_counts_a_new_import_right_away(self):
+        cache.clear()
+        ImportAnalytics.objects.create(file_name='other.csv', start_time=timezone.now(), status='completed')
+        self.assertEqual(get_import_summary()['by_status']['processing'], 0)
+
+        self.assertEqual(self.upload().status_code, 202)
+
+        summary = get_import_summary()
+        self.assertEqual(summary['by_status']['processing'], 1)
+        self.assertEqual(summary['total_imports'], 2)
+
+    def test_a_stale_processing_import_is_failed_and_the_file_imported_again(self):
+        stale_import = self.create_import()
+        stale_at = timezone.now() - timedelta(seconds=settings.IMPORT_STALE_AFTER + 60)
+        ImportAnalytics.objects.filter(pk=stale_import.pk).update(updated_at=stale_at)
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.json()['analytics_id'], stale_import.id)
+        stale_import.refresh_from_db()
+        self.assertEqual(stale_import.status, 'failed')
+        self.assertIsNotNone(stale_import.end_time)
+        self.assertTrue(Logs.objects.filter(level='WARNING', message__contains='made no progress').exists())
+
+
+class ChunkedUploadTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = override_settings(MEDIA_ROOT=self.feed_dir)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        delay = mock.patch('core.views.process_excel_file_task.apply_async', side_effect=queued_task)
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+        self.content = b'id,title,price\n' + b''.join(f'SKU-{n},Product {n},{n}.50 EUR\n'.encode() for n in range(200))
+
+    def initiate(self, **data):
+        response = self.client.post(
+            reverse('upload-chunked-initiate'),
+            {'file_name': 'feed.csv', 'total_size': len(self.content), **data}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['upload_id']
+
+    def part_url(self, upload_id):
+        return reverse('upload-chunked-part', kwargs={'upload_id': upload_id})
+
+    def send_part(self, upload_id, start, end, **headers):
+        return self.client.put(
+            self.part_url(upload_id), self.content[start:end + 1], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}', **headers
+        )
+
+    def send_all(self, upload_id, part_size=1000):
+        for start in range(0, len(self.content), part_size):
+            end = min(start + part_size, len(self.content)) - 1
+            self.assertEqual(self.send_part(upload_id, start, end).status_code, 200)
+
+    def complete(self, upload_id):
+        return self.client.post(reverse('upload-chunked-complete', kwargs={'upload_id': upload_id}))
+
+    def test_parts_are_assembled_and_the_import_queued(self):
+        upload_id = self.initiate(sha256=hashlib.sha256(self.content).hexdigest())
+        self.send_all(upload_id)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 202)
+        import_analytics = ImportAnalytics.objects.get(pk=response.json()['analytics_id'])
+        with open(import_analytics.file_path, 'rb') as imported_file:
+            self.assertEqual(imported_file.read(), self.content)
+        self.assertEqual(import_analytics.file_hash, hashlib.sha256(self.content).hexdigest())
+        self.delay.assert_called_once()
+        self.assertEqual(os.listdir(os.path.join(self.feed_dir, 'excel_uploads', 'partial')), [])
+
+    def test_a_file_not_matching_the_declared_sha256_is_rejected(self):
+        upload_id = self.initiate(sha256=hashlib.sha256(b'another file').hexdigest())
+        self.send_all(upload_id)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['sha256'], hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(ChunkedUpload.objects.get(upload_id=upload_id).status, 'failed')
+        self.assertFalse(ImportAnalytics.objects.exists())
+        self.delay.assert_not_called()
+        self.assertEqual(self.complete(upload_id).status_code, 400)
+
+    def test_the_hash_of_an_undeclared_file_is_recorded_for_deduplication(self):
+        upload_id = self.initiate()
+        self.send_all(upload_id)
+        self.assertEqual(self.complete(upload_id).status_code, 202)
+
+        self.assertEqual(ChunkedUpload.objects.get(upload_id=upload_id).file_hash,
+                         hashlib.sha256(self.content).hexdigest())
+        second_upload_id = self.initiate()
+        self.send_all(second_upload_id)
+        response = self.complete(second_upload_id)
+        self.assertEqual(response.json()['status'], 'duplicate')
+        self.delay.assert_called_once()
+
+    def test_a_part_out_of_order_or_with_a_bad_checksum_is_not_stored(self):
+        upload_id = self.initiate()
+        self.assertEqual(self.send_part(upload_id, 1000, 1999).status_code, 409)
+        response = self.send_part(upload_id, 0, 999, HTTP_X_CHUNK_SHA256='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        # Parts are written into the partial file itself, the rejected one is cut off again
+        [partial_name] = os.listdir(os.path.join(self.feed_dir, 'excel_uploads', 'partial'))
+        partial_path = os.path.join(self.feed_dir, 'excel_uploads', 'partial', partial_name)
+        self.assertEqual(os.path.getsize(partial_path), 0)
+
+        self.assertEqual(self.send_part(upload_id, 0, 999).status_code, 200)
+        response = self.client.get(self.part_url(upload_id))
+        self.assertEqual(response.json()['offset'], 1000)
+        self.assertEqual(len(response.json()['parts']), 1)
+        with open(partial_path, 'rb') as partial_file:
+            self.assertEqual(partial_file.read(), self.content[:1000])
+
+
+class ImportTaskProgressTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = override_settings(MEDIA_ROOT=self.feed_dir)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def test_the_queued_snapshot_is_cached_before_the_task_is_sent(self):
+        sent = {}
+
+        def apply_async(args, kwargs, task_id):
+            # What a worker picking the task up right away would find
+            sent['progress'] = get_task_progress(task_id)
+            sent['import_task_id'] = ImportAnalytics.objects.get(pk=kwargs['import_analytics_id']).task_id
+            return queued_task(args, kwargs, task_id)
+
+        with mock.patch('core.views.process_excel_file_task.apply_async', side_effect=apply_async):
+            response = self.client.post(
+                reverse('upload-list'), {'file': SimpleUploadedFile('feed.csv', b'id,title\nSKU-1,Product 1\n')}
+            )
+
+        task_id = response.json()['task_id']
+        self.assertEqual(sent['progress']['state'], 'queued')
+        self.assertEqual(sent['progress']['task_id'], task_id)
+        self.assertEqual(sent['import_task_id'], task_id)
+
+    def test_shards_and_the_chord_callback_publish_the_whole_import(self):
+        path = self.write_csv([feed_row(position) for position in range(1, 11)])
+        shards = plan_csv_shards(path, 5)
+        self.assertEqual(len(shards), 2)
+        import_analytics = ImportAnalytics.objects.create(
+            file_name='feed.csv', file_path=path, task_id='task-sharded', start_time=timezone.now(),
+            status='processing', read_time=0,
+        )
+
+        shard_results = []
+        for byte_offset, row_start, row_count in shards:
+            shard_results.append(process_excel_data(
+                path, import_analytics_id=import_analytics.id, byte_offset=byte_offset,
+                row_start=row_start, row_count=row_count, pipeline_workers=0,
+            ))
+            progress = get_task_progress('task-sharded')
+            self.assertEqual(progress['state'], 'processing')
+            self.assertEqual(progress['rows_done'], row_start + row_count)
+            self.assertEqual(progress['success_count'], row_start + row_count)
+
+        finalize_sharded_import(import_analytics.id, shard_results, 10)
+
+        progress = get_task_progress('task-sharded')
+        self.assertEqual(progress['state'], 'completed')
+        self.assertEqual(progress['rows_done'], 10)
+        self.assertEqual(progress['total_rows'], 10)
+        self.assertEqual(progress['eta_seconds'], 0.0)
+
+
+class DryRunTests(FeedFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = override_settings(MEDIA_ROOT=self.feed_dir)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def write_feed(self, count, invalid=(), name='feed.csv', **values):
+        rows = [feed_row(position, **values) for position in range(1, count + 1)]
+        for position in invalid:
+            rows[position - 1]['price'] = 'free'
+        return self.write_csv(rows, name)
+
+    def test_an_upload_is_validated_without_writing_products_or_an_import_and_deleted(self):
+        path = self.write_feed(10, invalid=(3, 7))
+        with open(path, 'rb') as feed_file:
+            content = feed_file.read()
+
+        def delay(*args, **kwargs):
+            return dry_run_import_task.apply(args, kwargs)
+
+        with mock.patch('core.views.dry_run_import_task.delay', side_effect=delay) as sent:
+            response = self.client.post(
+                reverse('upload-list'), {'file': SimpleUploadedFile('feed.csv', content), 'dry_run': 'true'}
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['dry_run'])
+        uploaded_path = sent.call_args.args[0]
+        self.assertFalse(os.path.exists(uploaded_path))
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(ImportAnalytics.objects.exists())
+
+    def test_a_full_run_counts_every_row(self):
+        report = dry_run_import(self.write_feed(10, invalid=(3, 7)), pipeline_workers=0)
+
+        self.assertEqual(report['mode'], 'full')
+        self.assertEqual(report['rows_read'], 10)
+        self.assertFalse(report['rows_estimated'])
+        self.assertEqual(report['rows_validated'], 10)
+        self.assertEqual(report['failed_rows'], 2)
+        self.assertEqual(report['valid_rows'], 8)
+        self.assertEqual(report['error_rate'], 0.2)
+        self.assertEqual(report['issues'][0]['level'], 'ERROR')
+        self.assertEqual(report['issues'][0]['example_rows'], [3, 7])
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(ImportAnalytics.objects.exists())
+
+    def test_a_large_csv_is_sampled_by_seeking_instead_of_reading_it(self):
+        valid_path = self.write_feed(400, name='valid.csv')
+        invalid_path = self.write_feed(400, invalid=range(1, 401), name='invalid.csv')
+
+        with mock.patch('core.dry_run.open_chunk_reader') as open_reader:
+            valid = dry_run_import(valid_path, sample_size=20, seed=1)
+            invalid = dry_run_import(invalid_path, sample_size=20, seed=1)
+        open_reader.assert_not_called()
+
+        for report in (valid, invalid):
+            self.assertEqual(report['mode'], 'random')
+            self.assertTrue(report['rows_estimated'])
+            self.assertEqual(report['rows_validated'], 20)
+            self.assertAlmostEqual(report['rows_read'], 400, delta=40)
+        self.assertEqual(valid['failed_rows'], 0)
+        self.assertEqual(invalid['failed_rows'], 20)
+        self.assertEqual(invalid['error_rate'], 1.0)
+        self.assertEqual(invalid['estimated_failed_rows'], invalid['rows_read'])
+        example_rows = invalid['issues'][0]['example_rows']
+        self.assertEqual(example_rows, sorted(example_rows))
+        self.assertTrue(all(1 <= row <= invalid['rows_read'] for row in example_rows))
+
+    def test_every_kth_csv_row_is_sampled_by_seeking(self):
+        with mock.patch('core.dry_run.open_chunk_reader') as open_reader:
+            report = dry_run_import(self.write_feed(400), sample_every=50)
+        open_reader.assert_not_called()
+
+        self.assertEqual(report['mode'], 'every')
+        self.assertTrue(report['rows_estimated'])
+        self.assertAlmostEqual(report['rows_validated'], 8, delta=1)
+        self.assertEqual(report['failed_rows'], 0)
+
+    def test_seeking_into_quoted_multiline_values_samples_whole_records(self):
+        path = self.write_feed(400, description='First line, "quoted"\nsecond line\nthird line')
+
+        report = dry_run_import(path, sample_size=30, seed=7)
+
+        self.assertTrue(report['rows_estimated'])
+        self.assertAlmostEqual(report['rows_read'], 400, delta=40)
+        self.assertEqual(report['rows_validated'], 30)
+        self.assertEqual(report['failed_rows'], 0)
+        descriptions = {issue['field'] for issue in report['issues']}
+        self.assertNotIn('description', descriptions)
+
+    def test_a_small_csv_is_sampled_exactly(self):
+        report = dry_run_import(self.write_feed(40, invalid=(5,)), sample_size=20, seed=3)
+
+        self.assertFalse(report['rows_estimated'])
+        self.assertEqual(report['rows_read'], 40)
+        self.assertEqual(report['rows_validated'], 20)
+
+    def test_parquet_samples_only_read_the_row_groups_they_need(self):
+        rows = [feed_row(position) for position in range(1, 101)]
+        rows[10]['price'] = 'free'
+        path = os.path.join(self.feed_dir, 'feed.parquet')
+        pd.DataFrame(rows, columns=FEED_HEADER).to_parquet(path, row_group_size=10)
+
+        with mock.patch('pyarrow.parquet.ParquetFile.read_row_group', autospec=True,
+                        side_effect=pq.ParquetFile.read_row_group) as read:
+            report = dry_run_import(path, sample_every=30)
+
+        self.assertEqual(sorted(call.args[1] for call in read.call_args_list), [0, 3, 6, 9])
+        self.assertFalse(report['rows_estimated'])
+        self.assertEqual(report['rows_read'], 100)
+        self.assertEqual(report['rows_validated'], 4)
+        self.assertEqual(report['failed_rows'], 0)
+
+        report = dry_run_import(path, sample_size=100, seed=2)
+        self.assertEqual(report['rows_validated'], 100)
+        self.assertEqual(report['failed_rows'], 1)
+        self.assertEqual(report['issues'][0]['example_rows'], [11])
+
+    def test_the_task_deletes_the_file_even_when_the_run_fails(self):
+        path = self.write_feed(5)
+        result = dry_run_import_task.apply(args=(path,))
+        self.assertEqual(result.result['rows_validated'], 5)
+        self.assertFalse(os.path.exists(path))
+
+        broken_path = os.path.join(self.feed_dir, 'broken.parquet')
+        with open(broken_path, 'wb') as broken_file:
+            broken_file.write(b'not parquet')
+        result = dry_run_import_task.apply(args=(broken_path,))
+        self.assertTrue(result.failed())
+        self.assertFalse(os.path.exists(broken_path))
+
+
+class FakePubSub:
+    """Redis pub/sub stand-in handing out the queued messages, then nothing"""
+
+    def __init__(self, messages):
+        self.messages = [{'type': 'message', 'data': json.dumps(message)} for message in messages]
+        self.channels = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+    async def aclose(self):
+        self.closed = True
+
+
+class ImportProgressStreamTests(TestCase):
+    def fake_redis(self, messages=()):
+        pubsub = FakePubSub(messages)
+        client = mock.Mock(pubsub=mock.Mock(return_value=pubsub), aclose=mock.AsyncMock())
+        from_url = mock.patch('core.progress.redis.asyncio.Redis.from_url', return_value=client)
+        from_url.start()
+        self.addCleanup(from_url.stop)
+        return pubsub, client
+
+    def parse_events(self, parts):
+        return [json.loads(part.split('data: ', 1)[1]) if 'data: ' in part else part for part in parts]
+
+    async def test_the_stored_snapshot_is_followed_by_the_published_ones(self):
+        import_analytics = await ImportAnalytics.objects.acreate(
+            file_name='feed.csv', file_path='feed.csv', task_id='task-stream', start_time=timezone.now(),
+            status='processing', read_time=0, total_records=2,
+        )
+        pubsub, client = self.fake_redis([
+            {'state': 'processing', 'rows_done': 5},
+            {'state': 'completed', 'rows_done': 10},
+        ])
+
+        response = await self.async_client.get(reverse('import-progress', args=[import_analytics.id]))
+        parts = [part.decode() async for part in response.streaming_content]
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(all(part.startswith('event: progress\n') for part in parts))
+        events = self.parse_events(parts)
+        self.assertEqual([(event['state'], event['rows_done']) for event in events],
+                         [('processing', 2), ('processing', 5), ('completed', 10)])
+        self.assertEqual(pubsub.channels, [progress_channel(import_analytics.id)])
+        self.assertTrue(pubsub.closed)
+        client.aclose.assert_awaited_once()
+
+    async def test_an_idle_stream_ends_on_a_final_stored_state(self):
+        pubsub, _ = self.fake_redis()
+        snapshots = iter([{'state': 'processing'}, {'state': 'processing'}, {'state': 'failed'}])
+
+        async def load_snapshot():
+            return next(snapshots)
+
+        parts = [part async for part in stream_import_progress(1, load_snapshot)]
+
+        self.assertEqual(self.parse_events(parts), [
+            {'state': 'processing'}, ': keep-alive\n\n', ': keep-alive\n\n', {'state': 'failed'},
+        ])
+        self.assertTrue(pubsub.closed)
+
+    async def test_an_unknown_import_is_not_found(self):
+        self.fake_redis()
+        response = await self.async_client.get(reverse('import-progress', args=[404]))
+        self.assertEqual(response.status_code, 404)
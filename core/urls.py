@@ -1,13 +1,15 @@
 from rest_framework.routers import DefaultRouter
-from .views import index, FileUploadViewSet, LogsViewSet, AnalyticsViewSet
+from .views import index, import_progress_stream, FileUploadViewSet, LogsViewSet, AnalyticsViewSet, ProductViewSet
 from django.urls import path, include
 router = DefaultRouter()
 
 router.register(r'upload', FileUploadViewSet, basename='upload')
 router.register(r'logs', LogsViewSet, basename='logs')
 router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'products', ProductViewSet, basename='products')
 
 urlpatterns = [
+    path('api/analytics/<int:pk>/progress/', import_progress_stream, name='import-progress'),
     path('api/', include(router.urls)),
     path('', index, name='index')
 
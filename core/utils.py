@@ -1,6 +1,14 @@
+import threading
+import time
 import traceback
+from contextlib import contextmanager
+from django.conf import settings
 from core.models import Logs
 
+# Per-thread buffer used while DatabaseLogger is in buffered mode
+_buffer_state = threading.local()
+
+
 class DatabaseLogger:
     @staticmethod
     def log(level, message, task_name, error=None):
@@ -8,12 +16,73 @@ class DatabaseLogger:
         if error:
             traceback_text = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
 
-        Logs.objects.create(
+        buffer = getattr(_buffer_state, 'buffer', None)
+        if buffer is None:
+            Logs.objects.create(
+                level=level,
+                message=message,
+                task_name=task_name,
+                traceback=traceback_text
+            )
+            return
+
+        # created_at defaults to the time of this call, not of the later flush
+        buffer.append(Logs(
             level=level,
             message=message,
             task_name=task_name,
             traceback=traceback_text
-        )
+        ))
+        if len(buffer) >= settings.LOG_BUFFER_SIZE or \
+           time.monotonic() - _buffer_state.last_flush >= settings.LOG_FLUSH_INTERVAL:
+            DatabaseLogger.flush()
+
+    @staticmethod
+    def start_buffering():
+        """
+        Collect log records of the current thread in memory instead of inserting them one by one.
+        They are written with bulk_create once LOG_BUFFER_SIZE records are pending or
+        LOG_FLUSH_INTERVAL seconds have passed, on flush(), and on stop_buffering().
+        Calls can be nested, buffering ends with the outermost stop_buffering().
+        """
+        depth = getattr(_buffer_state, 'depth', 0)
+        if depth == 0:
+            _buffer_state.buffer = []
+            _buffer_state.last_flush = time.monotonic()
+        _buffer_state.depth = depth + 1
+
+    @staticmethod
+    def stop_buffering():
+        """Flush pending records and leave buffered mode once every caller has stopped"""
+        try:
+            DatabaseLogger.flush()
+        finally:
+            _buffer_state.depth = max(getattr(_buffer_state, 'depth', 1) - 1, 0)
+            if _buffer_state.depth == 0:
+                _buffer_state.buffer = None
+
+    @staticmethod
+    def flush():
+        """Write all pending buffered records in a single bulk insert"""
+        buffer = getattr(_buffer_state, 'buffer', None)
+        if not buffer:
+            return
+
+        # Detach the records first so a failing insert doesn't keep them growing forever
+        records = list(buffer)
+        buffer.clear()
+        _buffer_state.last_flush = time.monotonic()
+        Logs.objects.bulk_create(records, batch_size=settings.LOG_BUFFER_SIZE)
+
+    @staticmethod
+    @contextmanager
+    def buffered():
+        """Context manager for start_buffering()/stop_buffering(), flushes even if the block raises"""
+        DatabaseLogger.start_buffering()
+        try:
+            yield
+        finally:
+            DatabaseLogger.stop_buffering()
 
     @staticmethod
     def get_logs():
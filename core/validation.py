@@ -0,0 +1,222 @@
+import time
+import numpy as np
+from core.cleaning import ChunkIssue, clean_chunk
+from core.issues import summarize_issue
+from core.serializers import ProductSerializer
+
+
+class ProductRecord:
+    """
+    A validated row on its way to the product writer: the serializer's validated
+    values and the row number used in log messages. Slots keep the per-row
+    overhead to the two references.
+
+    Rows are only held as column arrays up to cleaning. ProductSerializer validates
+    one dict at a time, so each row still costs the dict CleanedChunk.records()
+    yields and the serializer's validated_data, which this record keeps.
+    """
+    __slots__ = ('row', 'data')
+
+    def __init__(self, row, data):
+        self.row = row
+        self.data = data
+
+    @property
+    def id(self):
+        return self.data.get('product_id')
+
+
+class ValidatedChunk:
+    """
+    Output of validate_chunk.
+
+    Attributes:
+        row_count (int): Number of rows read for the chunk
+        valid_records (list): ProductRecord objects ready for the product writer
+        failure_count (int): Rows rejected during cleaning or validation
+        warning_count (int): Warnings raised during cleaning or validation
+        log_entries (list): (level, message) pairs of the row errors, in the order they should be logged
+        issue_summaries (list): IssueSummary objects for the warnings and notices of the chunk, and
+            for the errors when they are summarized
+        validate_time (float): Seconds spent validating the rows with the serializer
+        clean_time (float): Seconds spent cleaning the chunk
+        read_time (float): Seconds spent reading the chunk from the file, set by the chunk validators
+    """
+
+    def __init__(self, row_count, valid_records, failure_count, warning_count, log_entries, validate_time,
+                 clean_time=0.0, read_time=0.0, issue_summaries=None):
+        self.row_count = row_count
+        self.valid_records = valid_records
+        self.failure_count = failure_count
+        self.warning_count = warning_count
+        self.log_entries = log_entries
+        self.validate_time = validate_time
+        self.clean_time = clean_time
+        self.read_time = read_time
+        self.issue_summaries = issue_summaries or []
+
+
+def validate_chunk(chunk, row_offset, default_currency, summarize_errors=False):
+    """
+    Clean a chunk and validate its rows with the ProductSerializer.
+
+    Doesn't touch the database, log messages are returned instead of written so the
+    function can run in a worker process of the import pipeline.
+
+    Params:
+        chunk (DataFrame): Raw chunk as produced by the readers
+        row_offset (int): Number of data rows before the chunk, used for row numbers
+        default_currency (str): Currency used when a price has no currency code
+        summarize_errors (bool): Summarize the row errors like the warnings instead of
+            returning a log message per row (used by dry runs)
+    Returns:
+        ValidatedChunk
+    """
+    start_time = time.time()
+    # Clean the whole chunk column by column, rows failing the critical checks are flagged
+    cleaned_chunk = clean_chunk(chunk, default_currency)
+    clean_time = time.time() - start_time
+    validated_chunk = validate_cleaned_chunk(cleaned_chunk, row_offset, summarize_errors)
+    validated_chunk.clean_time = clean_time
+    return validated_chunk
+
+
+def validate_cleaned_chunk(cleaned_chunk, row_offset, summarize_errors=False):
+    """
+    Validate the rows that passed cleaning with the ProductSerializer.
+
+    Params:
+        cleaned_chunk (CleanedChunk): Output of clean_chunk
+        row_offset (int): Number of data rows before the chunk, used for row numbers
+        summarize_errors (bool): Put the row errors into issue_summaries as well, per
+            field where the error names one, instead of into log_entries
+    Returns:
+        ValidatedChunk
+    """
+    start_time = time.time()
+    valid_records = []
+    log_entries = []
+    issue_summaries = []
+    # Chunk positions and details of the row warnings raised below, summarized after the loop
+    missing_recommended_positions = []
+    missing_recommended_details_list = []
+    omitted_fields = {}
+    critical_fields = {}
+    unsalvageable_positions = []
+    unsalvageable_fields = []
+
+    failure_count = cleaned_chunk.failure_count
+    warning_count = cleaned_chunk.warning_count
+
+    # Errors are logged row by row, everything else is summarized per field
+    for issue in cleaned_chunk.issues:
+        if issue.level == "ERROR" and not summarize_errors:
+            for message in issue.messages(row_offset):
+                log_entries.append((issue.level, message))
+        else:
+            issue_summaries.extend(summarize_issue(issue, row_offset))
+
+    # Validate the remaining rows, row_index is the position in the chunk and cleaned_data the row dictionary
+    for row_index, cleaned_data in cleaned_chunk.records():
+        absolute_row = row_offset + row_index + 1
+        missing_recommended_details = cleaned_chunk.missing_recommended.iat[row_index]
+
+        # Create serializer context with currencies if present
+        serializer_context = {}
+        if 'currency' in cleaned_data:
+            serializer_context['currency'] = cleaned_data['currency']
+        if 'sale_price_currency' in cleaned_data:
+            serializer_context['sale_price_currency'] = cleaned_data['sale_price_currency']
+
+        # Validate with serializer
+        serializer = ProductSerializer(data=cleaned_data, context=serializer_context)
+
+        if serializer.is_valid():
+            valid_records.append(ProductRecord(absolute_row, serializer.validated_data))
+
+            if missing_recommended_details:
+                warning_count += 1
+                missing_recommended_positions.append(row_index)
+                missing_recommended_details_list.append(missing_recommended_details)
+        else:
+            # Handle validation errors
+            is_row_salvageable = True
+            problematic_fields_log_entries = []
+            core_failure_fields_on_format_error = ['product_id', 'title', 'price']
+
+            serializer_errors = serializer.errors
+            for field, messages in serializer_errors.items():
+                problematic_fields_log_entries.append(f"{field}: {', '.join(messages)}")
+                if field in core_failure_fields_on_format_error:
+                    is_row_salvageable = False
+
+            if is_row_salvageable:
+                # Try partial save with problematic fields removed
+                data_for_partial_save = cleaned_data.copy()
+                for field_with_error in serializer_errors.keys():
+                    data_for_partial_save.pop(field_with_error, None)
+
+                serializer = ProductSerializer(data=data_for_partial_save, context=serializer_context)
+                if serializer.is_valid():  # Revalidate after removing problematic fields
+                    valid_records.append(ProductRecord(absolute_row, serializer.validated_data))
+
+                    # Saved with the problematic fields omitted
+                    for field, messages in serializer_errors.items():
+                        positions, details = omitted_fields.setdefault(field, ([], []))
+                        positions.append(row_index)
+                        details.append(', '.join(messages))
+                    warning_count += 1
+                else:
+                    # Even after removing problematic fields, it's still not valid
+                    failure_count += 1
+                    if summarize_errors:
+                        unsalvageable_positions.append(row_index)
+                        unsalvageable_fields.append(', '.join(serializer.errors))
+                    else:
+                        log_entries.append((
+                            "ERROR", f"Row {absolute_row}: Could not salvage row even after removing problematic fields"
+                        ))
+            else:
+                # Not salvageable due to critical field format error
+                failure_count += 1
+                if summarize_errors:
+                    for field, messages in serializer_errors.items():
+                        positions, details = critical_fields.setdefault(field, ([], []))
+                        positions.append(row_index)
+                        details.append(', '.join(messages))
+                else:
+                    log_entries.append((
+                        "ERROR", f"Row {absolute_row}: Critical validation failed - {'; '.join(problematic_fields_log_entries)}"
+                    ))
+
+    if missing_recommended_positions:
+        issue_summaries.extend(summarize_issue(ChunkIssue(
+            "WARNING", 'missing_recommended_fields', None, np.asarray(missing_recommended_positions),
+            missing_recommended_details_list, "Missing recommended fields: {detail}"
+        ), row_offset))
+    for field, (positions, details) in omitted_fields.items():
+        issue_summaries.extend(summarize_issue(ChunkIssue(
+            "WARNING", 'invalid_field_omitted', field, np.asarray(positions),
+            details, "Data quality issue, field omitted: {detail}"
+        ), row_offset))
+
+    for field, (positions, details) in critical_fields.items():
+        issue_summaries.extend(summarize_issue(ChunkIssue(
+            "ERROR", 'critical_validation_failed', field, np.asarray(positions),
+            details, "Critical validation failed: {detail}"
+        ), row_offset))
+    if unsalvageable_positions:
+        issue_summaries.extend(summarize_issue(ChunkIssue(
+            "ERROR", 'unsalvageable_row', None, np.asarray(unsalvageable_positions),
+            unsalvageable_fields, "Could not salvage row: {detail}"
+        ), row_offset))
+
+    return ValidatedChunk(
+        row_count=len(cleaned_chunk.failed),
+        valid_records=valid_records,
+        failure_count=failure_count,
+        warning_count=warning_count,
+        log_entries=log_entries,
+        validate_time=time.time() - start_time,
+        issue_summaries=issue_summaries,
+    )
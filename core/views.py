@@ -1,20 +1,35 @@
 from django.shortcuts import render
+from django.http import JsonResponse, StreamingHttpResponse
 import os
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from core.utils import DatabaseLogger
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
 import uuid
-from core.processing import process_excel_data
-import pandas as pd
-import time
-from rest_framework.pagination import PageNumberPagination
-from core.models import ImportAnalytics, Logs
-from core.serializers import ImportAnalyticsSerializer, LogsSerializer
+import hashlib
+import json
+from core.analytics import get_import_summary, refresh_import_summary
+from core.exports import astream_csv, astream_xlsx, exclude_incomplete
+from core.progress import FINAL_STATES, cache_task_progress, get_task_progress, record_snapshot, stream_import_progress
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from core.models import ChunkedUpload, ImportAnalytics, ImportChunkStats, ImportIssueSummary, Logs, Product
+from core.serializers import (
+    ImportAnalyticsSerializer, ImportChunkStatsSerializer, ImportIssueSummarySerializer, LogsSerializer,
+    ProductReadSerializer
+)
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from core.tasks import process_excel_file_task
+from core.tasks import dry_run_import_task, process_excel_file_task, process_sharded_import_task, resume_import_task
+from core.writers import WRITE_ENGINES
 from django_celery_results.models import TaskResult
 from rest_framework.decorators import action
 
@@ -27,6 +42,117 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100  
 
 
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination on a unique tuple of ordering fields, e.g. (updated_at, id).
+
+    DRF's CursorPagination only puts the first ordering field in the cursor and skips
+    rows sharing that value with an OFFSET, which is capped at offset_cutoff: a run of
+    more tied rows than that (one bulk import stamps thousands of rows with the same
+    time) can't be paged through. Here the cursor holds the values of every ordering
+    field of the last row and the next page is read with
+    WHERE a <= x AND ((a < x) OR (a = x AND b < y)), so ties cost nothing and no OFFSET
+    is used. The ordering fields must share one direction and the last one must be unique.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _position_filter(self, values, reverse):
+        """Rows strictly after the position, in the ordering or (reverse) against it"""
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending != reverse else 'gt'
+        fields = [order.lstrip('-') for order in self.ordering]
+        condition = Q()
+        # (a, b, c) after (x, y, z): a > x, or a = x and b > y, or a = x and b = y and c > z
+        for depth, field in enumerate(fields):
+            equal = {fields[position]: values[position] for position in range(depth)}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[depth]})
+        # Redundant for the result, but the planner can't range-scan an index on an OR
+        # chain: the bound on the first field starts the scan at the position
+        return Q(**{f'{fields[0]}__{lookup}e': values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                order[1:] if order.startswith('-') else f'-{order}' for order in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self._position_filter(self._decode_position(position), reverse))
+
+        # One extra row tells whether another page follows in the direction read
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class LogsCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination for the Logs table: pages are fetched with WHERE on (created_at, id)
+    instead of OFFSET and without a COUNT(*), so deep pages cost the same as the first
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class ProductCursorPagination(KeysetCursorPagination):
+    """Keyset pagination of the product API on (updated_at, id), newest changes first"""
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = ('-updated_at', '-id')
+
+
 """
 Django view for Handling Homepage
 
@@ -34,6 +160,169 @@ Django view for Handling Homepage
 def index(request):
     return render(request, 'home/index.html')
 
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.parquet', '.feather')
+
+# Bytes read from the request at a time while storing a chunked upload part
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+def _parse_import_options(data):
+    """Read write_engine and sharded from request data, returns (write_engine, sharded, error_response)"""
+    # Optional write engine for this import, defaults to settings.IMPORT_WRITE_ENGINE
+    write_engine = data.get('write_engine') or None
+    if write_engine and write_engine not in WRITE_ENGINES:
+        return None, False, Response({'error': f"write_engine must be one of: {', '.join(WRITE_ENGINES)}"},
+                                     status=status.HTTP_400_BAD_REQUEST)
+
+    # Sharded mode splits a CSV into row ranges processed by several workers
+    sharded = str(data.get('sharded', '')).lower() in ('true', '1', 'yes')
+    return write_engine, sharded, None
+
+
+def _parse_dry_run_options(data):
+    """
+    Read dry_run, sample_size and sample_every from request data,
+    returns (dry_run, sample_size, sample_every, error_response)
+    """
+    dry_run = str(data.get('dry_run', '')).lower() in ('true', '1', 'yes')
+    sampling = {}
+    for option in ('sample_size', 'sample_every'):
+        value = str(data.get(option, '') or '')
+        if value and (not value.isdigit() or int(value) < 1):
+            return False, None, None, Response({'error': f"{option} must be a positive integer"},
+                                               status=status.HTTP_400_BAD_REQUEST)
+        sampling[option] = int(value) if value else None
+
+    if sampling['sample_size'] and sampling['sample_every']:
+        return False, None, None, Response({'error': 'sample_size and sample_every are exclusive'},
+                                           status=status.HTTP_400_BAD_REQUEST)
+    if not dry_run and (sampling['sample_size'] or sampling['sample_every']):
+        return False, None, None, Response({'error': 'Sampling is only available for dry runs'},
+                                           status=status.HTTP_400_BAD_REQUEST)
+    return dry_run, sampling['sample_size'], sampling['sample_every'], None
+
+
+def _fail_stale_imports(file_hash):
+    """
+    Mark imports of the file that are processing but haven't committed a chunk for
+    IMPORT_STALE_AFTER seconds as failed, their worker is gone and they must not keep
+    the file from being imported. They can still be resumed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMPORT_STALE_AFTER)
+    stale_imports = ImportAnalytics.objects.filter(file_hash=file_hash, status='processing', updated_at__lt=cutoff)
+    failed_count = 0
+    for stale_import in stale_imports:
+        if ImportAnalytics.objects.filter(pk=stale_import.pk, status='processing').update(
+            status='failed', end_time=timezone.now()
+        ):
+            failed_count += 1
+            DatabaseLogger.log(
+                level="WARNING",
+                message=(f"Import {stale_import.id} of {stale_import.file_name} made no progress since "
+                         f"{stale_import.updated_at:%Y-%m-%d %H:%M:%S}, marked as failed"),
+                task_name=f"data_import_{stale_import.file_name}"
+            )
+    if failed_count:
+        refresh_import_summary()
+
+
+def _find_duplicate_import(file_hash):
+    """The latest import of an identical file that completed or is still running (and not stale)"""
+    _fail_stale_imports(file_hash)
+    return ImportAnalytics.objects.filter(
+        file_hash=file_hash, status__in=['processing', 'completed']
+    ).order_by('-created_at').first()
+
+
+def _duplicate_response(existing_import, file_name, task_name):
+    DatabaseLogger.log(
+        level="INFO",
+        message=(f"Excel file {file_name} is identical to import {existing_import.id} "
+                 f"({existing_import.status}), not importing it again"),
+        task_name=task_name
+    )
+    return Response({
+        'status': 'duplicate',
+        'message': f"Identical file already {'imported' if existing_import.status == 'completed' else 'being imported'}",
+        'filename': file_name,
+        'task_id': existing_import.task_id,
+        'analytics_id': existing_import.id,
+        'import_status': existing_import.status,
+    }, status=status.HTTP_200_OK)
+
+
+def _queue_import(excel_path, file_hash, write_engine, sharded):
+    """
+    Create the ImportAnalytics record of an uploaded file and queue its Celery task.
+    The record exists before the task runs, so later uploads of the same file find it
+    right away. Returns (import_analytics, task), or (running import, None) when a
+    concurrent upload of the same file started its import first.
+    """
+    # The task id is chosen up front so the record and the queued snapshot carry it
+    # before a worker can pick the task up and publish its own progress
+    task_id = str(uuid.uuid4())
+    try:
+        with transaction.atomic():
+            import_analytics = ImportAnalytics.objects.create(
+                file_name=os.path.basename(excel_path),
+                file_path=excel_path,
+                file_hash=file_hash,
+                task_id=task_id,
+                start_time=timezone.now(),
+                status="processing",
+            )
+    except IntegrityError:
+        # Only one import per file may be processing (importanalytics_active_file_hash)
+        running_import = ImportAnalytics.objects.filter(file_hash=file_hash, status='processing').first()
+        if running_import is None:
+            raise
+        return running_import, None
+    # The summary counts the imports by status, it is kept current for every new one
+    refresh_import_summary()
+
+    # Lets task_status answer from the cache until the task publishes its own progress
+    cache_task_progress(task_id, {**record_snapshot(import_analytics), 'state': 'queued'})
+
+    try:
+        # Use Celery to process the file asynchronously. The workbook is streamed
+        # by the task itself, so nothing is parsed or converted inside the request
+        import_task = process_sharded_import_task if sharded else process_excel_file_task
+        task = import_task.apply_async(
+            (excel_path,), {'write_engine': write_engine, 'import_analytics_id': import_analytics.id},
+            task_id=task_id,
+        )
+    except Exception:
+        # An import that never got queued must not block later uploads of the same file
+        ImportAnalytics.objects.filter(pk=import_analytics.id).update(status="failed", end_time=timezone.now())
+        refresh_import_summary()
+        raise
+
+    return import_analytics, task
+
+
+def _partial_upload_path(upload):
+    """Where the parts of a chunked upload are collected, on the same filesystem as the uploads"""
+    return os.path.join(settings.MEDIA_ROOT, 'excel_uploads', 'partial', f"{upload.upload_id}.part")
+
+
+"""
+Server-Sent Events stream of an import's progress, an async view so that under the
+ASGI app (excel_importer/asgi.py) a watcher holds a connection instead of a worker
+"""
+async def import_progress_stream(request, pk):
+    if not await ImportAnalytics.objects.filter(pk=pk).aexists():
+        return JsonResponse({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    async def load_snapshot():
+        return record_snapshot(await ImportAnalytics.objects.aget(pk=pk))
+
+    response = StreamingHttpResponse(stream_import_progress(pk, load_snapshot), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the events
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 """
 DRF Viewset for the File Upload and Processing Feature
 
@@ -47,31 +336,14 @@ class FileUploadViewSet(viewsets.ViewSet):
 
     parser_classes = (MultiPartParser, FormParser)
 
-    def handle_excel_to_csv_conversion(self, excel_path, csv_path):
-        """
-        Convert Excel file to CSV format
-        Params: 
-            excel_path (str): Path to the input Excel file
-            csv_path (str): Path to the output CSV file
-        Returns:
-            bool: True if conversion is successful, False otherwise
+    def create(self, request):
         """
-        try:
-            df = pd.read_excel(excel_path)
-            df.to_csv(csv_path, index=False)
-            return True
-        except Exception as e:
-            logger.log(
-                level="ERROR",
-                message=f"Error converting Excel to CSV: {str(e)}",
-                task_name="excel_to_csv_conversion"
-            )
-            return False
-
+        Handle file upload
 
-
-    def create(self, request):
-        """Handle file upload"""
+        With dry_run the file is only cleaned and validated by dry_run_import_task,
+        optionally on a sample of sample_size random rows or every sample_every-th row,
+        and the task result is the validation report.
+        """
         if 'file' not in request.FILES:
             return Response(
                 {'error': 'No file provided'},
@@ -81,28 +353,50 @@ class FileUploadViewSet(viewsets.ViewSet):
         uploaded_file = request.FILES['file']
 
         # Validate file type
-        if not uploaded_file.name.endswith(('.xlsx', '.xls')):
-            return Response({'error': 'File must be an Excel file (.xlsx or .xls)'},
+        if not uploaded_file.name.endswith(SUPPORTED_EXTENSIONS):
+            return Response({'error': 'File must be an Excel, CSV, Parquet or Feather file (.xlsx, .xls, .csv, .parquet or .feather)'},
                             status=status.HTTP_400_BAD_REQUEST)
 
+        write_engine, sharded, error_response = _parse_import_options(request.data)
+        if error_response is not None:
+            return error_response
+        dry_run, sample_size, sample_every, error_response = _parse_dry_run_options(request.data)
+        if error_response is not None:
+            return error_response
+
         try:
             # Create a unique filename to prevent overwriting
             unique_id = str(uuid.uuid4())
             excel_filename = f"{unique_id}_{uploaded_file.name}"
             excel_path = os.path.join(settings.MEDIA_ROOT, 'excel_uploads', excel_filename)
-            
-            # Create CSV filename
-            csv_filename = f"{unique_id}_{os.path.splitext(uploaded_file.name)[0]}.csv"
-            csv_path = os.path.join(settings.MEDIA_ROOT, 'csv_uploads', csv_filename)
 
             # Create directories if they don't exist
             os.makedirs(os.path.dirname(excel_path), exist_ok=True)
-            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
 
-            # Save the uploaded file
+            # Save the uploaded file, hashing it on the way so identical re-uploads can be detected
+            file_hash = hashlib.sha256()
             with open(excel_path, 'wb+') as destination:
                 for chunk in uploaded_file.chunks():
+                    file_hash.update(chunk)
                     destination.write(chunk)
+            file_hash = file_hash.hexdigest()
+
+            # A dry run only validates, it creates no import record and isn't deduplicated
+            if dry_run:
+                task = dry_run_import_task.delay(excel_path, sample_size=sample_size, sample_every=sample_every)
+                return Response({
+                    'status': 'success',
+                    'message': 'File uploaded and dry run started',
+                    'filename': uploaded_file.name,
+                    'task_id': task.id,
+                    'dry_run': True,
+                }, status=status.HTTP_202_ACCEPTED)
+
+            # The same file imported successfully or still being imported is not imported again
+            existing_import = _find_duplicate_import(file_hash)
+            if existing_import is not None:
+                os.remove(excel_path)
+                return _duplicate_response(existing_import, uploaded_file.name, f"file_upload_{excel_filename}")
 
             # Log file upload success
             DatabaseLogger.log(
@@ -110,20 +404,19 @@ class FileUploadViewSet(viewsets.ViewSet):
                 message=f"Excel file uploaded successfully: {uploaded_file.name}",
                 task_name=f"file_upload_{excel_filename}"
             )
-            
-            # Convert Excel to CSV
-            conversion_start = time.time()
-            is_conversion_successful = self.handle_excel_to_csv_conversion(excel_path, csv_path)
-            file_to_process = csv_path if is_conversion_successful else excel_path
 
-            # Use Celery to process the file asynchronously
-            task = process_excel_file_task.delay(file_to_process)
+            import_analytics, task = _queue_import(excel_path, file_hash, write_engine, sharded)
+            if task is None:
+                os.remove(excel_path)
+                return _duplicate_response(import_analytics, uploaded_file.name, f"file_upload_{excel_filename}")
 
             return Response({
                 'status': 'success',
                 'message': 'File uploaded and processing started',
                 'filename': uploaded_file.name,
                 'task_id': task.id,
+                'analytics_id': import_analytics.id,
+                'sharded': sharded,
             }, status=status.HTTP_202_ACCEPTED)
 
         except Exception as e:
@@ -141,13 +434,281 @@ class FileUploadViewSet(viewsets.ViewSet):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='chunked', parser_classes=[JSONParser, FormParser])
+    def chunked_initiate(self, request):
+        """
+        Start a chunked upload.
+
+        Body: file_name, total_size (bytes), optionally sha256 of the whole file,
+        write_engine and sharded. Returns the upload_id the parts are sent to.
+        """
+        file_name = os.path.basename(str(request.data.get('file_name', '')))
+        if not file_name.endswith(SUPPORTED_EXTENSIONS):
+            return Response({'error': 'file_name must be an Excel, CSV, Parquet or Feather file (.xlsx, .xls, .csv, .parquet or .feather)'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        total_size = str(request.data.get('total_size', ''))
+        if not total_size.isdigit() or int(total_size) == 0:
+            return Response({'error': 'total_size must be a positive number of bytes'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        write_engine, sharded, error_response = _parse_import_options(request.data)
+        if error_response is not None:
+            return error_response
+
+        file_hash = str(request.data.get('sha256', '')).lower()
+        if file_hash and not re.fullmatch(r'[0-9a-f]{64}', file_hash):
+            return Response({'error': 'sha256 must be a hex encoded SHA-256 digest'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # A file that was already imported doesn't have to be sent at all
+        if file_hash:
+            existing_import = _find_duplicate_import(file_hash)
+            if existing_import is not None:
+                return _duplicate_response(existing_import, file_name, f"chunked_upload_{file_name}")
+
+        upload = ChunkedUpload.objects.create(
+            file_name=file_name,
+            total_size=int(total_size),
+            file_hash=file_hash,
+            write_engine=write_engine or "",
+            sharded=sharded,
+        )
+        partial_path = _partial_upload_path(upload)
+        os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+        open(partial_path, 'wb').close()
+
+        return Response({
+            'status': 'success',
+            'upload_id': str(upload.upload_id),
+            'offset': 0,
+            'total_size': upload.total_size,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get', 'put'], url_path=r'chunked/(?P<upload_id>[0-9a-f-]+)')
+    def chunked_part(self, request, upload_id=None):
+        """
+        GET returns how many bytes were received, so an interrupted upload knows where to continue.
+
+        PUT writes the raw request body into the file at its offset. The Content-Range
+        header ("bytes <start>-<end>/<total>") must start at the current offset, an
+        optional X-Chunk-SHA256 header is checked against the part. A part that doesn't
+        match its checksum or length is cut off again.
+        """
+        upload = ChunkedUpload.objects.filter(upload_id=upload_id).first()
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == 'GET':
+            return Response({
+                'upload_id': str(upload.upload_id),
+                'status': upload.status,
+                'offset': upload.offset,
+                'total_size': upload.total_size,
+                'parts': upload.parts,
+            })
+
+        if upload.status != 'uploading':
+            return Response({'error': f"Upload already {upload.status}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length <= 0:
+            return Response({'error': 'Empty part'}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_range = request.META.get('HTTP_CONTENT_RANGE', '')
+        range_match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range.strip())
+        if content_range and range_match is None:
+            return Response({'error': 'Content-Range must look like "bytes <start>-<end>/<total>"'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        start = int(range_match.group(1)) if range_match else upload.offset
+        end = int(range_match.group(2)) if range_match else start + content_length - 1
+        if end - start + 1 != content_length or end >= upload.total_size:
+            return Response({'error': 'Content-Range does not match the part or exceeds total_size'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Checked again under the lock, this only spares receiving a part that can't be used
+        if start != upload.offset:
+            return Response({
+                'error': f"Part must start at byte {upload.offset}",
+                'offset': upload.offset,
+            }, status=status.HTTP_409_CONFLICT)
+
+        with transaction.atomic():
+            # Parts are written in order, a concurrent request for the same upload waits here.
+            # The row lock is held while the body is received, straight into the partial
+            # file at its offset, so every byte is written once
+            upload = ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+            if upload.status != 'uploading':
+                return Response({'error': f"Upload already {upload.status}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if start != upload.offset:
+                return Response({
+                    'error': f"Part must start at byte {upload.offset}",
+                    'offset': upload.offset,
+                }, status=status.HTTP_409_CONFLICT)
+
+            part_hash = hashlib.sha256()
+            received = 0
+            with open(_partial_upload_path(upload), 'r+b') as destination:
+                destination.seek(start)
+                while received < content_length:
+                    block = request.stream.read(min(UPLOAD_BLOCK_SIZE, content_length - received))
+                    if not block:
+                        break
+                    part_hash.update(block)
+                    destination.write(block)
+                    received += len(block)
+
+                part_hash = part_hash.hexdigest()
+                expected_hash = request.META.get('HTTP_X_CHUNK_SHA256', '').lower()
+                if received != content_length or (expected_hash and expected_hash != part_hash):
+                    # The broken part is cut off again, the client sends it anew from the same offset
+                    destination.truncate(start)
+                    return Response({
+                        'error': 'Part incomplete or checksum mismatch',
+                        'offset': upload.offset,
+                        'sha256': part_hash,
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+            upload.offset = start + received
+            upload.parts = upload.parts + [{'start': start, 'end': end, 'sha256': part_hash}]
+            upload.save(update_fields=['offset', 'parts', 'updated_at'])
+
+        return Response({
+            'upload_id': str(upload.upload_id),
+            'offset': upload.offset,
+            'total_size': upload.total_size,
+            'sha256': part_hash,
+        })
+
+    @action(detail=False, methods=['post'], url_path=r'chunked/(?P<upload_id>[0-9a-f-]+)/complete')
+    def chunked_complete(self, request, upload_id=None):
+        """
+        Finish a chunked upload: the assembled file is checked against the sha256 declared
+        at initiate time, moved into place with a rename and its import is queued
+        """
+        upload = ChunkedUpload.objects.filter(upload_id=upload_id).first()
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        if upload.status != 'uploading':
+            return Response({'error': f"Upload already {upload.status}", 'analytics_id': upload.import_analytics_id},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if upload.offset != upload.total_size:
+            return Response({
+                'error': f"Received {upload.offset} of {upload.total_size} bytes",
+                'offset': upload.offset,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        task_name = f"chunked_upload_{upload.upload_id}"
+        try:
+            # No part is accepted once all bytes are in, so the file is hashed without a lock
+            partial_path = _partial_upload_path(upload)
+            file_hash = hashlib.sha256()
+            with open(partial_path, 'rb') as partial_file:
+                while block := partial_file.read(UPLOAD_BLOCK_SIZE):
+                    file_hash.update(block)
+            file_hash = file_hash.hexdigest()
+
+            excel_filename = f"{upload.upload_id}_{upload.file_name}"
+            excel_path = os.path.join(settings.MEDIA_ROOT, 'excel_uploads', excel_filename)
+            with transaction.atomic():
+                # Only one complete request gets past here
+                upload = ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+                if upload.status != 'uploading':
+                    return Response({'error': f"Upload already {upload.status}",
+                                     'analytics_id': upload.import_analytics_id},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+                if upload.file_hash and upload.file_hash != file_hash:
+                    # A corrupted file must not be imported, nor be taken for the file declared
+                    upload.status = 'failed'
+                    upload.save(update_fields=['status', 'updated_at'])
+                    os.remove(partial_path)
+                    DatabaseLogger.log(
+                        level="ERROR",
+                        message=(f"Chunked upload {upload.file_name} does not match its declared sha256 "
+                                 f"{upload.file_hash} (received {file_hash})"),
+                        task_name=task_name
+                    )
+                    return Response({
+                        'error': 'The uploaded file does not match the declared sha256, start a new upload',
+                        'sha256': file_hash,
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+                # Same directory tree, so this is a rename and not a copy
+                os.replace(partial_path, excel_path)
+                upload.file_hash = file_hash
+                upload.status = 'completed'
+                upload.save(update_fields=['file_hash', 'status', 'updated_at'])
+
+            # Another upload of the same file may have finished in the meantime
+            existing_import = _find_duplicate_import(upload.file_hash)
+            if existing_import is not None:
+                os.remove(excel_path)
+                upload.import_analytics = existing_import
+                upload.save(update_fields=['import_analytics', 'updated_at'])
+                return _duplicate_response(existing_import, upload.file_name, task_name)
+
+            DatabaseLogger.log(
+                level="INFO",
+                message=f"Chunked upload completed: {upload.file_name} ({upload.total_size} bytes in {len(upload.parts)} parts)",
+                task_name=task_name
+            )
+
+            import_analytics, task = _queue_import(
+                excel_path, upload.file_hash, upload.write_engine or None, upload.sharded
+            )
+            upload.import_analytics = import_analytics
+            upload.save(update_fields=['import_analytics', 'updated_at'])
+            if task is None:
+                os.remove(excel_path)
+                return _duplicate_response(import_analytics, upload.file_name, task_name)
+
+            return Response({
+                'status': 'success',
+                'message': 'File uploaded and processing started',
+                'filename': upload.file_name,
+                'task_id': task.id,
+                'analytics_id': import_analytics.id,
+                'sharded': upload.sharded,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        except Exception as e:
+            DatabaseLogger.log(
+                level="ERROR",
+                message=f"Error completing chunked upload: {upload.file_name}",
+                task_name=task_name,
+                error=e
+            )
+
+            return Response({
+                'status': 'error',
+                'message': 'An error occurred while completing the upload',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=False, methods=['get'])
     def task_status(self, request):
-        """Check the status of a background processing task"""
+        """
+        Check the status of a background processing task.
+
+        Queued and running imports are answered from the progress snapshot the import
+        caches after every chunk (status PENDING or PROGRESS with a `progress` object),
+        the task result table is only read once the import reached its final state.
+        """
         task_id = request.query_params.get('task_id')
         if not task_id:
             return Response({'error': 'No task_id provided'}, status=status.HTTP_400_BAD_REQUEST)
-        
+
+        progress = get_task_progress(task_id)
+        if progress is not None and progress['state'] not in FINAL_STATES:
+            return Response({
+                'status': 'PENDING' if progress['state'] == 'queued' else 'PROGRESS',
+                'progress': progress,
+            })
+
         try:
             task_result = TaskResult.objects.get(task_id=task_id)
             
@@ -166,6 +727,9 @@ class FileUploadViewSet(viewsets.ViewSet):
                 'result': result_data,
             })
         except TaskResult.DoesNotExist:
+            if progress is not None:
+                # The import is done, the task is storing its result
+                return Response({'status': 'PROGRESS', 'progress': progress})
             return Response({'status': 'PENDING', 'message': 'Task is still queued or running'})
 
 
@@ -239,11 +803,115 @@ class AnalyticsViewSet(viewsets.ViewSet):
         
         serializer = ImportAnalyticsSerializer(paginated_queryset, many=True)
         return paginator.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Get aggregate import stats",
+        operation_description=("Imports per status, row totals, success and failure rates, average rows/s "
+                               "and a daily series, served from a cache refreshed whenever an import finishes"),
+        responses={
+            200: "Import summary",
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Return the aggregate stats of all imports"""
+        return Response(get_import_summary())
+
+    @swagger_auto_schema(
+        operation_summary="Get per-chunk stats of an import",
+        operation_description="Retrieve the read, clean, validate, upsert and log timings, rows/s and peak RSS of every chunk of an import",
+        responses={
+            200: ImportChunkStatsSerializer(many=True),
+            404: "Not Found"
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def chunk_stats(self, request, pk=None):
+        """Return the per-chunk timing and memory stats of one import, in file order"""
+        if not pk.isdigit() or not ImportAnalytics.objects.filter(pk=pk).exists():
+            return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        queryset = ImportChunkStats.objects.filter(import_analytics_id=pk).order_by('first_row')
+
+        # Apply pagination
+        paginator = self.pagination_class()
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
+
+        serializer = ImportChunkStatsSerializer(paginated_queryset, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Get the issue summaries of an import",
+        manual_parameters=[
+            openapi.Parameter('level', openapi.IN_QUERY, description="Filter by level", type=openapi.TYPE_STRING, enum=["INFO", "WARNING"]),
+            openapi.Parameter('code', openapi.IN_QUERY, description="Filter by issue code", type=openapi.TYPE_STRING),
+            openapi.Parameter('field', openapi.IN_QUERY, description="Filter by field", type=openapi.TYPE_STRING),
+        ],
+        operation_description="Retrieve the per-chunk warning and notice summaries of an import, each with its affected rows as ranges",
+        responses={
+            200: ImportIssueSummarySerializer(many=True),
+            404: "Not Found"
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def issues(self, request, pk=None):
+        """Return the per-chunk issue summaries of one import, in file order"""
+        if not pk.isdigit() or not ImportAnalytics.objects.filter(pk=pk).exists():
+            return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        queryset = ImportIssueSummary.objects.filter(import_analytics_id=pk).order_by('chunk_index', 'id')
+
+        for param in ('level', 'code', 'field'):
+            value = request.query_params.get(param, None)
+            if value:
+                queryset = queryset.filter(**{param: value})
+
+        # Apply pagination
+        paginator = self.pagination_class()
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
+
+        serializer = ImportIssueSummarySerializer(paginated_queryset, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Resume an interrupted import",
+        operation_description="Queue a task continuing the import from its last committed chunk",
+        responses={
+            202: "Resume queued",
+            400: "Bad Request",
+            404: "Not Found"
+        }
+    )
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Continue an import left in processing or failed state by a crashed or restarted worker"""
+        import_analytics = ImportAnalytics.objects.filter(pk=pk).first() if pk.isdigit() else None
+        if import_analytics is None:
+            return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+        if import_analytics.status == 'completed':
+            return Response({'error': 'Import already completed'}, status=status.HTTP_400_BAD_REQUEST)
+        if not import_analytics.file_path or not os.path.exists(import_analytics.file_path):
+            return Response({'error': 'The source file of this import is not available for resuming'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if import_analytics.file_hash:
+            running_import = ImportAnalytics.objects.filter(
+                file_hash=import_analytics.file_hash, status='processing'
+            ).exclude(pk=import_analytics.pk).first()
+            if running_import is not None:
+                return Response({'error': f"Import {running_import.id} of the same file is running"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        task = resume_import_task.delay(import_analytics.id)
+        return Response({
+            'status': 'success',
+            'message': f"Resuming import at row {import_analytics.rows_committed + 1}",
+            'task_id': task.id,
+        }, status=status.HTTP_202_ACCEPTED)
     
 
 class LogsViewSet(viewsets.ViewSet):
     """ViewSet for logs operations"""
-    pagination_class = StandardResultsSetPagination
+    pagination_class = LogsCursorPagination
 
 
     @swagger_auto_schema(
@@ -263,13 +931,19 @@ class LogsViewSet(viewsets.ViewSet):
     )
     def list(self, request):
         """Return the logs with filtering options"""
-        queryset = Logs.objects.all().order_by('-created_at')
+        # Ordered by the paginator on (created_at, id)
+        queryset = Logs.objects.all()
         
 
-        # Filter by creation date
+        # Filter by creation date, as a range on created_at so the index can be used
         created_at = request.query_params.get('created_at', None)
         if created_at:
-            queryset = queryset.filter(created_at__date=created_at)
+            day = parse_date(created_at)
+            if day is None:
+                return Response({'error': 'created_at must be a date (YYYY-MM-DD)'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+            queryset = queryset.filter(created_at__gte=day_start, created_at__lt=day_start + timedelta(days=1))
 
         # Filter by log level
         level = request.query_params.get('level', None)
@@ -292,3 +966,138 @@ class LogsViewSet(viewsets.ViewSet):
         
         serializer = LogsSerializer(paginated_queryset, many=True)
         return paginator.get_paginated_response(serializer.data)
+
+
+# Fields the product API can return, the importer's content hash stays internal
+PRODUCT_API_FIELDS = tuple(
+    field.name for field in Product._meta.concrete_fields if field.name != 'content_hash'
+)
+# Product filters matched exactly, each is backed by an index on (field, updated_at, id)
+PRODUCT_EXACT_FILTERS = ('brand', 'availability', 'item_group_id', 'condition')
+
+
+def _filter_products(params):
+    """
+    Apply the product API filters in `params` to the products.
+    Returns (queryset, error), error being a message for an invalid parameter.
+    """
+    queryset = Product.objects.all()
+
+    for field in PRODUCT_EXACT_FILTERS:
+        value = params.get(field, None)
+        if value:
+            queryset = queryset.filter(**{field: value})
+
+    # Filter by price range
+    for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+        value = params.get(param, None)
+        if value:
+            try:
+                price = Decimal(value)
+            except InvalidOperation:
+                price = None
+            if price is None or not price.is_finite():
+                return None, f"{param} must be a number"
+            queryset = queryset.filter(**{lookup: price})
+
+    return queryset, None
+
+
+class ProductViewSet(viewsets.ViewSet):
+    """Read-only ViewSet for the imported products"""
+    pagination_class = ProductCursorPagination
+
+    @swagger_auto_schema(
+        operation_summary="Get products",
+        manual_parameters=[
+            openapi.Parameter('brand', openapi.IN_QUERY, description="Filter by brand", type=openapi.TYPE_STRING),
+            openapi.Parameter('availability', openapi.IN_QUERY, description="Filter by availability", type=openapi.TYPE_STRING, enum=["in_stock", "out_of_stock", "preorder"]),
+            openapi.Parameter('item_group_id', openapi.IN_QUERY, description="Filter by item group", type=openapi.TYPE_STRING),
+            openapi.Parameter('condition', openapi.IN_QUERY, description="Filter by condition", type=openapi.TYPE_STRING, enum=["new", "used", "refurbished"]),
+            openapi.Parameter('min_price', openapi.IN_QUERY, description="Filter by minimum price", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('max_price', openapi.IN_QUERY, description="Filter by maximum price", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('fields', openapi.IN_QUERY, description="Comma separated fields to return, id and updated_at are always included", type=openapi.TYPE_STRING),
+        ],
+        operation_description="Retrieve products with optional filtering, field selection and cursor pagination on (updated_at, id)",
+        responses={
+            200: ProductReadSerializer(many=True),
+            400: "Bad Request"
+        }
+    )
+    def list(self, request):
+        """
+        Return the products with filtering options
+        Parameters:
+            - brand, availability, item_group_id, condition: Filter by exact value
+            - min_price / max_price: Filter by price range
+            - fields: Comma separated fields to return (default all)
+        """
+        # Only the requested columns are read, rows come back as dicts without building
+        # model instances or running a serializer per row
+        fields = request.query_params.get('fields', None)
+        if fields:
+            selected_fields = [field.strip() for field in fields.split(',') if field.strip()]
+            unknown_fields = sorted(set(selected_fields) - set(PRODUCT_API_FIELDS))
+            if unknown_fields:
+                return Response({'error': f"Unknown fields: {', '.join(unknown_fields)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            # The paginator builds the cursor from the ordering fields
+            selected_fields = list(dict.fromkeys(['id', *selected_fields, 'updated_at']))
+        else:
+            selected_fields = list(PRODUCT_API_FIELDS)
+
+        queryset, error = _filter_products(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Ordered by the paginator on (updated_at, id)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset.values(*selected_fields), request)
+        return paginator.get_paginated_response(page)
+
+    @swagger_auto_schema(
+        operation_summary="Export products",
+        manual_parameters=[
+            openapi.Parameter('file_format', openapi.IN_QUERY, description="Export format", type=openapi.TYPE_STRING, enum=["csv", "xlsx"], default="csv"),
+            openapi.Parameter('brand', openapi.IN_QUERY, description="Filter by brand", type=openapi.TYPE_STRING),
+            openapi.Parameter('availability', openapi.IN_QUERY, description="Filter by availability", type=openapi.TYPE_STRING, enum=["in_stock", "out_of_stock", "preorder"]),
+            openapi.Parameter('item_group_id', openapi.IN_QUERY, description="Filter by item group", type=openapi.TYPE_STRING),
+            openapi.Parameter('condition', openapi.IN_QUERY, description="Filter by condition", type=openapi.TYPE_STRING, enum=["new", "used", "refurbished"]),
+            openapi.Parameter('min_price', openapi.IN_QUERY, description="Filter by minimum price", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('max_price', openapi.IN_QUERY, description="Filter by maximum price", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('include_incomplete', openapi.IN_QUERY, description="Also export products with a blank mandatory field, the import rejects their rows", type=openapi.TYPE_BOOLEAN, default=False),
+        ],
+        operation_description=("Stream the products as a feed file with the columns the import reads, "
+                               "so the export can be uploaded again unchanged"),
+        responses={
+            200: "Feed file",
+            400: "Bad Request"
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the (filtered) products as a CSV or XLSX feed"""
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in ('csv', 'xlsx'):
+            return Response({'error': 'file_format must be csv or xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset, error = _filter_products(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        include_incomplete = request.query_params.get('include_incomplete', '').lower() in ('true', '1', 'yes')
+        if not include_incomplete:
+            queryset = exclude_incomplete(queryset)
+        queryset = queryset.order_by('id')
+
+        # Async content, the ASGI app sends each block as it is produced. A synchronous
+        # iterator would be read to the end before the first byte went out
+        if file_format == 'csv':
+            response = StreamingHttpResponse(astream_csv(queryset), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(
+                astream_xlsx(queryset),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        file_name = f"products_{timezone.now():%Y%m%d_%H%M%S}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        return response
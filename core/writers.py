@@ -0,0 +1,309 @@
+import io
+import json
+from django.conf import settings
+from django.db import connection, models
+from django.utils import timezone
+from core.models import Product
+from core.utils import DatabaseLogger
+
+
+WRITE_ENGINES = ('orm', 'copy')
+
+
+class ProductWriter:
+    """
+    Base class for the per-chunk Product upsert.
+
+    write() receives the validated records of a chunk (ProductRecord objects),
+    rejects the ones missing core fields, stamps the rest with their content hash and
+    upserts them, skipping products whose stored hash already matches. It must be
+    called inside a transaction and returns
+    (created_count, updated_count, unchanged_count, rejected_count).
+
+    The hash covers the row as it ends up in the table: fields a row doesn't carry
+    take their model default on insert and keep their stored value on update, so a
+    row matches its product whichever columns the feed has.
+    """
+    engine = None
+
+    def __init__(self, task_name):
+        self.task_name = task_name
+
+    def write(self, records):
+        accepted = []
+        rejected_count = 0
+
+        for record_info in records:
+            # Ensure essential fields are present
+            if not record_info.data.get('product_id') or \
+               not record_info.data.get('title') or \
+               record_info.data.get('price') is None:
+                rejected_count += 1
+                DatabaseLogger.log(
+                    level="ERROR",
+                    message=f"Row {record_info.row}: Missing core fields after validation",
+                    task_name=self.task_name
+                )
+                continue
+            accepted.append(record_info)
+
+        self.stamp_content_hashes(accepted)
+        created_count, updated_count, unchanged_count, failed_count = self.upsert(accepted)
+        return created_count, updated_count, unchanged_count, rejected_count + failed_count
+
+    def stamp_content_hashes(self, records):
+        """Set data['content_hash'] of each record to the hash of the row it will leave in the table"""
+        content_fields = Product.content_fields()
+        defaults = {field.name: field.get_default() for field in content_fields}
+
+        # Only rows missing some fields need the stored product, one query for all of them
+        partial_ids = [
+            r.id for r in records if any(field.name not in r.data for field in content_fields)
+        ]
+        stored_rows = {}
+        if partial_ids:
+            stored_rows = {
+                row['product_id']: row
+                for row in Product.objects.filter(product_id__in=partial_ids).values(*defaults)
+            }
+
+        for record_info in records:
+            values = {**stored_rows.get(record_info.id, defaults), **record_info.data}
+            record_info.data['content_hash'] = Product.compute_content_hash(values)
+
+    def upsert(self, records):
+        """Write the accepted records, returns (created_count, updated_count, unchanged_count, failed_count)"""
+        raise NotImplementedError
+
+
+class OrmProductWriter(ProductWriter):
+    """Upsert through the ORM: bulk_create for new products and bulk_update for existing ones"""
+    engine = 'orm'
+
+    def upsert(self, records):
+        products_to_create = []
+        products_to_update = []
+        failed_count = 0
+        product_ids = [r.id for r in records if r.id]
+
+        # Skip rows identical to what is stored, only changed products are loaded for update
+        stored_hashes = dict(
+            Product.objects.filter(product_id__in=product_ids).values_list('product_id', 'content_hash')
+        )
+        changed_records = [
+            r for r in records
+            if stored_hashes.get(r.data['product_id']) != r.data['content_hash']
+        ]
+        unchanged_count = len(records) - len(changed_records)
+        records = changed_records
+        now = timezone.now()
+
+        # Find existing products to handle duplicates
+        existing_products = {
+            p.product_id: p for p in Product.objects.filter(
+                product_id__in=[r.id for r in records if r.id in stored_hashes]
+            )
+        }
+
+        for record_info in records:
+            try:
+                product_id = record_info.data.get('product_id')
+
+                # Check if product already exists (update case)
+                if product_id in existing_products:
+                    existing_product = existing_products[product_id]
+                    for key, value in record_info.data.items():
+                        setattr(existing_product, key, value)
+                    # bulk_update doesn't apply auto_now, the product API pages on updated_at
+                    existing_product.updated_at = now
+                    products_to_update.append(existing_product)
+                else:
+                    # Create new product
+                    products_to_create.append(Product(**record_info.data))
+            except Exception as model_instantiation_e:
+                failed_count += 1
+                DatabaseLogger.log(
+                    level="ERROR",
+                    message=f"Row {record_info.row}: Error processing product: {str(model_instantiation_e)}",
+                    task_name=self.task_name
+                )
+
+        # Perform bulk operations
+        created_count = 0
+        updated_count = 0
+
+        if products_to_create:
+            try:
+                created_products = Product.objects.bulk_create(
+                    products_to_create,
+                    ignore_conflicts=True  # Skip duplicates without failing transaction
+                )
+                created_count = len(created_products)
+            except Exception as create_e:
+                DatabaseLogger.log(
+                    level="ERROR",
+                    message=f"Error in bulk create: {str(create_e)}",
+                    task_name=self.task_name
+                )
+                raise
+
+        if products_to_update:
+            try:
+                # Use bulk_update for better performance
+                model_fields_to_update = set()
+                for product in products_to_update:
+                    for field in product.__dict__:
+                        if not field.startswith('_') and field not in ['id', 'created_at']:
+                            model_fields_to_update.add(field)
+
+                fields_to_update = list(model_fields_to_update)
+                if fields_to_update and len(products_to_update) > 0:
+                    Product.objects.bulk_update(products_to_update, fields_to_update)
+                updated_count = len(products_to_update)
+            except Exception as update_e:
+                DatabaseLogger.log(
+                    level="ERROR",
+                    message=f"Error in bulk update: {str(update_e)}",
+                    task_name=self.task_name
+                )
+                raise
+
+        return created_count, updated_count, unchanged_count, failed_count
+
+
+def _copy_text(field, value):
+    """Render a value in PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(field, models.JSONField):
+        text = json.dumps(value, cls=field.encoder)
+    elif isinstance(value, bool):
+        text = 't' if value else 'f'
+    else:
+        text = str(field.get_prep_value(value))
+    return (
+        text.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class CopyProductWriter(ProductWriter):
+    """
+    PostgreSQL upsert: rows are streamed with COPY into a temporary staging table and
+    merged with a single INSERT ... ON CONFLICT (product_id) DO UPDATE per column set.
+    RETURNING (xmax = 0) tells inserted rows apart from updated ones.
+
+    As with the ORM path, fields a row doesn't carry get their model default on insert
+    and keep their stored value on update, so rows are grouped by the fields they carry.
+    Conflicting rows whose content_hash matches the stored one are left untouched.
+    """
+    engine = 'copy'
+    staging_table = 'core_product_import_staging'
+
+    def __init__(self, task_name):
+        super().__init__(task_name)
+        self.fields = [field for field in Product._meta.concrete_fields if not field.primary_key]
+
+    def upsert(self, records):
+        # A product appearing twice in a chunk can't be upserted twice by one statement,
+        # the later row wins and the earlier one counts as an update
+        latest_records = {}
+        for record_info in records:
+            latest_records[record_info.data['product_id']] = record_info
+        superseded_count = len(records) - len(latest_records)
+
+        groups = {}
+        for record_info in latest_records.values():
+            groups.setdefault(tuple(sorted(record_info.data)), []).append(record_info.data)
+
+        created_count = 0
+        updated_count = superseded_count
+        unchanged_count = 0
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+            for present_fields, rows in groups.items():
+                inserted_flags = self._copy_and_merge(cursor, set(present_fields), rows, now)
+                created_count += sum(inserted_flags)
+                updated_count += len(inserted_flags) - sum(inserted_flags)
+                # Rows skipped by the content_hash condition are not returned
+                unchanged_count += len(rows) - len(inserted_flags)
+
+        return created_count, updated_count, unchanged_count, 0
+
+    def _column_list(self):
+        return ', '.join(connection.ops.quote_name(field.column) for field in self.fields)
+
+    def _create_staging_table(self, cursor):
+        # Session scoped and emptied on commit, so it is only created once per connection
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging_table} ON COMMIT DELETE ROWS AS "
+            f"SELECT {self._column_list()} FROM {Product._meta.db_table} WITH NO DATA"
+        )
+
+    def _copy_and_merge(self, cursor, present_fields, rows, now):
+        buffer = io.StringIO()
+        for data in rows:
+            values = []
+            for field in self.fields:
+                if field.name in ('created_at', 'updated_at'):
+                    value = now
+                elif field.name in present_fields:
+                    value = data[field.name]
+                else:
+                    value = field.get_default()
+                values.append(_copy_text(field, value))
+            buffer.write('\t'.join(values))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        cursor.execute(f"TRUNCATE {self.staging_table}")
+        copy_sql = f"COPY {self.staging_table} ({self._column_list()}) FROM STDIN"
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            # psycopg2
+            raw_cursor.copy_expert(copy_sql, buffer)
+        else:
+            # psycopg 3
+            with raw_cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+
+        quote_name = connection.ops.quote_name
+        table = Product._meta.db_table
+        update_columns = [
+            field.column for field in self.fields
+            if field.name in present_fields and field.name not in ('product_id', 'created_at')
+        ] + ['updated_at']
+        cursor.execute(
+            f"INSERT INTO {table} ({self._column_list()}) "
+            f"SELECT {self._column_list()} FROM {self.staging_table} "
+            f"ON CONFLICT ({quote_name('product_id')}) DO UPDATE SET "
+            + ', '.join(f"{quote_name(column)} = EXCLUDED.{quote_name(column)}" for column in update_columns)
+            + f" WHERE {table}.{quote_name('content_hash')} IS DISTINCT FROM EXCLUDED.{quote_name('content_hash')}"
+            + " RETURNING (xmax = 0)"
+        )
+        return [inserted for (inserted,) in cursor.fetchall()]
+
+
+def get_product_writer(engine, task_name):
+    """
+    Return the writer for the requested engine ('orm' or 'copy', defaults to
+    settings.IMPORT_WRITE_ENGINE). COPY needs PostgreSQL, other databases fall
+    back to the ORM writer.
+    """
+    engine = engine or settings.IMPORT_WRITE_ENGINE
+    if engine not in WRITE_ENGINES:
+        raise ValueError(f"Unknown write engine '{engine}', expected one of: {', '.join(WRITE_ENGINES)}")
+
+    if engine == 'copy':
+        if connection.vendor == 'postgresql':
+            return CopyProductWriter(task_name)
+        DatabaseLogger.log(
+            level="WARNING",
+            message=f"COPY write engine requires PostgreSQL, falling back to the ORM writer on {connection.vendor}",
+            task_name=task_name
+        )
+    return OrmProductWriter(task_name)
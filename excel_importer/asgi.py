@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+This is how the project is served, e.g. gunicorn -k uvicorn.workers.UvicornWorker
+excel_importer.asgi:application, and uvicorn excel_importer.asgi:application --reload
+for development. The import progress streams (/api/analytics/<id>/progress/) are
+held as idle connections rather than occupying a worker each, and product exports
+(/api/products/export/) are sent block by block.
 """
 
 import os
@@ -83,12 +83,6 @@ WSGI_APPLICATION = 'excel_importer.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.sqlite3',
-#         'NAME': BASE_DIR / 'db.sqlite3',
-#     }
-# }
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -100,6 +94,15 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite switches to a local SQLite file, e.g. for benchmarks without a PostgreSQL server
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -149,7 +152,75 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CHUNKSIZE = 10000
+# Currency used for prices that come without a currency code
+DEFAULT_CURRENCY = 'EUR'
+
+# Buffered DatabaseLogger: pending log records are bulk inserted once this many
+# are queued or this many seconds have passed since the last flush
+LOG_BUFFER_SIZE = 2000
+LOG_FLUSH_INTERVAL = 5
+
+# How imported products are written: 'orm' (bulk_create/bulk_update) or 'copy'
+# (PostgreSQL COPY into a staging table, falls back to 'orm' on other databases).
+# Can be overridden per upload with the write_engine field.
+IMPORT_WRITE_ENGINE = os.environ.get('IMPORT_WRITE_ENGINE', 'orm')
+
+# Rows per shard when a CSV import is fanned out across Celery workers
+IMPORT_SHARD_ROWS = 100000
+
+# Seconds without a committed chunk after which a processing import counts as abandoned
+# (its worker died): an upload of the same file marks it failed and imports the file again
+IMPORT_STALE_AFTER = int(os.environ.get('IMPORT_STALE_AFTER', 60 * 60))
+
+# Worker processes cleaning and validating chunks inside one import while the next chunks
+# are read and the previous ones written (0 or 1 validates serially), and how many
+# validated chunks may wait for the writer before reading pauses
+IMPORT_PIPELINE_WORKERS = int(os.environ.get('IMPORT_PIPELINE_WORKERS', 0))
+IMPORT_PIPELINE_QUEUE_SIZE = 4
+
+# Adaptive chunk sizing: starting at CHUNKSIZE, the rows per chunk are moved towards what
+# takes IMPORT_CHUNK_TARGET_TIME seconds, kept between the min and max, and reduced when a
+# write transaction runs longer than IMPORT_CHUNK_MAX_TRANSACTION_TIME seconds or the
+# process RSS exceeds IMPORT_CHUNK_MAX_RSS bytes
+IMPORT_ADAPTIVE_CHUNKS = os.environ.get('IMPORT_ADAPTIVE_CHUNKS', 'true').lower() in ('true', '1', 'yes')
+IMPORT_CHUNKSIZE_MIN = 1000
+IMPORT_CHUNKSIZE_MAX = 100000
+IMPORT_CHUNK_TARGET_TIME = 5.0
+IMPORT_CHUNK_MAX_TRANSACTION_TIME = 10.0
+IMPORT_CHUNK_MAX_RSS = 1024 * 1024 * 1024
+
+# Logs retention: on PostgreSQL the Logs table is partitioned by day, partitions are
+# created LOGS_PARTITIONS_AHEAD days in advance and dropped once all their rows are
+# older than LOGS_RETENTION_DAYS days
+LOGS_RETENTION_DAYS = int(os.environ.get('LOGS_RETENTION_DAYS', 30))
+LOGS_PARTITIONS_AHEAD = 7
+
+
+# Shared cache, the import workers refresh entries the web processes read (e.g. the
+# import summary), so it must not be a per-process cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_URL', 'redis://localhost:6379/1'),
+    }
+}
 
+# CACHE_BACKEND=locmem switches to a per-process cache, e.g. for tests
+if os.environ.get('CACHE_BACKEND') == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Days covered by the daily series of /api/analytics/summary/
+IMPORT_SUMMARY_DAYS = 30
+
+# Redis server whose pub/sub carries the per-chunk progress of imports to the
+# progress streams (/api/analytics/<id>/progress/)
+IMPORT_PROGRESS_REDIS_URL = os.environ.get('IMPORT_PROGRESS_REDIS_URL', 'redis://localhost:6379/2')
+# Seconds the latest progress snapshot of an import task stays in the cache for task_status
+IMPORT_PROGRESS_CACHE_TIMEOUT = 24 * 60 * 60
 
 # Celery Configuration Options
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
@@ -158,6 +229,13 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+# Run with `celery -A excel_importer beat`
+CELERY_BEAT_SCHEDULE = {
+    'maintain-log-partitions': {
+        'task': 'core.tasks.maintain_log_partitions_task',
+        'schedule': 60 * 60,
+    },
+}
 
 # Add django-celery-results to INSTALLED_APPS
 INSTALLED_APPS += ['django_celery_results']
\ No newline at end of file
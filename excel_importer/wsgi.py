@@ -5,6 +5,10 @@ It exposes the WSGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
+
+Only used by manage.py runserver. The project is served through asgi.py: the
+progress stream and the product export are async and WSGI reads them to the end
+before sending anything, so neither streams here.
 """
 
 import os